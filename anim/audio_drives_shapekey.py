@@ -1,5 +1,15 @@
 #!/usr/bin/env python
 import bpy
+import os
+import sys
+import numpy as np
+
+# sound analysis is shared with the VSE scripts through their on-disk cache
+try:
+    import audio_cache
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'vse'))
+    import audio_cache
 
 # audio input drives shape key value
 # a Blender Python script by Josh (github.com/Botmasher)
@@ -11,42 +21,112 @@ import bpy
 #   4. choose a scene frame to start playing your audio file below
 #   5. click "Run script" with this script open in the text editor
 #
+# the sound is baked without any editor area, so this also runs under blender -b:
+#   blender -b file.blend --python audio_drives_shapekey.py
+#
 
 # audio to use and when to start playing
 sound_file_path = '/Users/username/test.wav'   # path to your file
 custom_key_name = 'audio-shape-key'            # rename your shape key
 starting_frame = 0                             # scene frame to start playback
 
+# envelope smoothing - how fast the key opens on loud sounds and closes on quiet ones
+attack_seconds = 0.01
+release_seconds = 0.08
+# band-split mode - shape key name: (lowest Hz, highest Hz) of the sound driving it
+use_bands = False
+band_shape_keys = {
+    'mouth-open': (80.0, 800.0),
+    'mouth-wide': (800.0, 2500.0),
+    'jaw': (2500.0, 6000.0)
+}
+
 class Context_Manager:
     text = "TEXT_EDITOR"
     graph = "GRAPH_EDITOR"
     vse = "SEQUENCE_EDITOR"
     def __init__ (self):
-        return self
+        pass
     def get (self):
-    ''' Read the current context
-    '''
+        ''' Read the current context
+        '''
         return bpy.context.area.type
     def set (self, context):
-    ''' Change the current context
-    '''
+        ''' Change the current context
+        '''
         old_context = bpy.context.area.type
         bpy.context.area.type = context
         return (old_context, context)
     def object (self):
-    ''' Read the active object
-    '''
+        ''' Read the active object
+        '''
         return bpy.context.object
 
+def smooth_envelope (envelope, fps, attack=attack_seconds, release=release_seconds):
+    ''' Follow the envelope quickly as it rises and slowly as it falls
+    '''
+    attack_coef = np.exp(-1.0 / max(attack * fps, 1e-6))
+    release_coef = np.exp(-1.0 / max(release * fps, 1e-6))
+    smoothed = np.empty(len(envelope))
+    level = 0.0
+    for i, value in enumerate(envelope.tolist()):
+        coef = attack_coef if value > level else release_coef
+        level = value + coef * (level - value)
+        smoothed[i] = level
+    return smoothed
+
+def bake_envelope (path, fps, attack=attack_seconds, release=release_seconds, minimum=0.0, maximum=1.0):
+    ''' Per-frame key values from an audio file, scaled so the loudest frame reaches maximum
+    '''
+    envelope = smooth_envelope(audio_cache.envelope(path, fps), fps, attack=attack, release=release)
+    loudest = envelope.max() if len(envelope) else 0.0
+    if loudest > 0:
+        envelope = envelope / loudest
+    return minimum + envelope * (maximum - minimum)
+
+def write_shape_key_curve (shape_keys, key_name, start_frame, values):
+    ''' Replace a shape key's value fcurve with one keyframe per value in a single batch
+    '''
+    data_path = 'key_blocks["{0}"].value'.format(key_name)
+    animation_data = shape_keys.animation_data or shape_keys.animation_data_create()
+    if not animation_data.action:
+        animation_data.action = bpy.data.actions.new("{0}Action".format(shape_keys.name))
+    fcurves = animation_data.action.fcurves
+    fcurve = fcurves.find(data_path)
+    fcurve and fcurves.remove(fcurve)
+    fcurve = fcurves.new(data_path)
+    count = len(values)
+    co = np.empty(count * 2, dtype=np.float32)
+    co[0::2] = start_frame + np.arange(count)
+    co[1::2] = values
+    fcurve.keyframe_points.add(count)
+    fcurve.keyframe_points.foreach_set('co', co)
+    # recalculate auto handles for the new points
+    fcurve.update()
+    return fcurve
+
+def band_envelopes (path, bands, fps, attack=attack_seconds, release=release_seconds, minimum=0.0, maximum=1.0):
+    ''' Per-frame values for each (low Hz, high Hz) band, smoothed and scaled so each band peaks at maximum
+    '''
+    amplitudes = audio_cache.band_energy(path, bands, fps)
+    values = np.empty(amplitudes.shape)
+    for i in range(len(bands)):
+        envelope = smooth_envelope(amplitudes[:, i], fps, attack=attack, release=release)
+        loudest = envelope.max() if len(envelope) else 0.0
+        values[:, i] = envelope / loudest if loudest > 0 else envelope
+    return minimum + values * (maximum - minimum)
+
 class Audio_Shape_Key:
     def __init__ (self, selected_object, key_name, value=0.0):
-    ''' Create and name a shape key in selected object's data.
-    '''
+        ''' Create and name a shape key in selected object's data, reusing one with the same name
+        '''
         # add and store shape key
         if selected_object.data.shape_keys == None:
             selected_object.shape_key_add()
-        shape_key = selected_object.shape_key_add()
-        shape_key.name = key_name
+        shape_key = selected_object.data.shape_keys.key_blocks.get(key_name)
+        if shape_key is None:
+            shape_key = selected_object.shape_key_add()
+            shape_key.name = key_name
         self.key = shape_key
         self.key.value = value
         # toggle when bake sound to key
@@ -56,66 +136,73 @@ class Audio_Shape_Key:
         # object this key belongs to
         self.object = selected_object
     def set_keyframe (self, frame, value):
-    ''' Keyframe shapekey and store frame:value pair in dictionary
-    '''
+        ''' Keyframe shapekey and store frame:value pair in dictionary
+        '''
         bpy.context.scene.frame_current = frame
         self.key.keyframe_insert ("value", frame = frame)
         self.key.value = value
         self.key.keyframe_insert ("value", frame = frame)
         self.keyframes[frame] = value
     def get_keyframe_value (self, frame):
-    ''' Return the shape key's value at a specific frame
-    '''
+        ''' Return the shape key's value at a specific frame
+        '''
         return self.keyframes [frame]
     def get_keyframe_curve (self):
-    ''' Return the shape key's fcurve
-    '''
-        # return the keyframe fcurve at this frame
-        if self.object.data.animation_data.action is None:
+        ''' Return the shape key's fcurve
+        '''
+        # shape key animation lives on the mesh's shape keys datablock
+        animation_data = self.object.data.shape_keys.animation_data
+        if animation_data is None or animation_data.action is None:
             return None
-        for fcurve in self.object.data.animation_data.action.fcurves:
+        for fcurve in animation_data.action.fcurves:
             # the fcurve's name is the shape key path plus .value
             if (self.key.name+"\"") in fcurve.data_path:
                 return fcurve
         return None
-    def add_sound_to_keyframe (self, path):
-    ''' Bake sound to a keyframe in this shape key
-    '''
+    def add_sound_to_keyframe (self, path, frame=None, attack=attack_seconds, release=release_seconds):
+        ''' Bake sound to keyframes in this shape key without using an editor area
+        '''
         if self.sound_added == False:
-            ctx.set ('GRAPH_EDITOR')
-            bpy.ops.graph.sound_bake (filepath=path)
-            ctx.set ('TEXT_EDITOR')
+            scene = bpy.context.scene
+            frame = scene.frame_current if frame is None else frame
+            fps = scene.render.fps / scene.render.fps_base
+            values = bake_envelope(bpy.path.abspath(path), fps, attack=attack, release=release)
+            write_shape_key_curve(self.object.data.shape_keys, self.key.name, frame, values)
+            self.keyframes.update(zip(range(frame, frame + len(values)), values.tolist()))
             self.sound_added = True
+        return self.get_keyframe_curve()
     def add_sound_to_sequencer (self, path, frame):
-    ''' Add audio to the sequencer - independent of baking
-    '''
-        ctx.set ('SEQUENCE_EDITOR')
-        bpy.ops.sequencer.sound_strip_add(filepath=sound_file_path)
-        sound_strip = bpy.context.scene.sequence_editor.active_strip
+        ''' Add audio to the sequencer - independent of baking
+        '''
+        scene = bpy.context.scene
+        sequencer = scene.sequence_editor or scene.sequence_editor_create()
+        sound_strip = sequencer.sequences.new_sound(os.path.basename(path), path, 1, frame)
         # set video to length of the audio
-        if bpy.context.scene.frame_start == 1:
-            bpy.context.scene.frame_start = 0
-        if bpy.context.scene.frame_end < sound_strip.frame_final_duration:
-            bpy.context.scene.frame_end = sound_strip.frame_final_duration
-        ctx.set ('TEXT_EDITOR')
+        if scene.frame_start == 1:
+            scene.frame_start = 0
+        if scene.frame_end < sound_strip.frame_final_end:
+            scene.frame_end = sound_strip.frame_final_end
+        return sound_strip
     def add_envelope (self):
-    ''' Add an envelope modifier to the baked sound keyframe's fcurve
-    '''
-        if self.get_envelope() == None:
-            ctx.set ('GRAPH_EDITOR')
-            bpy.ops.graph.fmodifier_add(type='ENVELOPE')
-            ctx.set ('TEXT_EDITOR')
+        ''' Add an envelope modifier to the baked sound keyframe's fcurve
+        '''
+        fcurve = self.get_keyframe_curve()
+        if fcurve is not None and self.get_envelope() == None:
+            fcurve.modifiers.new('ENVELOPE')
         return self.get_envelope()
     def get_envelope (self):
-    ''' Return the envelope modifier at this baked sound keyframe's fcurve
-    '''
-        for modifier in self.get_keyframe_curve().modifiers:
+        ''' Return the envelope modifier at this baked sound keyframe's fcurve
+        '''
+        fcurve = self.get_keyframe_curve()
+        if fcurve is None:
+            return None
+        for modifier in fcurve.modifiers:
             if modifier.type == "ENVELOPE":
                 return modifier
         return None
     def set_envelope (self, reference, minimum, maximum):
-    ''' Adjust the modifier's value if this shape key has an envelope
-    '''
+        ''' Adjust the modifier's value if this shape key has an envelope
+        '''
         envelope = self.get_envelope()
         if envelope != None:
             envelope.reference_value = reference
@@ -123,31 +210,79 @@ class Audio_Shape_Key:
             envelope.default_max = maximum
         return envelope
     def get_value (self):
-    ''' Read the value of this shape key
-    '''
+        ''' Read the value of this shape key
+        '''
         return self.key.value
     def set_value (self, value):
-    ''' Adjust the value of this shape key
-    '''
+        ''' Adjust the value of this shape key
+        '''
         self.key.value = value
         return self.key.value
 
-# get context and the object to key
+class Audio_Band_Shape_Keys:
+    def __init__ (self, selected_object, band_keys, value=0.0):
+        ''' Drive several shape keys, each from one frequency band of the same sound
+        '''
+        self.object = selected_object
+        self.bands = dict(band_keys)
+        self.keys = {name: Audio_Shape_Key(selected_object, name, value) for name in self.bands}
+        # sound file and start frame of the last bake
+        self.path = None
+        self.frame = None
+    def set_bands (self, band_keys):
+        ''' Change band mappings and rebake from the cached spectrogram if a sound was baked
+        '''
+        for name in band_keys:
+            name not in self.keys and self.keys.update({name: Audio_Shape_Key(self.object, name)})
+        self.bands = dict(band_keys)
+        if self.path is not None:
+            for key in self.keys.values():
+                key.sound_added = False
+            self.add_sound_to_keyframes(self.path, self.frame)
+        return self.bands
+    def add_sound_to_keyframes (self, path, frame=None, attack=attack_seconds, release=release_seconds):
+        ''' Bake every band's shape key from one pass over the sound's spectrogram
+        '''
+        scene = bpy.context.scene
+        frame = scene.frame_current if frame is None else frame
+        fps = scene.render.fps / scene.render.fps_base
+        names = [name for name in self.bands if not self.keys[name].sound_added]
+        if not names:
+            return self.keys
+        values = band_envelopes(bpy.path.abspath(path), [self.bands[name] for name in names], fps, attack=attack, release=release)
+        for i, name in enumerate(names):
+            key = self.keys[name]
+            write_shape_key_curve(self.object.data.shape_keys, key.key.name, frame, values[:, i])
+            key.keyframes = dict(zip(range(frame, frame + len(values)), values[:, i].tolist()))
+            key.sound_added = True
+        self.path = path
+        self.frame = frame
+        return self.keys
+
+# context switcher used by shape key methods
 ctx = Context_Manager ()
-obj = ctx.object ()
 
-# add shape key
-audio_key = Audio_Shape_Key (obj, custom_key_name, 1.0)
+if __name__ == '__main__':
+    # get the object to key
+    obj = ctx.object ()
+
+    # bake each frequency band to its own shape key
+    if use_bands:
+        band_keys = Audio_Band_Shape_Keys (obj, band_shape_keys)
+        band_keys.add_sound_to_keyframes (sound_file_path, starting_frame)
+
+    # add shape key
+    audio_key = Audio_Shape_Key (obj, custom_key_name, 1.0)
 
-# add keyframe to shape key value
-audio_key.set_keyframe (starting_frame, 1.0)
+    # add keyframe to shape key value
+    audio_key.set_keyframe (starting_frame, 1.0)
 
-# bake sound to the shape key fcurve
-audio_key.add_sound_to_keyframe (sound_file_path)
+    # bake sound to the shape key fcurve
+    audio_key.add_sound_to_keyframe (sound_file_path, starting_frame)
 
-# add envelope to the sound / shape key fcurve
-audio_key.add_envelope ()
-audio_key.set_envelope (0.0, 0.0, 0.8)
+    # add envelope to the sound / shape key fcurve
+    audio_key.add_envelope ()
+    audio_key.set_envelope (0.0, 0.0, 0.8)
 
-# add same sound at same frame in sequencer
-audio_key.add_sound_to_sequencer (sound_file_path, starting_frame)
\ No newline at end of file
+    # add same sound at same frame in sequencer
+    audio_key.add_sound_to_sequencer (sound_file_path, starting_frame)
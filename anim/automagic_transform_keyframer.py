@@ -16,7 +16,9 @@ def get_transform(obj, property):
     #transforms = {'location': location, 'rotation': rotation, 'scale': scale}
     return getattr(obj, property)
 
-def playhead(scene=bpy.context.scene, frames=0):
+def playhead(scene=None, frames=0):
+    if scene is None:
+        scene = bpy.context.scene
     scene.frame_current += frames
     return scene.frame_current
 
@@ -42,22 +44,20 @@ def print_automagic_transform():
     print(bpy.context.scene.object.automagic_transform)
     return
 
-bpy.types.Object.automagic_transform = FloatVectorProperty(
-    name="Updated Transform",
-    description="Loc/rot/scale being updated",
-    subtype='TRANSLATION',
-    size=3,
-    update=print_automagic_transform
-)
+def setup_automagic_props():
+    bpy.types.Object.automagic_transform = FloatVectorProperty(
+        name="Updated Transform",
+        description="Loc/rot/scale being updated",
+        subtype='TRANSLATION',
+        size=3,
+        update=print_automagic_transform
+    )
 
-bpy.types.Object.automagic_frames = IntProperty(
-    name="Total frames",
-    description="Frames count for automagic transform anim",
-    default=5
-)
-
-# TODO adjust anim length based on int prop OR (if boolean) change magnitude
-keyframe_transform(bpy.context.scene.objects.active, 'location', 10)
+    bpy.types.Object.automagic_frames = IntProperty(
+        name="Total frames",
+        description="Frames count for automagic transform anim",
+        default=5
+    )
 
 # Watch for changes to object's existing property
 # adapted from https://blender.stackexchange.com/questions/19668/execute-a-python-function-whenever-the-user-interacts-with-the-program
@@ -71,8 +71,9 @@ def on_change_observer(obj, prop, cb):
         old_value = getattr(obj, prop)
         new_value = getattr(obj, prop)
     def update():
+        nonlocal old_value, new_value
         try:
-            old_value = new_value.copy()    # ERROR new_value referenced before assignment
+            old_value = new_value.copy()
             new_value = getattr(obj, prop).copy()
         except AttributeError:
             old_value = new_value
@@ -86,15 +87,31 @@ def on_change_loc(obj, old_loc, new_loc):
     print("from loc {0} to loc {1}".format(old_loc, new_loc))
     return
 
-# instantiate observer
-automagic_observer_update = on_change_observer(bpy.context.scene.objects.active, 'location', on_change_loc)
+# observer instantiated on first scene update
+automagic_observer_update = None
 
 # handler
 def observe(scene):
     global automagic_observer_update
+    if automagic_observer_update is None:
+        automagic_observer_update = on_change_observer(scene.objects.active, 'location', on_change_loc)
     automagic_observer_update()
     return
 
-# add to app handlers
-scene_update_handlers = bpy.app.handlers.scene_update_post
-observe not in scene_update_handlers and scene_update_handlers.append(observe)
+def register():
+    setup_automagic_props()
+    # add to app handlers
+    scene_update_handlers = bpy.app.handlers.scene_update_post
+    observe not in scene_update_handlers and scene_update_handlers.append(observe)
+
+def unregister():
+    global automagic_observer_update
+    scene_update_handlers = bpy.app.handlers.scene_update_post
+    observe in scene_update_handlers and scene_update_handlers.remove(observe)
+    automagic_observer_update = None
+
+if __name__ == '__main__':
+    register()
+    # TODO adjust anim length based on int prop OR (if boolean) change magnitude
+    keyframe_transform(bpy.context.scene.objects.active, 'location', 10)
+
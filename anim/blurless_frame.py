@@ -20,8 +20,10 @@ def is_vecblur_node(obj):
     """Check if the object is a vector blur node"""
     return obj and obj.type == 'VECBLUR'
 
-def move_playhead(frames, scene=bpy.context.scene):
+def move_playhead(frames, scene=None):
     """Move the timeline playhead relative to its current frame position"""
+    if scene is None:
+        scene = bpy.context.scene
     if frames and scene:
         scene.frame_current += frames
     return scene.frame_current
@@ -52,8 +54,10 @@ def set_blurless_node(node, frames, factor):
         key_vecblur(node, kf[0], framejump=kf[1])
     return True
 
-def handle_blurless_stint(tree=bpy.context.scene.node_tree, blurless_frames=1, blurless_factor=0.0):
+def handle_blurless_stint(tree=None, blurless_frames=1, blurless_factor=0.0):
     """Turn off blurring on all vector blur nodes during frames count"""
+    if tree is None:
+        tree = bpy.context.scene.node_tree
     if not is_node_tree(tree) or not blurless_frames:
         return
     nodes = get_vecblur_nodes(tree)
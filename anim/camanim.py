@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 import bpy
-from math import log
-from mathutils import Vector
+import numpy as np
 from bpy.props import *
+from keyframe_shifter import object_action, write_action_keys
 
 ## CamAnim
 ## a Blender Python extension by Joshua R (GitHub user Botmasher)
@@ -24,6 +24,15 @@ from bpy.props import *
 
 # TODO allow for undoing keyframing along path and resetting it
 
+# NOTE sorted markers are cached and only rescanned when the scene's objects change
+# - object count or scene changes, a cached marker is deleted or renamed, or undo/redo/load runs
+# - "Refresh markers" forces a rescan
+
+# spline samples per segment in the arc length tables
+arc_samples = 64
+# solved marker paths kept around for retiming
+max_cached_paths = 8
+
 # NOTE sketch procedure to get all cameras
 def get_scene_cameras():
 	cams = []
@@ -36,33 +45,150 @@ def get_scene_cameras():
 # UI props for setting keyframing params
 def setup_cam_ui_props():
 	Cam = bpy.types.Camera
-	cam.camanim_frames_per_space = FloatProperty(name="Location frames", description="How many frames to count between location units", default=3)
+	Cam.camanim_frames_per_space = FloatProperty(name="Location frames", description="How many frames to count between location units", default=3)
 	Cam.camanim_frames_per_degree = FloatProperty(name="Rotation frames", description="How many frames to count between rotation degrees", default=0.1)
 	Cam.camanim_min_frames_per_kf = IntProperty(name="Min in-betweens", description="Minimum number of frames between keyframes", default=0)
 	Cam.camanim_max_frames_per_kf = IntProperty(name="Max in-betweens", description="Maximum number of frames between keyframes", default=9999)
 	Cam.camanim_frames_pause = IntProperty(name="Pause frames", description="Length of \"long keyframes\" between movements", default=3)
+	Cam.camanim_smooth = BoolProperty(name="Smooth path", description="Fly along a spline through the markers instead of keying only the marker poses", default=False)
+	Cam.camanim_key_step = IntProperty(name="Key every", description="Frames between baked keys along a smooth path (1 keys every frame)", default=1, min=1)
 	return
 
+## Spline path math
+# NOTE markers are joined with a centripetal Catmull-Rom spline (alpha 0.5) and rotations slerped between marker quaternions
+
+def solve_spline(points, alpha=0.5):
+	"""Compute the four control points and knots of each Catmull-Rom segment through the points"""
+	# extend the ends so the first and last segments have neighbors
+	padded = np.concatenate([[2 * points[0] - points[1]], points, [2 * points[-1] - points[-2]]])
+	p0, p1, p2, p3 = padded[:-3], padded[1:-2], padded[2:-1], padded[3:]
+	def knot_interval(a, b):
+		# coincident markers still get a tiny interval to avoid dividing by zero
+		return np.maximum(np.linalg.norm(b - a, axis=1) ** alpha, 1e-6)
+	t1 = knot_interval(p0, p1)
+	t2 = t1 + knot_interval(p1, p2)
+	t3 = t2 + knot_interval(p2, p3)
+	return {'points': (p0, p1, p2, p3), 'knots': (t1, t2, t3)}
+
+def spline_points(spline, segments, params):
+	"""Evaluate spline segments at params from 0 to 1 - one point per (segment, param) pair"""
+	p0, p1, p2, p3 = [p[segments] for p in spline['points']]
+	t1, t2, t3 = [t[segments][:, None] for t in spline['knots']]
+	t = t1 + np.asarray(params)[:, None] * (t2 - t1)
+	# Barry-Goldman pyramid with t0 = 0
+	a1 = (t1 - t) / t1 * p0 + t / t1 * p1
+	a2 = (t2 - t) / (t2 - t1) * p1 + (t - t1) / (t2 - t1) * p2
+	a3 = (t3 - t) / (t3 - t2) * p2 + (t - t2) / (t3 - t2) * p3
+	b1 = (t2 - t) / t2 * a1 + t / t2 * a2
+	b2 = (t3 - t) / (t3 - t1) * a2 + (t - t1) / (t3 - t1) * a3
+	return (t2 - t) / (t2 - t1) * b1 + (t - t1) / (t2 - t1) * b2
+
+def euler_to_quaternions(eulers):
+	"""Convert XYZ euler rows to (w, x, y, z) quaternion rows"""
+	c = np.cos(eulers / 2)
+	s = np.sin(eulers / 2)
+	return np.stack([
+		c[:, 0] * c[:, 1] * c[:, 2] + s[:, 0] * s[:, 1] * s[:, 2],
+		s[:, 0] * c[:, 1] * c[:, 2] - c[:, 0] * s[:, 1] * s[:, 2],
+		c[:, 0] * s[:, 1] * c[:, 2] + s[:, 0] * c[:, 1] * s[:, 2],
+		c[:, 0] * c[:, 1] * s[:, 2] - s[:, 0] * s[:, 1] * c[:, 2]
+	], axis=1)
+
+def quaternions_to_euler(quats, first_euler):
+	"""Convert (w, x, y, z) quaternion rows to XYZ eulers kept continuous and starting near first_euler"""
+	w, x, y, z = quats.T
+	eulers = np.stack([
+		np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y)),
+		np.arcsin(np.clip(2 * (w * y - z * x), -1, 1)),
+		np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+	], axis=1)
+	eulers = np.unwrap(eulers, axis=0)
+	# match the marker's own winding instead of the -pi to pi range
+	return eulers + np.round((first_euler - eulers[0]) / (2 * np.pi)) * 2 * np.pi
+
+def slerp(quats_from, quats_to, params):
+	"""Spherically interpolate between rows of quaternions at params from 0 to 1"""
+	dots = np.clip(np.sum(quats_from * quats_to, axis=1), -1, 1)
+	angles = np.arccos(dots)[:, None]
+	params = np.asarray(params)[:, None]
+	sines = np.sin(angles)
+	# nearly equal rotations blend linearly
+	close = sines[:, 0] < 1e-6
+	sines[close] = 1
+	weights_from = np.where(close[:, None], 1 - params, np.sin((1 - params) * angles) / sines)
+	weights_to = np.where(close[:, None], params, np.sin(params * angles) / sines)
+	quats = weights_from * quats_from + weights_to * quats_to
+	return quats / np.linalg.norm(quats, axis=1)[:, None]
+
+def solve_path(locs, rots, alpha=0.5, samples=arc_samples):
+	"""Fit a spline through marker locations and tabulate each segment's arc length
+
+	The result holds everything retiming needs, so new timings reuse it without re-solving.
+	"""
+	spline = solve_spline(locs, alpha=alpha)
+	segment_count = len(locs) - 1
+	params = np.linspace(0, 1, samples + 1)
+	points = spline_points(spline, np.repeat(np.arange(segment_count), samples + 1), np.tile(params, segment_count))
+	steps = np.linalg.norm(np.diff(points.reshape(segment_count, samples + 1, 3), axis=1), axis=2)
+	arc_lengths = np.concatenate([np.zeros((segment_count, 1)), np.cumsum(steps, axis=1)], axis=1)
+	# keep neighboring rotations in the same hemisphere so slerp takes the short way round
+	quats = euler_to_quaternions(rots)
+	for i in range(1, len(quats)):
+		if np.dot(quats[i - 1], quats[i]) < 0:
+			quats[i] = -quats[i]
+	angles = 2 * np.arccos(np.clip(np.abs(np.sum(quats[:-1] * quats[1:], axis=1)), 0, 1))
+	return {
+		'locs': locs,
+		'spline': spline,
+		'params': params,
+		'arc_lengths': arc_lengths,
+		'lengths': arc_lengths[:, -1],
+		'quats': quats,
+		'angles': np.degrees(angles),
+		'first_euler': rots[0]
+	}
+
 class CamAnim:
 	def __init__(self, marker_name_text="camanim_marker"):
 		# internal refs for building and storing markers
 		self.sorted_markers = []                  # marker objects store cam loc-rot state
 		self.marker_name_text = marker_name_text  # unique string found only in marker names - suffix added on duplication
 		self.current_marker = None
+		self.marker_indexes = {}                  # marker name: index along path
+		self.marker_suffixes = []                 # sorted numeral suffixes of the sorted markers
+		self.markers_key = None                   # (scene name, object count) when markers were last sorted
+		self.solved_paths = {}                    # marker poses: solved spline path and arc length tables
 		return None
 
+	def invalidate_markers(self):
+		"""Rescan scene objects for markers on the next lookup"""
+		self.markers_key = None
+		return None
+
+	def markers_are_current(self):
+		"""Check that the cached sorted markers still match the scene objects"""
+		scene = bpy.context.scene
+		if self.markers_key != (scene.name, len(scene.objects)):
+			return False
+		try:
+			for i in range(len(self.sorted_markers)):
+				if self.marker_indexes.get(self.sorted_markers[i].name) != i:
+					return False
+		except ReferenceError:
+			# a cached marker was deleted
+			return False
+		return True
+
+	def marker_suffix(self, obj):
+		"""Read the numeral suffixed to a marker name, or None if the name has no numeral"""
+		suffix = obj.name.split(".")[-1]
+		return int(suffix) if suffix.isdigit() else None
+
 	def find_highest_suffix(self):
 		"""Find the highest numeral suffixed to placed marker names"""
-		highest_i = 0
-		found_marker = False
-		for obj in bpy.context.scene.objects:
-			if self.is_marker(obj):
-				found_marker = True
-				split_name = obj.name.split(".")
-				marker_i = int(split_name[len(split_name)-1]) if len(split_name) > 0 else 0
-				highest_i = marker_i if marker_i > highest_i else highest_i
-		if found_marker:
-			return highest_i
+		self.sort_markers()
+		if self.marker_suffixes:
+			return self.marker_suffixes[-1]
 		else:
 			return -1
 
@@ -84,6 +210,7 @@ class CamAnim:
 		marker.location = camera.location
 
 		self.current_marker = marker
+		self.invalidate_markers()
 		return marker
 
 	def replace_marker(self, camera, marker):
@@ -106,6 +233,7 @@ class CamAnim:
 		if self.is_marker(marker):
 			bpy.context.scene.objects.unlink(marker)					# remove from scene
 			bpy.data.objects.remove(marker, do_unlink=True)		# delete and verify unlink from whole project
+			self.invalidate_markers()
 		return marker
 
 	def remove_current_marker(self):
@@ -135,11 +263,7 @@ class CamAnim:
 		if len(self.sorted_markers) < 1:
 			return 0
 		# determine index to jump from
-		current_index = 0
-		if self.current_marker is not None: 	# else current_index = 0
-			for i in range(len(self.sorted_markers)):
-				if self.sorted_markers[i] == self.current_marker:
-					current_index = i
+		current_index = self.get_marker_index(self.current_marker) or 0
 		# add index to jump to
 		jump_i = current_index + marker_count
 		# clamp jump to marker list length
@@ -179,11 +303,11 @@ class CamAnim:
 		"""Return the index along path of the current marker"""
 		if marker is not None:
 			self.sort_markers()
-			marker_i = None
-			for i in range(len(self.sorted_markers)):
-				if self.sorted_markers[i] == marker:
-					marker_i = i
-			if marker_i is not None: return marker_i
+			try:
+				marker_i = self.marker_indexes.get(marker.name)
+			except ReferenceError:
+				return None
+			if marker_i is not None and self.sorted_markers[marker_i] == marker: return marker_i
 		return None
 
 	def snap_cam_to_marker(self, camera, marker):
@@ -193,70 +317,191 @@ class CamAnim:
 		self.current_marker = marker
 		return marker
 
-	def sort_markers(self):
-		"""Retrieve well-named markers and sort from earliest to latest"""
+	def sort_markers(self, force=False):
+		"""Retrieve well-named markers and sort from earliest to latest, reusing the last sort until objects change"""
+		if not force and self.markers_are_current():
+			return self.sorted_markers
 
 		marker_indexes = [] 	# store all suffix "indexes" to sort
 		markers_by_index = {} 	# marker_index: marker_object pairs for hash retrieval after sort
 
 		# catalog indexes suffixed to all marker objects
 		# NOTE relies on proper name formatting on marker creation
-		for obj in bpy.context.scene.objects:
+		scene = bpy.context.scene
+		for obj in scene.objects:
 			if self.is_marker(obj):
-				marker_split_name = obj.name.split(".") 	# "name_base.nnn"
-				marker_index = int(marker_split_name[len(marker_split_name)-1])
+				marker_index = self.marker_suffix(obj) 	# "name_base.nnn"
+				if marker_index is None: continue
 				markers_by_index[marker_index] = obj
 				marker_indexes.append(marker_index)
 		# sort split suffixes and grab markers in that order
 		marker_indexes.sort()
 		markers = [markers_by_index[i] for i in marker_indexes]
 		self.sorted_markers = markers
+		self.marker_suffixes = marker_indexes
+		self.marker_indexes = {markers[i].name: i for i in range(len(markers))}
+		self.markers_key = (scene.name, len(scene.objects))
 		return markers
 
+	def plan_keyframes(self, markers, frame_start, frames_per_space=3, frames_per_degree=0.1, min_frames_per_kf=0, max_frames_per_kf=9999, frames_pause=3):
+		"""Compute every keyframe time and pose along the markers up front
+
+		Returns an array of keyframe frames and matching location and rotation arrays.
+		"""
+		count = len(markers)
+		locs = np.array([tuple(marker.location) for marker in markers], dtype=np.float64).reshape(-1, 3)
+		rots = np.array([tuple(marker.rotation_euler) for marker in markers], dtype=np.float64).reshape(-1, 3)
+
+		# frames between each marker and the next
+		# smooth frame count over distance to give sense of reaching top speed
+		loc_distances = np.linalg.norm(np.diff(locs, axis=0), axis=1)
+		rot_distances = np.linalg.norm(np.diff(rots, axis=0), axis=1) * 57.2958
+		added_loc_frames = np.log2(np.maximum(1, 10 * frames_per_space * loc_distances)).astype(int)
+		added_rot_frames = np.log2(np.maximum(1, frames_per_degree * rot_distances)).astype(int)
+		# clamp frame count between the two keyframes
+		move_frames = np.append(np.clip(added_loc_frames + added_rot_frames, min_frames_per_kf, max_frames_per_kf), 0)
+
+		# start/end stasis gaps hold the pose at every marker but the first and last
+		pauses = np.zeros(count, dtype=int)
+		if frames_pause > 0 and count > 2:
+			pauses[1:-1] = frames_pause
+		marker_frames = frame_start + np.concatenate([[0], np.cumsum(pauses + move_frames)[:-1]])
+
+		# one key arriving at each marker plus one leaving it after a pause
+		paused = pauses > 0
+		frames = np.concatenate([marker_frames, (marker_frames + pauses)[paused]])
+		poses = np.concatenate([np.arange(count), np.flatnonzero(paused)])
+		# a later key on the same frame replaces an earlier one, like repeated keyframe_insert
+		key_order = np.concatenate([2 * np.arange(count), 2 * np.flatnonzero(paused) + 1])
+		order = np.lexsort((key_order, frames))
+		frames, poses = frames[order], poses[order]
+		last_on_frame = np.append(frames[1:] != frames[:-1], True)
+		frames, poses = frames[last_on_frame], poses[last_on_frame]
+		return (frames.astype(np.float64), locs[poses], rots[poses])
+
+	def write_keyframes(self, camera, frames, locs, rots):
+		"""Replace the camera's location and rotation keys within the frames' span in one batch per fcurve"""
+		action = object_action(camera)
+		# clear old keys along the path but keep any before or after it
+		write_action_keys(action, 'location', frames, locs, replace_range=True)
+		write_action_keys(action, 'rotation_euler', frames, rots, replace_range=True)
+		return action
+
+	def solve_marker_path(self, markers, alpha=0.5):
+		"""Solve the spline path through markers once per set of marker poses"""
+		locs = np.array([tuple(marker.location) for marker in markers], dtype=np.float64).reshape(-1, 3)
+		rots = np.array([tuple(marker.rotation_euler) for marker in markers], dtype=np.float64).reshape(-1, 3)
+		key = (locs.tobytes(), rots.tobytes(), alpha)
+		if key not in self.solved_paths:
+			len(self.solved_paths) >= max_cached_paths and self.solved_paths.clear()
+			self.solved_paths[key] = solve_path(locs, rots, alpha=alpha)
+		return self.solved_paths[key]
+
+	def plan_spline_keyframes(self, path, frame_start, frames_per_space=3, frames_per_degree=0.1, min_frames_per_kf=0, max_frames_per_kf=9999, frames_pause=3, key_step=1):
+		"""Time a solved path by arc length and rotation and sample keys every key_step frames
+
+		Returns an array of keyframe frames and matching location and rotation arrays.
+		"""
+		lengths = path['lengths']
+		segment_count = len(lengths)
+		# frames per segment grow with distance travelled and degrees turned
+		move_frames = np.maximum(1, np.clip(np.round(frames_per_space * lengths + frames_per_degree * path['angles']), min_frames_per_kf, max_frames_per_kf)).astype(int)
+		pauses = np.zeros(segment_count + 1, dtype=int)
+		if frames_pause > 0 and segment_count > 1:
+			pauses[1:-1] = frames_pause
+		marker_frames = frame_start + np.concatenate([[0], np.cumsum(pauses[:-1] + move_frames)])
+		departures = marker_frames[:-1] + pauses[:-1]
+
+		# sampled frames within each segment then every marker arrival
+		segments = []
+		offsets = []
+		for i in range(segment_count):
+			segment_offsets = np.arange(0, move_frames[i], max(1, key_step))
+			segments.append(np.full(len(segment_offsets), i))
+			offsets.append(segment_offsets)
+		segments = np.concatenate(segments)
+		offsets = np.concatenate(offsets)
+		progress = offsets / move_frames[segments]
+
+		# constant speed within a segment - map travelled distance back to spline params
+		params = np.empty(len(segments))
+		for i in range(segment_count):
+			in_segment = segments == i
+			params[in_segment] = np.interp(progress[in_segment] * lengths[i], path['arc_lengths'][i], path['params'])
+		locs = spline_points(path['spline'], segments, params)
+		quats = slerp(path['quats'][segments], path['quats'][segments + 1], progress)
+
+		# hold each marker's pose from its arrival until the pause ends
+		held = pauses > 0
+		frames = np.concatenate([departures[segments] + offsets, marker_frames[held], marker_frames[-1:]])
+		locs = np.concatenate([locs, path['locs'][held], path['locs'][-1:]])
+		quats = np.concatenate([quats, path['quats'][held], path['quats'][-1:]])
+		order = np.argsort(frames, kind='stable')
+		rots = quaternions_to_euler(quats[order], path['first_euler'])
+		return (frames[order].astype(np.float64), locs[order], rots)
+
+	def animate_spline(self, camera, frames_per_space=3, frames_per_degree=0.1, min_frames_per_kf=0, max_frames_per_kf=9999, frames_pause=3, key_step=1, alpha=0.5):
+		"""Fly the camera along a smooth spline through placed markers, baking keys every key_step frames"""
+		self.sort_markers()
+		if len(self.sorted_markers) < 2: return self.animate(camera, frames_pause=frames_pause)
+		scene = bpy.context.scene
+		path = self.solve_marker_path(self.sorted_markers, alpha=alpha)
+		frames, locs, rots = self.plan_spline_keyframes(
+			path,
+			scene.frame_start + 1,
+			frames_per_space=frames_per_space,
+			frames_per_degree=frames_per_degree,
+			min_frames_per_kf=min_frames_per_kf,
+			max_frames_per_kf=max_frames_per_kf,
+			frames_pause=frames_pause,
+			key_step=key_step
+		)
+		self.write_keyframes(camera, frames, locs, rots)
+		self.snap_cam_to_marker(camera, self.sorted_markers[-1])
+
+		# stretch timeline to fit keyframes
+		if frames[-1] > scene.frame_end:
+			scene.frame_end = int(frames[-1]) + 1
+
+		return None
+
 	def animate(self, camera, frames_per_space=3, frames_per_degree=0.1, min_frames_per_kf=0, max_frames_per_kf=9999, frames_pause=3):
 		"""Use placed markers to set keyframes timed out by frames per loc and rot unit"""
 		self.sort_markers()
-		bpy.context.scene.frame_current = bpy.context.scene.frame_start + 1
+		if len(self.sorted_markers) < 1: return None
+		scene = bpy.context.scene
 
 		# keyframe cam along markers
-		for i in range(len(self.sorted_markers)):
-			marker = self.sorted_markers[i]
-			self.snap_cam_to_marker(camera, marker)
-			camera.keyframe_insert("location")
-			camera.keyframe_insert("rotation_euler")
-			# start/end stasis gaps
-			if 0 < i < len(self.sorted_markers) - 1 and frames_pause > 0:
-				bpy.context.scene.frame_current += frames_pause
-				camera.keyframe_insert("location")
-				camera.keyframe_insert("rotation_euler")
-
-			# calculate diff between keyframes
-			if i < len(self.sorted_markers) - 1:
-				this_marker = self.sorted_markers[i]
-				next_marker = self.sorted_markers[i + 1]
-				loc_distance = (next_marker.location - this_marker.location).length
-				rot_distance = (Vector(next_marker.rotation_euler) - Vector(this_marker.rotation_euler)).magnitude * 57.2958
-				# smooth frame count over distance to give sense of reaching top speed
-				added_loc_frames = int(log(max(1, 10 * frames_per_space * loc_distance), 2))
-				added_rot_frames = int(log(max(1, frames_per_degree * rot_distance), 2))
-				added_frames = added_loc_frames + added_rot_frames
-				# clamp frame count between the two keyframes
-				clamped_frames = min(max(min_frames_per_kf, int(added_frames)), max_frames_per_kf)
-			else:
-				clamped_frames = 0
-			bpy.context.scene.frame_current += clamped_frames
+		frames, locs, rots = self.plan_keyframes(
+			self.sorted_markers,
+			scene.frame_start + 1,
+			frames_per_space=frames_per_space,
+			frames_per_degree=frames_per_degree,
+			min_frames_per_kf=min_frames_per_kf,
+			max_frames_per_kf=max_frames_per_kf,
+			frames_pause=frames_pause
+		)
+		self.write_keyframes(camera, frames, locs, rots)
+		self.snap_cam_to_marker(camera, self.sorted_markers[-1])
 
 		# stretch timeline to fit keyframes
-		if bpy.context.scene.frame_current > bpy.context.scene.frame_end:
-			bpy.context.scene.frame_end = bpy.context.scene.frame_current + 1
+		if frames[-1] > scene.frame_end:
+			scene.frame_end = int(frames[-1]) + 1
 
 		return None
 
 camanim = CamAnim()
 
-def is_camera(obj=bpy.context.scene.objects.active):
+@bpy.app.handlers.persistent
+def invalidate_camanim_markers(*args):
+	"""Handler dropping cached markers after undo, redo or loading a file"""
+	camanim.invalidate_markers()
+
+def is_camera(obj=None):
 	"""Check if an object has type 'CAMERA'"""
-	return ctx.scene.objects.active.type == ctx.scene.camera.type
+	if obj is None:
+		obj = bpy.context.scene.objects.active
+	return obj is not None and obj.type == 'CAMERA'
 
 class CamAnimPanel(bpy.types.Panel):
 	bl_label = "CamAnim"
@@ -266,7 +511,6 @@ class CamAnimPanel(bpy.types.Panel):
 	bl_category = "CamAnim"
 
 	def draw(self, ctx):
-		setup_cam_ui_props()
 
 		layout = self.layout
 
@@ -307,6 +551,9 @@ class CamAnimPanel(bpy.types.Panel):
 				col.row().prop(cam, "camanim_min_frames_per_kf")
 				col.row().prop(cam, "camanim_max_frames_per_kf")
 				col.row().prop(cam, "camanim_frames_pause")
+				col.row().prop(cam, "camanim_smooth")
+				if cam.camanim_smooth:
+					col.row().prop(cam, "camanim_key_step")
 				col.row().operator("camera.camanim_animate", text="Keyframe camera")
 
 		# invalid selection
@@ -370,6 +617,7 @@ class CamAnimRefreshMarkers(bpy.types.Operator):
 		return ctx.mode == "OBJECT"
 
 	def execute(self, ctx):
+		camanim.sort_markers(force=True)
 		camanim.jump_marker(bpy.context.scene.camera, 0)
 		return {'FINISHED'}
 
@@ -452,14 +700,32 @@ class CamAnimAnimate(bpy.types.Operator):
 		return ctx.mode == "OBJECT"
 
 	def execute(self, ctx):
-		camanim.animate(bpy.context.scene.camera)
+		camera = bpy.context.scene.camera
+		cam = camera.data
+		timing = {
+			'frames_per_space': cam.camanim_frames_per_space,
+			'frames_per_degree': cam.camanim_frames_per_degree,
+			'min_frames_per_kf': cam.camanim_min_frames_per_kf,
+			'max_frames_per_kf': cam.camanim_max_frames_per_kf,
+			'frames_pause': cam.camanim_frames_pause
+		}
+		if cam.camanim_smooth:
+			camanim.animate_spline(camera, key_step=cam.camanim_key_step, **timing)
+		else:
+			camanim.animate(camera, **timing)
 		return {'FINISHED'}
 
 def register():
+	setup_cam_ui_props()
+	for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+		invalidate_camanim_markers not in handlers and handlers.append(invalidate_camanim_markers)
 	bpy.utils.register_class(CamAnimPanel)
 	bpy.utils.register_module(__name__)
 
 def unregister():
+	for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+		invalidate_camanim_markers in handlers and handlers.remove(invalidate_camanim_markers)
+	camanim.invalidate_markers()
 	bpy.utils.unregister_class(CamAnimPanel)
 	bpy.utils.unregister_module(__name__)
 
@@ -108,8 +108,10 @@ class MaterialColorizer:
 		self.set_material_attributes(material, material_attributes)
 		return
 
-	def color_object_material(self, obj=bpy.context.scene.objects.active, color_name=None, existing_material=False):
+	def color_object_material(self, obj=None, color_name=None, existing_material=False):
 		"""Give selected object a material with a named color"""
+		if obj is None:
+			obj = bpy.context.scene.objects.active
 		if color_name not in self.color_map: return False
 		if existing_material:
 			material = obj.active_material
@@ -119,7 +121,8 @@ class MaterialColorizer:
 		self.assign_color(material, color_name)
 		return True
 
-# Default scene test
-mc = MaterialColorizer(name_base="color-")
-mc.add_color('purple', (0.3, 0.0, 0.9))
-mc.color_object_material(color_name='purple')
+if __name__ == '__main__':
+	# Default scene test
+	mc = MaterialColorizer(name_base="color-")
+	mc.add_color('purple', (0.3, 0.0, 0.9))
+	mc.color_object_material(color_name='purple')
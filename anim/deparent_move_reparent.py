@@ -88,5 +88,6 @@ def deparent_move_reparent(move_to_new_parent=True, reparent=True):
 
     return objs
 
-# test deparent + keep world pos
-deparent_move_reparent()
+if __name__ == '__main__':
+    # test deparent + keep world pos
+    deparent_move_reparent()
@@ -0,0 +1,262 @@
+import os
+import mmap
+import struct
+import hashlib
+import threading
+import numpy as np
+
+## Font Metrics
+##
+## Blender Python script by Joshua R (GitHub user Botmasher)
+##
+## Glyph advance widths and kerning pairs read straight from TrueType/OpenType font
+## files (cmap, hmtx and kern tables), so letter layout needs no objects or scene
+## updates to measure text.
+##
+## Parsed metrics are saved as .npz files keyed by a hash of the font file's
+## contents, so each font file is only parsed once across Blender sessions.
+##
+## Usage:
+##     import font_metrics
+##     metrics = font_metrics.load("/path/to/font.ttf")
+##     offsets = metrics.layout("Title", spacing=0.1)
+##
+## The cache directory defaults to ~/.cache/blender-font-metrics. Set the
+## BLENDER_FONT_CACHE environment variable to move it.
+
+cache_dir = os.environ.get('BLENDER_FONT_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'blender-font-metrics'))
+
+# cmap subtables in order of preference - (platform, encoding)
+cmap_preference = [(3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)]
+
+cache_lock = threading.Lock()
+# (path, size, mtime): FontMetrics already loaded this session
+loaded = {}
+
+class FontMetrics:
+    """Advance widths and kerning for one font, in Blender units for a text size of 1"""
+    def __init__(self, units_per_em, codepoints, glyphs, advances, kern_pairs):
+        self.units_per_em = int(units_per_em)
+        self.scale = 1.0 / self.units_per_em
+        self.glyph_of = dict(zip(codepoints.tolist(), glyphs.tolist()))
+        self.advances = advances
+        # (left glyph << 16 | right glyph): kerning value
+        self.kerning_of = dict(zip(((kern_pairs[:, 0] << 16) | kern_pairs[:, 1]).tolist(), kern_pairs[:, 2].tolist()))
+
+    def glyph(self, char):
+        """Glyph index for a character - 0 (missing glyph) if the font lacks it"""
+        return self.glyph_of.get(ord(char), 0)
+
+    def advance(self, char):
+        """Distance from this character's origin to the next one's"""
+        glyph = self.glyph(char)
+        if not len(self.advances):
+            return 0.0
+        return float(self.advances[min(glyph, len(self.advances) - 1)]) * self.scale
+
+    def kerning(self, left, right):
+        """Adjustment to the gap between two characters"""
+        return self.kerning_of.get(self.glyph(left) << 16 | self.glyph(right), 0) * self.scale
+
+    def layout(self, text, spacing=0.0):
+        """Origin offset of every character in a line of text, kerned and spread by spacing"""
+        if not text:
+            return np.zeros(0)
+        advances = np.array([self.advance(char) for char in text])
+        kerns = np.array([self.kerning(left, right) for left, right in zip(text[:-1], text[1:])])
+        return np.concatenate([[0.0], np.cumsum(advances[:-1] + kerns + spacing)])
+
+## Font file parsing
+
+def read_tables(data, font_index=0):
+    """Map table tags to (offset, length) in an sfnt font file or font collection"""
+    tag = data[0:4]
+    offset = 0
+    if tag == b'ttcf':
+        count = struct.unpack_from('>I', data, 8)[0]
+        offset = struct.unpack_from('>I', data, 12 + 4 * min(font_index, count - 1))[0]
+    elif tag not in (b'\x00\x01\x00\x00', b'OTTO', b'true'):
+        raise ValueError("Not a TrueType or OpenType font")
+    count = struct.unpack_from('>H', data, offset + 4)[0]
+    tables = {}
+    for i in range(count):
+        table_tag, checksum, table_offset, length = struct.unpack_from('>4sIII', data, offset + 12 + 16 * i)
+        tables[table_tag.decode('latin-1')] = (table_offset, length)
+    return tables
+
+def read_cmap_format_4(data, offset):
+    """Character to glyph pairs from a segment mapping subtable"""
+    seg_count = struct.unpack_from('>H', data, offset + 6)[0] // 2
+    ends_at = offset + 14
+    starts_at = ends_at + 2 * seg_count + 2
+    deltas_at = starts_at + 2 * seg_count
+    range_offsets_at = deltas_at + 2 * seg_count
+    ends = struct.unpack_from('>{0}H'.format(seg_count), data, ends_at)
+    starts = struct.unpack_from('>{0}H'.format(seg_count), data, starts_at)
+    deltas = struct.unpack_from('>{0}h'.format(seg_count), data, deltas_at)
+    range_offsets = struct.unpack_from('>{0}H'.format(seg_count), data, range_offsets_at)
+    codepoints = []
+    glyphs = []
+    for i in range(seg_count):
+        if starts[i] == 0xFFFF:
+            continue
+        chars = np.arange(starts[i], ends[i] + 1)
+        if range_offsets[i] == 0:
+            segment_glyphs = (chars + deltas[i]) & 0xFFFF
+        else:
+            # glyph ids are stored in an array found relative to this segment's range offset
+            at = range_offsets_at + 2 * i + range_offsets[i]
+            segment_glyphs = np.frombuffer(data, dtype='>u2', count=len(chars), offset=at).astype(np.int64)
+            segment_glyphs = np.where(segment_glyphs != 0, (segment_glyphs + deltas[i]) & 0xFFFF, 0)
+        codepoints.append(chars)
+        glyphs.append(segment_glyphs)
+    return (np.concatenate(codepoints), np.concatenate(glyphs)) if codepoints else (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+def read_cmap_format_12(data, offset):
+    """Character to glyph pairs from a segmented coverage subtable"""
+    count = struct.unpack_from('>I', data, offset + 12)[0]
+    groups = np.frombuffer(data, dtype='>u4', count=count * 3, offset=offset + 16).reshape(-1, 3).astype(np.int64)
+    lengths = groups[:, 1] - groups[:, 0] + 1
+    # codepoints count up through each group alongside its glyphs
+    steps = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return (np.repeat(groups[:, 0], lengths) + steps, np.repeat(groups[:, 2], lengths) + steps)
+
+def read_cmap(data, offset):
+    """Codepoints and glyph ids from the font's preferred unicode cmap subtable"""
+    count = struct.unpack_from('>H', data, offset + 2)[0]
+    subtables = {}
+    for i in range(count):
+        platform, encoding, subtable_offset = struct.unpack_from('>HHI', data, offset + 4 + 8 * i)
+        subtables.setdefault((platform, encoding), offset + subtable_offset)
+    for key in cmap_preference:
+        if key not in subtables:
+            continue
+        subtable = subtables[key]
+        table_format = struct.unpack_from('>H', data, subtable)[0]
+        if table_format == 4:
+            return read_cmap_format_4(data, subtable)
+        if table_format == 12:
+            return read_cmap_format_12(data, subtable)
+    raise ValueError("No supported unicode cmap subtable")
+
+def read_advances(data, tables):
+    """Advance width of every glyph from hhea and hmtx"""
+    metrics_count = struct.unpack_from('>H', data, tables['hhea'][0] + 34)[0]
+    advances = np.frombuffer(data, dtype='>u2', count=metrics_count * 2, offset=tables['hmtx'][0])[0::2].astype(np.int64)
+    glyph_count = struct.unpack_from('>H', data, tables['maxp'][0] + 4)[0]
+    # glyphs past the last metric share its advance
+    if glyph_count > metrics_count:
+        advances = np.concatenate([advances, np.full(glyph_count - metrics_count, advances[-1])])
+    return advances
+
+def read_kern_pairs(data, offset):
+    """(left glyph, right glyph, value) rows summed over horizontal format 0 kern subtables"""
+    version = struct.unpack_from('>H', data, offset)[0]
+    if version == 0:
+        # Windows kern table
+        count = struct.unpack_from('>H', data, offset + 2)[0]
+        at = offset + 4
+    else:
+        # Apple kern table with 32-bit version and count
+        count = struct.unpack_from('>I', data, offset + 4)[0]
+        at = offset + 8
+    pairs = []
+    for i in range(count):
+        if version == 0:
+            length, coverage = struct.unpack_from('>2xHH', data, at)
+            table_format, horizontal, skip = coverage >> 8, coverage & 1, coverage & 0x6
+            header = 6
+        else:
+            length, coverage = struct.unpack_from('>IH', data, at)
+            table_format, horizontal, skip = coverage & 0xFF, not coverage & 0x8000, coverage & 0x6000
+            header = 8
+        # only plain horizontal pairs - no minimum or cross-stream subtables
+        if table_format == 0 and horizontal and not skip:
+            pair_count = struct.unpack_from('>H', data, at + header)[0]
+            rows = np.frombuffer(data, dtype=np.dtype([('left', '>u2'), ('right', '>u2'), ('value', '>i2')]), count=pair_count, offset=at + header + 8)
+            pairs.append(np.stack([rows['left'], rows['right'], rows['value']], axis=1).astype(np.int64))
+        at += length
+    if not pairs:
+        return np.zeros((0, 3), dtype=np.int64)
+    pairs = np.concatenate(pairs)
+    # values for a pair repeated across subtables add up
+    keys, inverse = np.unique(pairs[:, 0] << 16 | pairs[:, 1], return_inverse=True)
+    values = np.bincount(inverse.ravel(), weights=pairs[:, 2]).astype(np.int64)
+    return np.stack([keys >> 16, keys & 0xFFFF, values], axis=1)
+
+def parse_font(data):
+    """Read units per em, cmap, advances and kerning pairs from font file bytes"""
+    tables = read_tables(data)
+    for tag in ('head', 'hhea', 'hmtx', 'maxp', 'cmap'):
+        if tag not in tables:
+            raise ValueError("Font is missing its {0} table".format(tag))
+    units_per_em = struct.unpack_from('>H', data, tables['head'][0] + 18)[0]
+    codepoints, glyphs = read_cmap(data, tables['cmap'][0])
+    advances = read_advances(data, tables)
+    kern_pairs = read_kern_pairs(data, tables['kern'][0]) if 'kern' in tables else np.zeros((0, 3), dtype=np.int64)
+    return {
+        'units_per_em': np.array(units_per_em),
+        'codepoints': codepoints.astype(np.int64),
+        'glyphs': glyphs.astype(np.int64),
+        'advances': advances,
+        'kern_pairs': kern_pairs
+    }
+
+## On-disk store
+
+def hash_font(data):
+    """Hash font file contents to key its cached metrics"""
+    return hashlib.sha1(data).hexdigest()
+
+def load_entry(name):
+    """Read cached metrics arrays or return None on a miss"""
+    try:
+        with np.load(os.path.join(cache_dir, name + '.npz')) as entry:
+            return {key: entry[key] for key in entry.files}
+    except (IOError, OSError, ValueError, KeyError):
+        return None
+
+def store_entry(name, arrays):
+    """Write metrics arrays, replacing the file atomically"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, name + '.npz')
+    temp_path = "{0}.{1}.{2}.tmp".format(path, os.getpid(), threading.get_ident())
+    with open(temp_path, 'wb') as entry_file:
+        np.savez(entry_file, **arrays)
+    os.replace(temp_path, path)
+
+def load(path):
+    """Metrics for a font file, parsed once and cached on disk - None if the file is not a readable font"""
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    file_key = (path, stat.st_size, stat.st_mtime_ns)
+    if file_key in loaded:
+        return loaded[file_key]
+    try:
+        with open(path, 'rb') as font_file, mmap.mmap(font_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            name = hash_font(data)
+            with cache_lock:
+                arrays = load_entry(name)
+            font_bytes = data[:] if arrays is None else None
+        if arrays is None:
+            # parse a copy - numpy views left in a failed parse's traceback would pin the map open
+            arrays = parse_font(font_bytes)
+            with cache_lock:
+                store_entry(name, arrays)
+    except (OSError, ValueError, IndexError, BufferError, struct.error) as e:
+        print("Failed to read font metrics from {0} - {1}".format(path, e))
+        return None
+    metrics = FontMetrics(arrays['units_per_em'], arrays['codepoints'], arrays['glyphs'], arrays['advances'], arrays['kern_pairs'])
+    loaded[file_key] = metrics
+    return metrics
+
+def clear():
+    """Empty the on-disk cache and forget fonts loaded this session"""
+    loaded.clear()
+    if not os.path.isdir(cache_dir):
+        return
+    for f in os.listdir(cache_dir):
+        f.endswith('.npz') and os.remove(os.path.join(cache_dir, f))
@@ -19,7 +19,9 @@ class KeyframeOvershooter():
 			return False
 		return True
 
-	def get_selected_kfs(self, obj=bpy.context.scene.objects.active):
+	def get_selected_kfs(self, obj=None):
+		if obj is None:
+			obj = bpy.context.scene.objects.active
 		if not self.is_animated(obj):
 			return
 		kfs = []
@@ -224,19 +226,18 @@ class KfOvershootPanel(bpy.types.Panel):
 
 def register():
 	bpy.utils.register_class(KfOvershootProperties)
-	bpy.types.Scene, prop_group_name, bpy.props.PointerProperty(type=KfOvershootProperties)
+	setattr(bpy.types.Scene, prop_group_name, bpy.props.PointerProperty(type=KfOvershootProperties))
 	bpy.utils.register_class(KfOvershootOperator)
 	bpy.utils.register_class(KfOvershootPanel)
 
 def unregister():
 	bpy.utils.unregister_class(KfOvershootPanel)
 	try:
-		props_src = getattr(bpy.context.Scene, prop_group_name)
-		delete(props_src)
+		delattr(bpy.types.Scene, prop_group_name)
 	except:
 		print("Unable to remove kf_overshoot data from bpy.types.Scene")
 	bpy.utils.unregister_class(KfOvershootOperator)
-	bpy.utils.unregister_class(KfOverhootProperties)
+	bpy.utils.unregister_class(KfOvershootProperties)
 
 if __name__ == '__main__':
 	register()
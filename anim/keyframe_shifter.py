@@ -1,68 +1,205 @@
 import bpy
-from bpy.props import IntProperty
+import numpy as np
+from bpy.props import IntProperty, BoolProperty, StringProperty
 
 ## Keyframe Shifter
 ##
 ## Blender Python script by Joshua R (GitHub user Botmasher)
 ## Description: move all keyframes forward or back in time
 
-scene = bpy.context.scene
+# NOTE keyframes move in bulk per fcurve - points and both handles together
 
-# NOTE basic shift on every keyframe in one obj
+# keyframe point coordinate pairs moved along with each frame
+keyframe_coords = ('co', 'handle_left', 'handle_right')
+
+def anim_actions(objs):
+    """List each distinct action animating the objects, their data or shape keys"""
+    actions = []
+    for obj in objs:
+        data = getattr(obj, 'data', None)
+        for block in (obj, data, getattr(data, 'shape_keys', None)):
+            animation_data = getattr(block, 'animation_data', None) if block else None
+            action = animation_data.action if animation_data else None
+            # shared actions are only shifted once
+            action and action not in actions and actions.append(action)
+    return actions
+
+def matches_data_path(fcurve, data_paths=None):
+    """Check if an fcurve animates one of the data paths (substrings like 'location' or 'key_blocks')"""
+    return not data_paths or any(data_path in fcurve.data_path for data_path in data_paths)
+
+def shift_fcurve(fcurve, frameshift, frame_start=None, frame_end=None, indices=None):
+    """Move an fcurve's keyframes and handles in one batch
+
+    Only keys between frame_start and frame_end (inclusive) or at the listed key indices are moved.
+    Returns the shifted keys' (indices, new frames) in the curve's re-sorted order, or None if none moved.
+    """
+    points = fcurve.keyframe_points
+    count = len(points)
+    if not count or not frameshift:
+        return None
+    coords = {}
+    for coord in keyframe_coords:
+        coords[coord] = np.empty(count * 2, dtype=np.float32)
+        points.foreach_get(coord, coords[coord])
+    key_frames = coords['co'][0::2]
+    mask = np.ones(count, dtype=bool)
+    if frame_start is not None:
+        mask &= key_frames >= frame_start
+    if frame_end is not None:
+        mask &= key_frames <= frame_end
+    if indices is not None:
+        mask &= np.isin(np.arange(count), indices)
+    if not mask.any():
+        return None
+    for coord in keyframe_coords:
+        coords[coord][0::2][mask] += frameshift
+        points.foreach_set(coord, coords[coord])
+    fcurve.update()
+    # update() sorts keys by frame keeping ties in order - find where the shifted keys ended up
+    order = np.argsort(coords['co'][0::2], kind='stable')
+    sorted_mask = mask[order]
+    return (np.flatnonzero(sorted_mask), coords['co'][0::2][order][sorted_mask].copy())
+
+def object_action(obj):
+    """Get the action animating an object's own properties, creating one if needed"""
+    animation_data = obj.animation_data or obj.animation_data_create()
+    if not animation_data.action:
+        animation_data.action = bpy.data.actions.new("{0}Action".format(obj.name))
+    return animation_data.action
+
+def write_fcurve_keys(fcurve, frames, values, replace_range=False):
+    """Add keyframes to an fcurve in one batch, returning the fcurve
+
+    Existing keys on the written frames are replaced, or with replace_range every
+    existing key from the first to the last written frame. When a frame is listed
+    more than once its last value wins.
+    """
+    frames = np.asarray(frames, dtype=np.float32).ravel()
+    values = np.asarray(values, dtype=np.float32).ravel()
+    if not len(frames):
+        return fcurve
+    # keep the last value given for each frame
+    unique_frames, last = np.unique(frames[::-1], return_index=True)
+    keep = np.sort(len(frames) - 1 - last)
+    frames, values = frames[keep], values[keep]
+    points = fcurve.keyframe_points
+    if len(points):
+        old_co = np.empty(len(points) * 2, dtype=np.float32)
+        points.foreach_get('co', old_co)
+        old_frames = old_co[0::2]
+        if replace_range:
+            replaced = (old_frames >= unique_frames[0]) & (old_frames <= unique_frames[-1])
+        else:
+            replaced = np.isin(old_frames, frames)
+        # remove from the back so earlier indices stay valid
+        for i in reversed(np.flatnonzero(replaced).tolist()):
+            points.remove(points[i], fast=True)
+    first_new = len(points)
+    points.add(len(frames))
+    co = np.empty(len(points) * 2, dtype=np.float32)
+    first_new and points.foreach_get('co', co)
+    co[first_new * 2::2] = frames
+    co[first_new * 2 + 1::2] = values
+    points.foreach_set('co', co)
+    # sort in with kept keys and recalculate auto handles
+    fcurve.update()
+    return fcurve
+
+def write_action_keys(action, data_path, frames, values, indexes=None, replace_range=False, group="Object Transforms"):
+    """Key the listed array indexes of a vector property at many frames, one batch per fcurve
+
+    values holds a row per frame and a column per array index (all columns if indexes is None).
+    """
+    values = np.asarray(values).reshape(len(frames), -1)
+    indexes = range(values.shape[1]) if indexes is None else indexes
+    for i in indexes:
+        fcurve = action.fcurves.find(data_path, i) or action.fcurves.new(data_path, index=i, action_group=group)
+        write_fcurve_keys(fcurve, frames, values[:, i], replace_range=replace_range)
+    return action
 
 class KeyframeShifter:
     def __init__(self):
-        self.shifted_objects = []
-        self.current_object = None
-        self.modified_keyframes = {}
-
-    def is_anim_object(self):
-        if not (self.current_object and self.current_object.animation_data):
-            return False
-        if not self.current_object.animation_data.action.fcurves:
-            raise Exception("Failed to shift keyframes using keyframe_shifter - object contains no animation fcurves: {0}".format(self.current_object))
-            return False
-        return True
-
-    def set_obj(self, obj):
-        prev_obj = self.current_object
-        self.current_object = obj
-        if not self.is_anim_object():
-            self.current_object = prev_obj
+        # compact undo deltas - one list of (action name, data path, array index, shifted key indices, their frames) per shift
+        self.history = []
+        self.max_history = 32
+
+    def shift(self, objs, frameshift=0, frame_start=None, frame_end=None, data_paths=None):
+        """Move keyframes for one or many objects forwards or backwards in timeline
+
+        frame_start, frame_end  only move keys within this frame range
+        data_paths              only move fcurves whose data path contains one of these strings
+        """
+        objs = [objs] if not isinstance(objs, (list, tuple)) else objs
+        if not frameshift:
             return
-        return self.current_object
-
-    def _shift_keyframes(self, frameshift=0):
-        """Internal method to shift an object's keyframes forwards or backwards in timeline"""
-        obj_fcurves = [*self.current_object.animation_data.action.fcurves]
-        modified_kfs = []
-
-        # set all kfs within all anim fcurves
-        for fcurve in obj_fcurves:
-            for kf in fcurve.keyframe_points:
-                kf.co.x += frameshift
-                modified_kfs.append(kf)
-
-        return modified_kfs
-
-    def shift(self, obj, frameshift=0):
-        """Set the current object and run the keyframe shift"""
-        current_obj = self.set_obj(obj)
-        kfs = self._shift_keyframes(frameshift=frameshift)
-        if not (current_obj and kfs and frameshift):
+        delta = []
+        for action in anim_actions([obj for obj in objs if obj]):
+            for fcurve in action.fcurves:
+                if not matches_data_path(fcurve, data_paths):
+                    continue
+                shifted = shift_fcurve(fcurve, frameshift, frame_start=frame_start, frame_end=frame_end)
+                shifted is not None and delta.append((action.name, fcurve.data_path, fcurve.array_index, *shifted))
+        if not delta:
+            return
+        self.history.append((frameshift, delta))
+        del self.history[:-self.max_history]
+        return delta
+
+    def undo(self):
+        """Move the keys from the last shift back to where they were"""
+        if not self.history:
             return
-        # TODO revisit storage after allowing separate attr adjustments
-        self.modified_keyframes[self.current_object] = kfs
-        return kfs
+        frameshift, delta = self.history.pop()
+        for action_name, data_path, array_index, indices, frames in delta:
+            action = bpy.data.actions.get(action_name)
+            fcurve = action.fcurves.find(data_path, array_index) if action else None
+            if not fcurve:
+                continue
+            # only move keys back if they are still the ones this shift moved
+            points = fcurve.keyframe_points
+            co = np.empty(len(points) * 2, dtype=np.float32)
+            points.foreach_get('co', co)
+            if indices[-1] >= len(points) or not np.array_equal(co[0::2][indices], frames):
+                print("Skipped undoing keyframe shift on {0} {1}[{2}] - keys changed since the shift".format(action_name, data_path, array_index))
+                continue
+            shift_fcurve(fcurve, -frameshift, indices=indices)
+        return delta
 
-# TODO filter by keyframe attr (like transform, shape, ...)
 kf_shifter = KeyframeShifter()
 
-bpy.types.Scene.keyframe_shifter_frameshift = IntProperty(
-    name="Frameshift",
-    description="Frames to shift all keyframes along timeline",
-    default=1
-)
+def setup_kf_shifter_props():
+    Scene = bpy.types.Scene
+    Scene.keyframe_shifter_frameshift = IntProperty(
+        name="Frameshift",
+        description="Frames to shift all keyframes along timeline",
+        default=1
+    )
+    Scene.keyframe_shifter_selected = BoolProperty(
+        name="All Selected",
+        description="Shift keyframes on every selected object instead of only the active one",
+        default=False
+    )
+    Scene.keyframe_shifter_use_range = BoolProperty(
+        name="Frame Range",
+        description="Only shift keyframes within a frame range",
+        default=False
+    )
+    Scene.keyframe_shifter_frame_start = IntProperty(
+        name="Start",
+        description="First frame of keyframes to shift",
+        default=1
+    )
+    Scene.keyframe_shifter_frame_end = IntProperty(
+        name="End",
+        description="Last frame of keyframes to shift",
+        default=250
+    )
+    Scene.keyframe_shifter_data_paths = StringProperty(
+        name="Attributes",
+        description="Only shift these comma-separated attributes, like location, rotation, key_blocks (empty for all)",
+        default=""
+    )
 
 class KfShifterOperator(bpy.types.Operator):
     bl_label = "Keyframe Shifter"
@@ -70,8 +207,26 @@ class KfShifterOperator(bpy.types.Operator):
     bl_description = "Move an object's keyframes along timeline"
 
     def execute(self, ctx):
-        frameshift = ctx.scene.keyframe_shifter_frameshift
-        kf_shifter.shift(ctx.scene.objects.active, frameshift=frameshift)
+        scene = ctx.scene
+        objs = [obj for obj in scene.objects if obj.select] if scene.keyframe_shifter_selected else [scene.objects.active]
+        use_range = scene.keyframe_shifter_use_range
+        data_paths = [data_path.strip() for data_path in scene.keyframe_shifter_data_paths.split(",") if data_path.strip()]
+        kf_shifter.shift(
+            objs,
+            frameshift=scene.keyframe_shifter_frameshift,
+            frame_start=scene.keyframe_shifter_frame_start if use_range else None,
+            frame_end=scene.keyframe_shifter_frame_end if use_range else None,
+            data_paths=data_paths
+        )
+        return {'FINISHED'}
+
+class KfShifterUndoOperator(bpy.types.Operator):
+    bl_label = "Undo Keyframe Shift"
+    bl_idname = "object.keyframe_shifter_undo"
+    bl_description = "Move keyframes from the last shift back"
+
+    def execute(self, ctx):
+        kf_shifter.undo()
         return {'FINISHED'}
 
 class KfShifterPanel(bpy.types.Panel):
@@ -85,15 +240,26 @@ class KfShifterPanel(bpy.types.Panel):
     def draw(self, ctx):
         layout = self.layout
         layout.row().prop(ctx.scene, 'keyframe_shifter_frameshift')
+        layout.row().prop(ctx.scene, 'keyframe_shifter_selected')
+        layout.row().prop(ctx.scene, 'keyframe_shifter_data_paths')
+        layout.row().prop(ctx.scene, 'keyframe_shifter_use_range')
+        if ctx.scene.keyframe_shifter_use_range:
+            row = layout.row()
+            row.prop(ctx.scene, 'keyframe_shifter_frame_start')
+            row.prop(ctx.scene, 'keyframe_shifter_frame_end')
         layout.row().operator("object.keyframe_shifter", text="Shift Keyframes")
+        layout.row().operator("object.keyframe_shifter_undo", text="Undo Shift")
 
 def register():
+	setup_kf_shifter_props()
 	bpy.utils.register_class(KfShifterOperator)
+	bpy.utils.register_class(KfShifterUndoOperator)
 	bpy.utils.register_class(KfShifterPanel)
 
 def unregister():
 	bpy.utils.unregister_class(KfShifterOperator)
-	bpy.utils.unregister_class(KfShifterProperties)
+	bpy.utils.unregister_class(KfShifterUndoOperator)
+	bpy.utils.unregister_class(KfShifterPanel)
 
 if __name__ == '__main__':
 	register()
@@ -36,8 +36,9 @@ def duplicate_material_across_names (names=[], obj=None):
 
 # TODO apply to an array of objects (just all selected objects), one per object
 
-# test
-material_names = ['mat-0', 'mat-1', 'mat-2', 'mat-3', 'mat-4']
-materials = duplicate_material_across_names(names=material_names)
+if __name__ == '__main__':
+	# test
+	material_names = ['mat-0', 'mat-1', 'mat-2', 'mat-3', 'mat-4']
+	materials = duplicate_material_across_names(names=material_names)
 
-for mat in materials: print(mat)
+	for mat in materials: print(mat)
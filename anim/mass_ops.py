@@ -18,8 +18,10 @@ def toggle(obj):
     obj.select = not obj.select
     return obj.select
 
-def run_op(op_chain=[], args=[], objs=bpy.context.scene.objects, selected_only=True):
+def run_op(op_chain=[], args=[], objs=None, selected_only=True):
     """Execute an operation on multiple objects"""
+    if objs is None:
+        objs = [*bpy.context.scene.objects]
     if type(objs) is not list or not op_chain: return
     selected_objects = []
     # deseselect and create selected list
@@ -64,5 +66,6 @@ def run_op(op_chain=[], args=[], objs=bpy.context.scene.objects, selected_only=T
 
     return target_objects
 
-# test
-run_op(op_chain=['text', 'run_script'])
+if __name__ == '__main__':
+    # test
+    run_op(op_chain=['text', 'run_script'])
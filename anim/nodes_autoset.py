@@ -12,7 +12,9 @@ class Custom_Nodes:
 
 	setup_ran_once = False
 
-	def __init__(self, vec_blur=False, dof=False, node_tree=bpy.context.scene.node_tree):
+	def __init__(self, vec_blur=False, dof=False, node_tree=None):
+		if node_tree is None:
+			node_tree = bpy.context.scene.node_tree
 		self.vec_blur = vec_blur
 		self.dof = dof
 		self.node_tree = node_tree
@@ -163,7 +165,8 @@ class Custom_Nodes:
 
 		return self.node_tree
 
-# test run
-c_node = Custom_Nodes(vec_blur=True, dof=True)
-c_node.setup_ui()
-c_node.setup_nodes()
+if __name__ == '__main__':
+	# test run
+	c_node = Custom_Nodes(vec_blur=True, dof=True)
+	c_node.setup_ui()
+	c_node.setup_nodes()
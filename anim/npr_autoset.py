@@ -195,7 +195,7 @@ def setup_lines(freestyle, lines_list):
 		setup_line(freestyle, line_dict)
 	return True
 
-def run_npr_autoset(scene=bpy.context.scene, lines_list=[], clear_all_linesets=False, clear_default_lineset=False):
+def run_npr_autoset(scene=None, lines_list=[], clear_all_linesets=False, clear_default_lineset=False):
 	"""Turn on freestyle settings and set up linesets and linestyles from the list of line configuration data
 
 	scene									Blender scene to activate render and layer freestyle settings
@@ -214,6 +214,8 @@ def run_npr_autoset(scene=bpy.context.scene, lines_list=[], clear_all_linesets=F
 		...
 	]
 	"""
+	if scene is None:
+		scene = bpy.context.scene
 	freestyle = activate_freestyle(scene)
 	# cleanup existing linesets
 	clear_linesets(freestyle, clear_all=clear_all_linesets, clear_default=clear_default_lineset)
@@ -372,4 +374,5 @@ lines = [
 	}
 ]
 
-run_npr_autoset(lines_list=lines, clear_all_linesets=True, clear_default_lineset=True)
+if __name__ == '__main__':
+	run_npr_autoset(lines_list=lines, clear_all_linesets=True, clear_default_lineset=True)
@@ -204,20 +204,21 @@ def untransparent_img(obj):
 
 ## NOTE: below - run main functions
 
-# find curve and paper mesh among selected
-selected_objects = [obj for obj in bpy.context.scene.objects if obj.select]
-paper_obj, furl_curve = (None, None)
-for obj in selected_objects:
-    if obj.type == 'MESH':
-        paper_obj = obj
-    if obj.type == 'CURVE':
-        furl_curve = obj
-        break
-
-# set the plane alpha to nontransparent for paper effect
-untransparent_img(paper_obj)
-
-# furl paper
-extrude_mesh_face(paper_obj, 0.01)
-select_and_crease(paper_obj)
-apply_modifiers(paper_obj, furl_curve)
+if __name__ == '__main__':
+    # find curve and paper mesh among selected
+    selected_objects = [obj for obj in bpy.context.scene.objects if obj.select]
+    paper_obj, furl_curve = (None, None)
+    for obj in selected_objects:
+        if obj.type == 'MESH':
+            paper_obj = obj
+        if obj.type == 'CURVE':
+            furl_curve = obj
+            break
+
+    # set the plane alpha to nontransparent for paper effect
+    untransparent_img(paper_obj)
+
+    # furl paper
+    extrude_mesh_face(paper_obj, 0.01)
+    select_and_crease(paper_obj)
+    apply_modifiers(paper_obj, furl_curve)
@@ -49,8 +49,6 @@ def setup_ui_props():
     Scene.popin_reverse = bpy.props.BoolProperty(name="Reverse", description="Keyframe as scale-down popout instead", default=0)
     return
 
-setup_ui_props()
-
 # UI
 
 class PopinPanel (bpy.types.Panel):
@@ -89,6 +87,7 @@ class PopinOperator (bpy.types.Operator):
         return {'FINISHED'}
 
 def register():
+    setup_ui_props()
     bpy.utils.register_class(PopinOperator)
     bpy.utils.register_class(PopinPanel)
 
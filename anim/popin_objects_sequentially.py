@@ -40,7 +40,9 @@ def get_deselect_selected(objs):
     active_obj and deselected_objs.appendleft(active_obj)
     return objs
 
-def set_selected(objs=bpy.context.selected_objects):
+def set_selected(objs=None):
+    if objs is None:
+        objs = bpy.context.selected_objects
     for obj in objs:
         obj.select = True
     return objs
@@ -48,18 +50,24 @@ def set_selected(objs=bpy.context.selected_objects):
 def get_selected():
     return bpy.context.selected_objects
 
-def set_active(obj, scene_objects=bpy.context.scene.objects):
+def set_active(obj, scene_objects=None):
+    if scene_objects is None:
+        scene_objects = bpy.context.scene.objects
     if not obj or not obj.select or not hasattr(scene_objects, 'active'):
         return
     scene_objects.active = obj
     return obj
 
-def unset_active(scene_objects=bpy.context.scene.objects):
+def unset_active(scene_objects=None):
+    if scene_objects is None:
+        scene_objects = bpy.context.scene.objects
     scene_objects.active = None
     return scene_objects.active
 
 class Playhead:
-    def __init__(self, scene=bpy.context.scene):
+    def __init__(self, scene=None):
+        if scene is None:
+            scene = bpy.context.scene
         if not hasattr(scene, 'frame_current'):
             raise Exception("Unable to find timeline playhead for scene {0}".format(scene))
         self.scene = scene
@@ -128,11 +136,11 @@ class OrderedSelection:
         return self.selected
 
 selection = OrderedSelection()
-selection.set(bpy.context.selected_objects)
 
 def popin_sequential(frame_gap=0):
 
-    objs = selection.get()
+    # fall back to current selection when no order was recorded
+    objs = selection.get() or get_selected()
 
     if not objs:
         return
@@ -153,4 +161,6 @@ def popin_sequential(frame_gap=0):
 
     return objs
 
-popin_sequential(frame_gap=2)
+if __name__ == '__main__':
+    selection.set(bpy.context.selected_objects)
+    popin_sequential(frame_gap=2)
@@ -1,4 +1,6 @@
 import bpy
+import os
+import font_metrics
 
 ## Read all fonts for text (font) objects in Blender scene
 
@@ -11,8 +13,22 @@ def print_font_name(font):
     font and print(font.name)
     return font
 
-def objects_fonts(objs=bpy.context.scene.objects, selected_only=False):
+def font_filepath(font):
+    """Absolute path to a font's file on disk - None for the builtin font or a missing file"""
+    if not font or font.filepath == '<builtin>':
+        return
+    path = bpy.path.abspath(font.filepath, library=font.library)
+    return path if os.path.isfile(path) else None
+
+def read_font_metrics(font):
+    """Glyph advances and kerning parsed from a font's file, or None without a readable file"""
+    path = font_filepath(font)
+    return font_metrics.load(path) if path else None
+
+def objects_fonts(objs=None, selected_only=False):
     """Find fonts for a list of objects"""
+    if objs is None:
+        objs = bpy.context.scene.objects
     fonts = []
     for obj in objs:
         if selected_only and not obj.select:
@@ -22,10 +38,13 @@ def objects_fonts(objs=bpy.context.scene.objects, selected_only=False):
             font and fonts.append(font)
     return fonts
 
-def scene_fonts(scene=bpy.context.scene):
+def scene_fonts(scene=None):
+    if scene is None:
+        scene = bpy.context.scene
     if not scene: return
     fonts = objects_fonts(scene.objects, selected_only=False)
     return fonts
 
-fonts = scene_fonts()
-fonts and [print_font_name(f) for f in fonts]
+if __name__ == '__main__':
+    fonts = scene_fonts()
+    fonts and [print_font_name(f) for f in fonts]
@@ -0,0 +1,332 @@
+import bpy
+import os
+import sys
+import numpy as np
+from bpy.props import IntProperty
+from keyframe_shifter import shift_fcurve
+try:
+    from timeline_index import invalidate as invalidate_timeline_index
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'vse'))
+    from timeline_index import invalidate as invalidate_timeline_index
+
+## Retime
+##
+## Blender Python script by Joshua R (GitHub user Botmasher)
+##
+## Insert or delete a range of frames across the whole file in one go: keyframes
+## on every animated datablock (objects, object data, shape keys, materials, worlds,
+## compositor and material node trees), NLA strips, timeline markers and sequencer strips.
+##
+## Each fcurve is shifted in one batch through the keyframe shifter. Keys inside
+## a deleted range are removed, markers inside it collapse onto the cut and strips
+## overlapping it are trimmed or removed.
+##
+## Usage:
+##     import retime
+##     report = retime.insert_frames(120, 12)
+##     print(retime.format_report(report))
+
+# bpy.data collections whose datablocks may hold animation_data
+anim_collections = (
+    'objects', 'meshes', 'curves', 'metaballs', 'lattices', 'armatures',
+    'cameras', 'lamps', 'lights', 'speakers', 'shape_keys', 'materials',
+    'textures', 'worlds', 'scenes', 'node_groups', 'particles', 'linestyles',
+    'movieclips', 'masks', 'grease_pencil'
+)
+
+def animation_owners():
+    """List every datablock in the file with animation data, including embedded node trees"""
+    owners = []
+    seen = set()
+    for collection_name in anim_collections:
+        for block in getattr(bpy.data, collection_name, []):
+            # compositor, material and world node trees are not in bpy.data.node_groups
+            for owner in (block, getattr(block, 'node_tree', None)):
+                if owner and getattr(owner, 'animation_data', None) and owner.as_pointer() not in seen:
+                    seen.add(owner.as_pointer())
+                    owners.append(owner)
+    return owners
+
+def owner_actions(owners):
+    """List each distinct active action across the owners"""
+    actions = []
+    seen = set()
+    for owner in owners:
+        action = owner.animation_data.action
+        if action and action.as_pointer() not in seen:
+            seen.add(action.as_pointer())
+            actions.append(action)
+    return actions
+
+def delete_fcurve_keys(fcurve, frame_start, frame_end):
+    """Remove keys from frame_start up to (not including) frame_end, returning how many were removed"""
+    points = fcurve.keyframe_points
+    count = len(points)
+    if not count:
+        return 0
+    co = np.empty(count * 2, dtype=np.float32)
+    points.foreach_get('co', co)
+    key_frames = co[0::2]
+    doomed = np.flatnonzero((key_frames >= frame_start) & (key_frames < frame_end))
+    # remove back to front so earlier indexes stay valid
+    for i in doomed[::-1].tolist():
+        points.remove(points[i], fast=True)
+    len(doomed) and fcurve.update()
+    return len(doomed)
+
+def retime_fcurve(fcurve, frame, frames):
+    """Insert (positive) or delete (negative) frames at frame in one fcurve
+
+    Returns the counts of shifted and removed keys.
+    """
+    removed = 0
+    if frames < 0:
+        removed = delete_fcurve_keys(fcurve, frame, frame - frames)
+        shifted = shift_fcurve(fcurve, frames, frame_start=frame - frames)
+    else:
+        shifted = shift_fcurve(fcurve, frames, frame_start=frame)
+    return (len(shifted[0]) if shifted is not None else 0, removed)
+
+def move_nla_strip(strip, frames):
+    """Slide an NLA strip along its track without changing its length"""
+    scale = strip.scale
+    # move the leading edge first so the strip never overlaps itself or gets clamped short
+    if frames > 0:
+        strip.frame_end += frames
+        strip.frame_start += frames
+    else:
+        strip.frame_start += frames
+        strip.frame_end += frames
+    # setting the end rescales the strip - restoring the scale restores its length
+    strip.scale = scale
+
+def retime_nla(owners, frame, frames, report):
+    """Move, remove or stretch NLA strips around an inserted or deleted range
+
+    Strip actions are keyed in their own time, so strips after the range just move.
+    A strip playing across the range has its action retimed at the matching action frame
+    and returns (action, action frame, action frames) for each such action.
+    """
+    range_end = frame - frames if frames < 0 else frame
+    spanned = {}    # action pointer: (action, action frame, action frames)
+    for owner in owners:
+        for track in owner.animation_data.nla_tracks:
+            moving = []
+            doomed = []
+            spanning = []
+            for strip in track.strips:
+                start, end = strip.frame_start, strip.frame_end
+                if end <= frame:
+                    continue
+                if start >= range_end:
+                    moving.append(strip)
+                elif start < frame and end > range_end and strip.action and strip.repeat == 1:
+                    spanning.append(strip)
+                elif start >= frame and end <= range_end:
+                    doomed.append(strip)
+                else:
+                    report['spanning_nla_strips'].append(strip.name)
+            for strip in doomed:
+                report['removed_nla_strips'].append(strip.name)
+                track.strips.remove(strip)
+            # move the strips furthest along the shift first so none land on a neighbor
+            moving.sort(key=lambda strip: strip.frame_start, reverse=frames > 0)
+            # clear room before stretching a spanning strip, or shrink it before closing the gap
+            if frames > 0:
+                for strip in moving:
+                    move_nla_strip(strip, frames)
+            for strip in spanning:
+                action_frame = strip.action_frame_start + (frame - strip.frame_start) / strip.scale
+                action_frames = frames / strip.scale
+                key = strip.action.as_pointer()
+                # a shared action can only be retimed once, at one frame
+                if key in spanned and spanned[key][1:] != (action_frame, action_frames):
+                    report['spanning_nla_strips'].append(strip.name)
+                    continue
+                spanned[key] = (strip.action, action_frame, action_frames)
+                # the strip end follows its action range
+                strip.action_frame_end += action_frames
+            if frames < 0:
+                for strip in moving:
+                    move_nla_strip(strip, frames)
+            report['nla_strips'] += len(moving)
+    return list(spanned.values())
+
+def retime_markers(scene, frame, frames):
+    """Shift timeline markers after the frame, collapsing markers in a deleted range onto the cut"""
+    moved = 0
+    for marker in scene.timeline_markers:
+        if marker.frame < frame:
+            continue
+        marker.frame = max(frame, marker.frame + frames)
+        moved += 1
+    return moved
+
+def retime_strips(scene, frame, frames, report):
+    """Move, trim or remove top level sequencer strips around an inserted or deleted range"""
+    if not scene.sequence_editor:
+        return report
+    range_end = frame - frames if frames < 0 else frame
+    moving = []
+    doomed = []
+    for strip in scene.sequence_editor.sequences:
+        # effect strips follow their inputs
+        if getattr(strip, 'input_1', None):
+            continue
+        start, end = strip.frame_final_start, strip.frame_final_end
+        if end <= frame:
+            continue
+        if start >= range_end:
+            moving.append(strip)
+        elif start < frame and end > range_end:
+            # a strip playing across the insertion or the whole deleted range is left alone
+            report['spanning_strips'].append(strip.name)
+        elif start >= frame and end <= range_end:
+            doomed.append(strip)
+        elif start < frame:
+            strip.frame_final_end = frame
+            report['trimmed_strips'] += 1
+        else:
+            strip.frame_final_start = range_end
+            moving.append(strip)
+            report['trimmed_strips'] += 1
+    for strip in doomed:
+        report['removed_strips'].append(strip.name)
+        scene.sequence_editor.sequences.remove(strip)
+    # move the strips furthest along the shift first so none land on a neighbor
+    moving.sort(key=lambda strip: strip.frame_final_start, reverse=frames > 0)
+    for strip in moving:
+        strip.frame_start += frames
+    report['strips'] += len(moving)
+    invalidate_timeline_index(scene)
+    return report
+
+def retime_scene_range(scene, frame, frames):
+    """Keep the scene's frame range covering the same shot after a retime"""
+    if scene.frame_end >= frame:
+        scene.frame_end = max(frame, scene.frame_end + frames)
+    if scene.frame_start > frame:
+        scene.frame_start = max(frame, scene.frame_start + frames)
+    return (scene.frame_start, scene.frame_end)
+
+def retime(frame, frames, scenes=None):
+    """Insert (positive frames) or delete (negative frames) time at a frame across the whole file
+
+    Shifts keys on every animated datablock plus markers, strips and frame ranges
+    in the scenes (all scenes if None). Returns a report of what moved.
+    """
+    scenes = bpy.data.scenes if scenes is None else scenes
+    report = {
+        'actions': {},
+        'fcurves': 0,
+        'keyframes': 0,
+        'removed_keyframes': 0,
+        'markers': 0,
+        'strips': 0,
+        'trimmed_strips': 0,
+        'removed_strips': [],
+        'spanning_strips': [],
+        'nla_strips': 0,
+        'removed_nla_strips': [],
+        'spanning_nla_strips': []
+    }
+    if not frames:
+        return report
+    owners = animation_owners()
+    # active actions are keyed in scene time, NLA strip actions at the frame mapped through their strip
+    retimes = [(action, frame, frames) for action in owner_actions(owners)]
+    active = set(action.as_pointer() for action, action_frame, action_frames in retimes)
+    for action, action_frame, action_frames in retime_nla(owners, frame, frames, report):
+        if action.as_pointer() in active:
+            report['spanning_nla_strips'].append(action.name)
+            continue
+        retimes.append((action, action_frame, action_frames))
+    for action, action_frame, action_frames in retimes:
+        action_shifted = 0
+        for fcurve in action.fcurves:
+            shifted, removed = retime_fcurve(fcurve, action_frame, action_frames)
+            report['fcurves'] += 1 if shifted or removed else 0
+            report['removed_keyframes'] += removed
+            action_shifted += shifted
+        report['keyframes'] += action_shifted
+        if action_shifted:
+            report['actions'][action.name] = action_shifted
+    for scene in scenes:
+        report['markers'] += retime_markers(scene, frame, frames)
+        retime_strips(scene, frame, frames, report)
+        retime_scene_range(scene, frame, frames)
+    return report
+
+def insert_frames(frame, count, scenes=None):
+    """Open up count empty frames starting at frame"""
+    return retime(frame, abs(count), scenes=scenes)
+
+def delete_frames(frame_start, frame_end, scenes=None):
+    """Cut out the frames from frame_start up to (not including) frame_end"""
+    return retime(frame_start, -abs(frame_end - frame_start), scenes=scenes)
+
+def format_report(report):
+    """Summarize a retime report in one line"""
+    summary = "Moved {0} keys on {1} fcurves in {2} actions, {3} markers, {4} strips and {5} NLA strips".format(
+        report['keyframes'], report['fcurves'], len(report['actions']), report['markers'], report['strips'], report['nla_strips']
+    )
+    if report['removed_keyframes'] or report['trimmed_strips'] or report['removed_strips'] or report['removed_nla_strips']:
+        summary += "; removed {0} keys, {1} strips and {2} NLA strips, trimmed {3} strips".format(
+            report['removed_keyframes'], len(report['removed_strips']), len(report['removed_nla_strips']), report['trimmed_strips']
+        )
+    if report['spanning_strips']:
+        summary += "; left strips spanning the range: {0}".format(", ".join(report['spanning_strips']))
+    if report['spanning_nla_strips']:
+        summary += "; left NLA strips spanning the range: {0}".format(", ".join(report['spanning_nla_strips']))
+    return summary
+
+def setup_retime_props():
+    Scene = bpy.types.Scene
+    Scene.retime_frame = IntProperty(
+        name="Frame",
+        description="Frame where time is inserted or deleted",
+        default=1
+    )
+    Scene.retime_frames = IntProperty(
+        name="Frames",
+        description="Frames to insert (positive) or delete (negative) across all animation, markers and strips",
+        default=12
+    )
+
+class RetimeOperator(bpy.types.Operator):
+    bl_label = "Retime"
+    bl_idname = "scene.retime"
+    bl_description = "Insert or delete frames across every animation, marker and strip in the file"
+
+    def execute(self, ctx):
+        report = retime(ctx.scene.retime_frame, ctx.scene.retime_frames)
+        self.report({'INFO'}, format_report(report))
+        return {'FINISHED'}
+
+class RetimePanel(bpy.types.Panel):
+    bl_label = "Retime"
+    bl_idname = "scene.retime_panel"
+    bl_category = "Retime"
+    bl_context = "objectmode"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "TOOLS"
+
+    def draw(self, ctx):
+        layout = self.layout
+        row = layout.row()
+        row.prop(ctx.scene, 'retime_frame')
+        row.prop(ctx.scene, 'retime_frames')
+        layout.row().operator("scene.retime", text="Insert Frames" if ctx.scene.retime_frames >= 0 else "Delete Frames")
+
+def register():
+    setup_retime_props()
+    bpy.utils.register_class(RetimeOperator)
+    bpy.utils.register_class(RetimePanel)
+
+def unregister():
+    bpy.utils.unregister_class(RetimeOperator)
+    bpy.utils.unregister_class(RetimePanel)
+
+if __name__ == '__main__':
+    register()
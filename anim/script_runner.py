@@ -15,10 +15,6 @@ ignore_k = '!!4GaSdF51$723%604&8qZ9h4typ#!!'
 # initial line found in all of your script files but only in your script files
 shebang_line = '#!/usr/bin/'
 
-# switch to the CONSOLE
-area = bpy.context.area.type
-bpy.context.area.type = 'CONSOLE'
-
 # execute a single statement in the Blender Python console
 def execute_in_console(txt):
     try:
@@ -49,26 +45,31 @@ def run_all_scripts (lines=[], i=0):
     # if you include a script, add its lines to next recursion
     return run_files_recurs(l + txt, i+1)
 
-# iterate through and run lines in each file
-for txt in bpy.data.texts:
-    # toggle to avoid running non-code or rerunning this file
-    if shebang_line not in txt.lines[0].body: continue
-    # read through file and execute lines
-    for ln in txt.lines:
-        # avoid rerunning this file
-        if ignore_k in ln.body: break
-        # TODO remove previous lines if break to avoid running partial file
-        elif ln.body == txt.lines[-1].body:
-            bpy.ops.console.insert (text=ln.body)
-            bpy.ops.console.execute()
-            bpy.ops.console.insert (text="")
-            bpy.ops.console.execute()
-        else:
-            bpy.ops.console.insert (text=ln.body)
-            bpy.ops.console.execute()
+if __name__ == '__main__':
+    # switch to the CONSOLE
+    area = bpy.context.area.type
+    bpy.context.area.type = 'CONSOLE'
+
+    # iterate through and run lines in each file
+    for txt in bpy.data.texts:
+        # toggle to avoid running non-code or rerunning this file
+        if shebang_line not in txt.lines[0].body: continue
+        # read through file and execute lines
+        for ln in txt.lines:
+            # avoid rerunning this file
+            if ignore_k in ln.body: break
+            # TODO remove previous lines if break to avoid running partial file
+            elif ln.body == txt.lines[-1].body:
+                bpy.ops.console.insert (text=ln.body)
+                bpy.ops.console.execute()
+                bpy.ops.console.insert (text="")
+                bpy.ops.console.execute()
+            else:
+                bpy.ops.console.insert (text=ln.body)
+                bpy.ops.console.execute()
 
-# switch back to the TEXT_EDITOR
-bpy.context.area.type = area
+    # switch back to the TEXT_EDITOR
+    bpy.context.area.type = area
 
 # OLD TESTS
 # txt = bpy.data.texts.new (my_new_text_name)
@@ -31,8 +31,10 @@ def get_active_shape_key(object):
     """Return the active shape key for a given object"""
     return object.active_shape_key
 
-def spike_shape_key(object=bpy.context.object, target_val=1.0, spike_frames=1, left_frames=1, asymmetric=False, right_frames=1):
+def spike_shape_key(object=None, target_val=1.0, spike_frames=1, left_frames=1, asymmetric=False, right_frames=1):
     """Move and set shape key value to create shape key spike"""
+    if object is None:
+        object = bpy.context.object
     if not object or not hasattr(object, 'active_shape_key') or not target_val or not left_frames:
         return
 
@@ -62,5 +62,6 @@ def swap_objects(objects_list):
         move_and_keyframe(obj_a, loc_b)
         move_and_keyframe(obj_b, loc_a)
 
-objs = get_selected()
-swap_objects(objs)
+if __name__ == '__main__':
+    objs = get_selected()
+    swap_objects(objs)
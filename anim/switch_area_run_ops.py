@@ -61,6 +61,7 @@ def setup_op_handler(methods=[]):
         return [method() for method in methods]
     return run_ops
 
-# test call
-handler = setup_op_handler([bpy.ops.marker.add])
-run_area_op(handler)
+if __name__ == '__main__':
+    # test call
+    handler = setup_op_handler([bpy.ops.marker.add])
+    run_area_op(handler)
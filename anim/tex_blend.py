@@ -41,8 +41,10 @@ def configure_blend(material, texture_slot, colors, blend_type):
     texture_slot.texture.progression = blend_type
     return (material, texture_slot)
 
-def create_blend(obj=bpy.context.scene.objects.active, colors=Grab([]), blend_type='EASING', only_active=False):
+def create_blend(obj=None, colors=Grab([]), blend_type='EASING', only_active=False):
     """Create and assign gradient material-texture to object"""
+    if obj is None:
+        obj = bpy.context.scene.objects.active
     if not obj or not obj.data: return
 
     # create and slot in blend material-texture
@@ -75,15 +77,17 @@ def create_blend(obj=bpy.context.scene.objects.active, colors=Grab([]), blend_ty
         texture_slot.use = True
     return
 
-def update_blend(obj=bpy.context.scene.objects.active, colors=Grab([])):
+def update_blend(obj=None, colors=Grab([])):
     """Update existing texture and material to blend gradient"""
+    if obj is None:
+        obj = bpy.context.scene.objects.active
     if not obj or not colors: return
     material, texture_slot = get_mattex(obj)
     if material and texture_slot:
         configure_blend(material, texture_slot, colors)
     return
 
-def create_blend_plane(colors, blend_type, shape='PLANE'):
+def create_blend_plane(colors, blend_type='EASING', shape='PLANE'):
     """Create a new object with a mesh and a blend gradient"""
     mesh_info = bmesh.new()
     points = {
@@ -102,7 +106,8 @@ def create_blend_plane(colors, blend_type, shape='PLANE'):
     create_blend(obj=obj, colors=colors, blend_type=blend_type)
     return obj
 
-# test calls
-colors = Grab([(1,1,1), (0,0,0)])
-#create_blend(colors=colors)
-create_blend_plane(colors)
+if __name__ == '__main__':
+    # test calls
+    colors = Grab([(1,1,1), (0,0,0)])
+    #create_blend(colors=colors)
+    create_blend_plane(colors)
@@ -1,6 +1,10 @@
 import bpy
 import random
+import numpy as np
+import read_fonts
+from keyframe_shifter import object_action, write_action_keys
 from bpy.props import *
+from mathutils import Matrix
 from collections import deque
 
 ## NOTE: Deprecated! - visit the current project at https://github.com/Botmasher/blender-text-fx
@@ -40,6 +44,7 @@ class Singleton:
 
 class TextEffectsMap(Singleton):
     map = {}
+    compiled = {}   # effect name: kf_arc as (frame mults, value mults) arrays
     def __init__(self, default_fx=True):
         # TODO set slide, pop, other surrounding-letter-touching overshoots based on letter spacing
         if default_fx:
@@ -58,9 +63,18 @@ class TextEffectsMap(Singleton):
             return
         if name in self.map:
             self.map[name]['kf_arc'] = kf_arc
+            self.compiled.pop(name, None)
             return True
         return False
 
+    def compile_kf_arc(self, effect):
+        """Turn an effect's kf_arc into (frame mults, value mults) arrays, compiled once per effect"""
+        name = effect['name']
+        if name not in self.compiled:
+            kf_arc = np.array(effect['kf_arc'], dtype=np.float64).reshape(-1, 2)
+            self.compiled[name] = (kf_arc[:, 0], kf_arc[:, 1])
+        return self.compiled[name]
+
     # TODO edit kf_arc list values for given effect
 
     def get_map(self):
@@ -147,6 +161,7 @@ class TextEffectsMap(Singleton):
         if not self.check_fx_vals(name, attr, kf_arc, axis):
             print("Unable to map text fx {0} to {1} effect arc {2}".format(name, attr, kf_arc))
             return
+        self.compiled.pop(name, None)
         self.map[name] = {
             'name': name,
             'attr': attr,
@@ -161,6 +176,50 @@ class TextEffectsMap(Singleton):
         return self.map[name]
 
 
+## Letter layout
+
+class GlyphMetrics:
+    """Per-font letter spacing - advances and kerning read from the font file, or widths measured once and reused by every layout"""
+    default_font = 'Bfont'
+
+    def __init__(self):
+        self.widths = {}    # font name: {character: width}
+
+    def font_key(self, font=''):
+        """Name letters are measured under - unloaded or empty font names fall back to Blender's builtin font"""
+        return font if font and font in bpy.data.fonts else self.default_font
+
+    def file_metrics(self, font=''):
+        """Metrics parsed from the font's file (cached on disk by font_metrics), or None for the builtin font"""
+        font_key = self.font_key(font)
+        return read_fonts.read_font_metrics(bpy.data.fonts[font_key]) if font_key in bpy.data.fonts else None
+
+    def offsets(self, font, txt, spacing=0.0):
+        """Kerned x offset of every character in txt from the font file, or None if the font has no readable file"""
+        metrics = self.file_metrics(font)
+        return metrics.layout(txt, spacing=spacing) if metrics else None
+
+    def missing(self, font, chars):
+        """List characters not yet measured for the font"""
+        widths = self.widths.get(self.font_key(font), {})
+        return [char for char in chars if char not in widths]
+
+    def store(self, font, char, width):
+        self.widths.setdefault(self.font_key(font), {})[char] = width
+        return width
+
+    def width(self, font, char):
+        """Read a measured width - blank spaces have no curve and measure 0"""
+        return self.widths.get(self.font_key(font), {}).get(char, 0.0)
+
+    def clear(self, font=None):
+        """Forget measured widths for one font or all fonts, such as after a font file changes"""
+        if font is None:
+            self.widths.clear()
+        else:
+            self.widths.pop(self.font_key(font), None)
+
+
 ## Effects application
 
 class TextEffectsMaker:
@@ -182,49 +241,56 @@ class TextEffectsMaker:
     def is_text(self, obj):
         return obj and hasattr(obj, 'type') and obj.type == 'FONT'
 
-    def create_letter(self, text, letter="", font=None):
-        """Make letter data, letter object and link letter to scene"""
+    def create_letter(self, text, letter="", font=None, shared_data=False):
+        """Make letter data, letter object and link letter to scene
+
+        With shared_data every letter of the same character and font reuses one glyph curve.
+        """
         if type(letter) is not str or type(text) is not str:
             return
         # letter data
         name = "\"{0}\"-letter-{1}".format(text, letter)
-        letter_data = bpy.data.curves.new(name=name, type='FONT')
-        letter_data.body = letter if letter != " " else ""
-        # assign selected font
-        if font and font in bpy.data.fonts:
-            letter_data.font = bpy.data.fonts[font]
+        glyph_name = "\"{0}\"-glyph-{1}".format(letter, glyph_metrics.font_key(font))
+        letter_data = bpy.data.curves.get(glyph_name) if shared_data else None
+        if not letter_data:
+            letter_data = bpy.data.curves.new(name=glyph_name if shared_data else name, type='FONT')
+            letter_data.body = letter if letter != " " else ""
+            # assign selected font
+            if font and font in bpy.data.fonts:
+                letter_data.font = bpy.data.fonts[font]
         # letter object
-        letter_obj = bpy.data.objects.new(letter_data.name, letter_data)
+        letter_obj = bpy.data.objects.new(name, letter_data)
         bpy.context.scene.objects.link(letter_obj)
         return letter_obj
 
     ## take txt input and turn it into single-letter text objects
-    def string_to_letters(self, txt="", spacing=0.0, font=''):
-        """Take a string and create an array of letter objects"""
+    def string_to_letters(self, txt="", spacing=0.0, font='', shared_data=False):
+        """Take a string and create an array of letter objects laid out in one pass
+
+        Letters are kerned and spaced from the font file's metrics. Fonts without a file
+        on disk (like the builtin font) fall back to letter widths measured in the scene.
+        """
         origin = (0, 0, 0)
-        offset_x = 0
-        letter_objs = []
-
-        # create font curve object for each letter
-        for l in txt:
-
-            # letter data
-            letter_obj = self.create_letter(txt, letter=l, font=font)
-
-            # set offset and base spacing on letter width
-            letter_obj.location = [offset_x, *origin[1:]]
-            bpy.context.scene.update()
-            letter_offset = letter_obj.dimensions.x + spacing
-            offset_x += letter_offset
-
-            # delete blank spaces
-            if l == " ":
-                for obj in bpy.context.scene.objects:
-                    obj.select = False
-                letter_obj.select = True
-                bpy.ops.object.delete()
-            else:
-                letter_objs.append(letter_obj)
+
+        # create font curve object for each letter - blank spaces only add to the offset
+        letters = [l for l in txt if l != " "]
+        letter_objs = [self.create_letter(txt, letter=l, font=font, shared_data=shared_data) for l in letters]
+
+        offsets = glyph_metrics.offsets(font, txt, spacing=spacing)
+        if offsets is None:
+            # measure letters the first time they are used in this font
+            unmeasured = set(glyph_metrics.missing(font, letters))
+            if unmeasured:
+                bpy.context.scene.update()
+                for l, letter_obj in zip(letters, letter_objs):
+                    l in unmeasured and glyph_metrics.store(font, l, letter_obj.dimensions.x)
+            widths = np.array([glyph_metrics.width(font, l) + spacing for l in txt])
+            offsets = np.concatenate([[0.0], np.cumsum(widths[:-1])])
+
+        # setting the world matrix keeps letter positions readable without a scene update
+        letter_offsets = [offset for l, offset in zip(txt, offsets.tolist()) if l != " "]
+        for letter_obj, offset_x in zip(letter_objs, letter_offsets):
+            letter_obj.matrix_world = Matrix.Translation((origin[0] + offset_x, *origin[1:]))
 
         return letter_objs
 
@@ -240,9 +306,39 @@ class TextEffectsMaker:
         bpy.context.scene.frame_current += frames_after
         return kf
 
+    def write_kfs(self, obj, attr, frames, values):
+        """Write keyframes for every axis of a vector attribute in one batch per fcurve, replacing keys on the same frames"""
+        write_action_keys(object_action(obj), attr, frames, values)
+        return obj
+
+    def instance_kfs(self, font_objs, effect, letter_frames, kf_offsets, values, axis):
+        """Play one shared action per distinct effect arc on letters through NLA strips
+
+        Letters whose keyed values match share an action, each strip starting at its letter's frame.
+        Returns the shared actions.
+        """
+        actions = {}    # keyed values: shared action
+        for font_obj, letter_frame, letter_values in zip(font_objs, letter_frames, values):
+            values_key = letter_values[:, axis].tobytes()
+            if values_key not in actions:
+                action = bpy.data.actions.new("text_fx-{0}".format(effect['name']))
+                actions[values_key] = write_action_keys(action, effect['attr'], kf_offsets, letter_values, indexes=axis)
+            animation_data = font_obj.animation_data or font_obj.animation_data_create()
+            # one track per effect - later tracks only hold their values after their strip starts
+            track = animation_data.nla_tracks.get(effect['name'])
+            if track is None:
+                extrapolation = 'HOLD_FORWARD' if len(animation_data.nla_tracks) else 'HOLD'
+                track = animation_data.nla_tracks.new()
+                track.name = effect['name']
+            else:
+                extrapolation = 'HOLD_FORWARD'
+            strip = track.strips.new(effect['name'], int(letter_frame + kf_offsets[0]), actions[values_key])
+            strip.extrapolation = extrapolation
+        return list(actions.values())
+
     # construct fx
-    def keyframe_letter_fx (self, font_obj, effect={}):
-        """Keyframe an effect on a letter based on an fx dict
+    def keyframe_letter_fx (self, font_obj, effect={}, frame=None):
+        """Keyframe an effect on a letter based on an fx dict starting at frame (default current frame)
 
         fx = {
             'name': '',         # like 'SLIDE'
@@ -254,85 +350,85 @@ class TextEffectsMaker:
             'offset': 0         # gap between letter anims to stagger each letter's effect
         }
         """
+        if frame is None:
+            frame = bpy.context.scene.frame_current
+        if self.keyframe_letters_fx([font_obj], effect=effect, frame=frame) is None:
+            return
+        return font_obj
+
+    def keyframe_letters_fx(self, font_objs, effect={}, frame=0, stagger=0, instanced=False):
+        """Keyframe an effect on letters in order, each starting stagger frames after the last one's effect ends
+
+        The effect arc is compiled once and broadcast against every letter's base transform.
+        Instanced letters share actions through NLA strips instead of each getting its own keys.
+        Returns the frame after the last letter's effect and stagger, or None on failure.
+        """
         # TODO update fx map above to reflect passed-in effect from effects list, plus sibling transforms, axis
 
-        if not hasattr(font_obj, 'type') or not hasattr(font_obj, 'parent') or font_obj.type != 'FONT' or not effect or not 'attr' in effect:
-            print("Failed to keyframe letter effect on {0} - expected a font curve parented to a letter fx empty".format(font_obj))
-            return
+        for font_obj in font_objs:
+            if not hasattr(font_obj, 'type') or not hasattr(font_obj, 'parent') or font_obj.type != 'FONT' or not effect or not 'attr' in effect:
+                print("Failed to keyframe letter effect on {0} - expected a font curve parented to a letter fx empty".format(font_obj))
+                return
+            if not hasattr(font_obj, effect['attr']):
+                print("Failed to set letter effect keyframe on {1} - unrecognized attribute or value".format(font_obj, effect['attr']))
+                return
+
+        axes = {'x': 0, 'y': 1, 'z': 2}
+        for dir in effect['axis']:
+            if dir.lower() not in axes:
+                print("Did not recognize {0} axis '{1}' for text fx - failed to animate letters".format(effect['attr'], dir))
+                return
+        axis = [axes[dir.lower()] for dir in effect['axis']]
 
-        if not hasattr(font_obj, effect['attr']):
-            print("Failed to set letter effect keyframe on {1} - unrecognized attribute or value".format(font_obj, effect['attr']))
-            return
+        # keyframe along effect arc
+        print("Keyframing along {0} effect arc for {1} letters".format(effect['name'], len(font_objs)))
+
+        # multiply user settings by effect factors to get each kf - frames count on from the previous kf
+        frame_mults, value_mults = self.fx_map.compile_kf_arc(effect)
+        kf_offsets = np.cumsum(np.round(effect['length'] * frame_mults)).astype(int)
+        span = kf_offsets[-1] if len(kf_offsets) else 0
+        letter_frames = frame + np.arange(len(font_objs)) * (span + stagger)
 
-        value_base = None
-        transform_magnitude = None
-        axis = [dir.lower() for dir in effect['axis']]
+        # letters x keyframes x axes
+        value_base = np.array([tuple(getattr(font_obj, effect['attr'])) for font_obj in font_objs], dtype=np.float64).reshape(-1, 3)
+        values = np.repeat(value_base[:, None, :], len(value_mults), axis=1)
         if 'location' in effect['attr']:
-            value_base = font_obj.location[:]
-            transform_magnitude = effect['transforms']['location']
+            kf_values = value_mults * effect['transforms']['location']
+            # step from each letter's world origin toward the fixed target relative to parent
+            world_origins = np.array([tuple(font_obj.matrix_world.translation) for font_obj in font_objs], dtype=np.float64).reshape(-1, 3)
+            parent_locations = np.array([tuple(font_obj.parent.location) if font_obj.parent else (0, 0, 0) for font_obj in font_objs], dtype=np.float64).reshape(-1, 3)
+            for i in axis:
+                targets = parent_locations[:, i, None] + kf_values
+                values[:, :, i] = self.lerp_step(origin=world_origins[:, i, None], target=targets, factor=value_mults)
         elif 'rotation' in effect['attr']:
-            value_base = font_obj.rotation_euler[:]
-            transform_magnitude = effect['transforms']['rotation']
+            # TODO double check clockwise/counterclockwise (plus vs minus)
+            kf_values = value_mults * effect['transforms']['rotation']
+            for i in axis:
+                values[:, :, i] = value_base[:, i, None] - kf_values
         elif 'scale' in effect['attr']:
-            value_base = font_obj.scale[:]
-            transform_magnitude = effect['transforms']['scale']
+            kf_values = value_mults * effect['transforms']['scale']
+            for i in axis:
+                values[:, :, i] = value_base[:, i, None] * kf_values
         else:
-            print("Did not recognize attr {0} on text object {1} for known text effects".format(attr, obj))
+            print("Did not recognize attr {0} on text objects for known text effects".format(effect['attr']))
             return
 
-        # keyframe along effect arc
-        print("Keyframing along {0} effect arc for letter {1}".format(effect['name'], font_obj))
-
-        for kf_mults in effect['kf_arc']:
-            # multiply user settings by effect factors to get each kf
-            frame_mult = kf_mults[0]
-            value_mult = kf_mults[1]
-            kf_value = value_mult * transform_magnitude
-            kf_frames = int(round(effect['length'] * frame_mult))
-
-            target_transform = {'x': value_base[0], 'y': value_base[1], 'z': value_base[2]}
-
-            if 'location' in effect['attr']:
-                # calc fixed loc for all location kfs
-                # TODO recalculate since all axes passed in, but some add 0.0
-                for dir in axis:
-                    try:
-                        # transform magnitude for this direction relative to parent
-                        new_fixed_target = getattr(font_obj.parent.location, dir) + kf_value
-                        # global world object origin for this direction
-                        world_origin = getattr(font_obj.matrix_world.translation, dir)
-                        #  step to new value for this direction
-                        dir_value = self.lerp_step(origin=world_origin, target=new_fixed_target, factor=value_mult)
-                        # store keyframe values for all axes
-                        target_transform = {k: v if k != dir else dir_value for k, v in target_transform.items()}
-                    except:
-                        # location not recognized
-                        print("Did not recognize {0} axis '{1}' for text fx - failed to animate letters".format(effect['attr'], dir))
-                        return
-            elif 'rotation' in effect['attr']:
-                # TODO double check clockwise/counterclockwise (plus vs minus)
-                for dir in axis:
-                    try:
-                        dir_value = target_transform[dir] - kf_value
-                        target_transform = {k: v if k != dir else dir_value for k, v in target_transform.items()}
-                    except:
-                        print("Did not recognize {0} axis '{1}' for text fx - failed to animate letters".format(effect['attr'], dir))
-                        return
-            elif 'scale' in effect['attr']:
-                for dir in axis:
-                    try:
-                        dir_value = target_transform[dir] * kf_value
-                        target_transform = {k: v if k != dir else dir_value for k, v in target_transform.items()}
-                    except:
-                        print("Did not recognize {0} axis '{1}' for text fx - failed to animate letters".format(effect['attr'], dir))
-                        return
-            else:
-                print("Did not recognize attr {0} on text object {1} for known text effects".format(attr, obj))
+        if not len(kf_offsets):
+            return frame + len(font_objs) * (span + stagger)
 
-            target_value = [target_transform['x'], target_transform['y'], target_transform['z']]
-            self.set_kf(font_obj, attr=effect['attr'], value=target_value, frames_before=kf_frames)
+        # a later kf on the same frame replaces an earlier one
+        last_on_frame = np.append(kf_offsets[1:] != kf_offsets[:-1], True)
+        kf_offsets = kf_offsets[last_on_frame]
+        values = values[:, last_on_frame]
+        if instanced:
+            # unchanged axes stay out of shared actions so more letters match
+            self.instance_kfs(font_objs, effect, letter_frames.tolist(), kf_offsets, values, axis)
+        for font_obj, letter_frame, letter_values in zip(font_objs, letter_frames.tolist(), values):
+            instanced or self.write_kfs(font_obj, effect['attr'], letter_frame + kf_offsets, letter_values)
+            # leave the letter at its final keyed value
+            setattr(font_obj, effect['attr'], letter_values[-1].tolist())
 
-        return font_obj
+        return frame + len(font_objs) * (span + stagger)
 
     def lerp_step(self, origin=0, target=1, factor=0):
         """Step interpolate between origin and target values by a delta factor"""
@@ -348,29 +444,32 @@ class TextEffectsMaker:
         letters_parent.location.x -= distance
         return letters_parent
 
-    def parent_anim_letters(self, letters, fx, parent=None, start_frame=0, kf_handler=keyframe_letter_fx):
+    def parent_anim_letters(self, letters, fx, parent=None, start_frame=0, kf_handler=keyframe_letters_fx, instanced=False):
         """Attach letters to fx parent and keyframe each letter's effect based on fx data"""
         kfs = []
 
+        # attach to parent but remove offset
+        if not parent:
+            print("Expected text fx letter parent for '{0}' but parent is {1}".format(letters, parent))
+            return
+        for letter in letters:
+            letter.parent = parent
+            letter.matrix_parent_inverse = parent.matrix_world.inverted()
+
+        frame = start_frame
         for effect in fx['effects']:
 
             effect['length'] = fx['length']
             effect['transforms'] = fx['transforms']
 
-            for letter in letters:
-
-                # attach to parent but remove offset
-                if not parent:
-                    print("Expected text fx letter parent for '{0}' but parent is {1}".format(letter, parent))
-                    return
-                letter.parent = parent
-                letter.matrix_parent_inverse = parent.matrix_world.inverted()
-
-                effect['attr'] and effect['kf_arc'] and kfs.append(self.keyframe_letter_fx(letter, effect))
-
-                #print("Anim frames: {0} -- Anim offset: {1} -- Current frame: {2}".format(fx['length'], fx['offset'], bpy.context.scene.frame_current))
-
-                bpy.context.scene.frame_current += fx['offset']
+            if effect['attr'] and effect['kf_arc']:
+                end_frame = kf_handler(self, letters, effect=effect, frame=frame, stagger=fx['offset'], instanced=instanced)
+                if end_frame is None:
+                    return kfs
+                kfs += letters
+                frame = end_frame
+            else:
+                frame += len(letters) * fx['offset']
 
         return kfs
 
@@ -396,7 +495,7 @@ class TextEffectsMaker:
                 return False
         return True
 
-    def anim_txt(self, txt="", time_offset=1, fx_name='', anim_order="forwards", fx_deltas={}, anim_length=5, anim_stagger=0, spacing=0.0, font=''):
+    def anim_txt(self, txt="", time_offset=1, fx_name='', anim_order="forwards", fx_deltas={}, anim_length=5, anim_stagger=0, spacing=0.0, font='', instanced=False):
         # TODO use clockwise to set rot +- for transformed x,y,z
         if not (txt and type(txt) is str and fx_deltas != None):
             return
@@ -407,7 +506,7 @@ class TextEffectsMaker:
             target_location = bpy.context.scene.cursor_location
 
         # build letter objects
-        letters = self.string_to_letters(txt, spacing=spacing, font=font)
+        letters = self.string_to_letters(txt, spacing=spacing, font=font, shared_data=instanced)
 
         # check format of axis and delta maps
         if not self.is_transform_map(fx_deltas):
@@ -447,6 +546,7 @@ class TextEffectsMaker:
         letters_parent.text_fx.spacing = spacing
         letters_parent.text_fx.name = fx_name
         letters_parent.text_fx.text = txt
+        letters_parent.text_fx.instanced = instanced
 
         # letter orders: front-to-back, back-to-front, random
         letter_orders = {
@@ -454,7 +554,7 @@ class TextEffectsMaker:
             'backwards': lambda l: reversed(l),
             'random': lambda l: random.sample(l, len(l))
         }
-        letters = letter_orders.get(anim_order, lambda l: l)(letters)
+        letters = [*letter_orders.get(anim_order, lambda l: l)(letters)]
         # if anim_order == 'random':
         #     random.shuffle(letters)
         # elif anim_order == 'backwards':
@@ -463,7 +563,7 @@ class TextEffectsMaker:
         #     letters = letters
 
         # keyframe effect for each letter
-        self.parent_anim_letters(letters, fx, parent=letters_parent, start_frame=start_frame)
+        self.parent_anim_letters(letters, fx, parent=letters_parent, start_frame=start_frame, instanced=instanced)
 
         # move letters to calculated target
         letters and self.set_parent_location(obj=letters[0], target=target_location)
@@ -495,6 +595,7 @@ class TextEffectsMaker:
 
 # text fx instances
 fx_map = TextEffectsMap()       # data
+glyph_metrics = GlyphMetrics()  # letter widths
 #fx_map = TextEffectsMap()       # singleton test
 fx = TextEffectsMaker(fx_map)   # logic
 
@@ -528,6 +629,7 @@ text_fx_prop_names = [
     'frames',
     'spacing',
     'time_offset',
+    'instanced',
     #'replace',
     'transform_location',
     #'axis_location',
@@ -557,6 +659,7 @@ class TextFxProperties(bpy.types.PropertyGroup):
     frames = IntProperty(name="Frames", description="Frame duration of effect on each letter", default=10)
     spacing = FloatProperty(name="Spacing", description="Distance between letters", default=0.1)
     time_offset = IntProperty(name="Timing", description="Frames to wait between each letter's animation", default=1)
+    instanced = BoolProperty(name="Instanced", description="Share glyph curves and effect actions (through NLA strips) between matching letters instead of baking keys on every letter", default=False)
     replace = BoolProperty(name="Replace", description="Replace the current effect (otherwise added to letters)", default=False)
     transform_location = FloatProperty(name="Location change", description="Added value for letter location effect", default=1.0)
     transform_rotation = FloatProperty(name="Rotation change", description="Added value for letter rotation effect", default=1.0)
@@ -620,7 +723,7 @@ class TextFxOperator(bpy.types.Operator):
         #       print("No location/rotation/scale attr recognized for effect - cancelling text effect")
         #       return {'FINISHED'}
 
-        fx.anim_txt(text_fx.text, fx_name=text_fx.effect, font=text_fx.font, fx_deltas=transforms, anim_order=text_fx.letters_order, anim_stagger=text_fx.time_offset, anim_length=text_fx.frames, spacing=text_fx.spacing)
+        fx.anim_txt(text_fx.text, fx_name=text_fx.effect, font=text_fx.font, fx_deltas=transforms, anim_order=text_fx.letters_order, anim_stagger=text_fx.time_offset, anim_length=text_fx.frames, spacing=text_fx.spacing, instanced=text_fx.instanced)
 
         return {'FINISHED'}
 
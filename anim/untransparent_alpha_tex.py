@@ -13,8 +13,10 @@ def set_untransparent(texture_slot, is_transparent=False):
 	texture_slot.use_map_alpha = is_transparent
 	return texture_slot
 
-def untransparent_texture(material=bpy.context.active_object.active_material, toggle=False, color=None, set_all=True):
+def untransparent_texture(material=None, toggle=False, color=None, set_all=True):
 	"""Configure a material and its image textures to show a diffuse background behind transparent images"""
+	if material is None:
+		material = bpy.context.active_object.active_material
 
 	# verify reference to material and texture (including slot)
 	if not material: return
@@ -42,5 +44,6 @@ def untransparent_texture(material=bpy.context.active_object.active_material, to
 
 	return (material, texture)
 
-# test call
-untransparent_texture(color=(1.0, 1.0, 1.0))
+if __name__ == '__main__':
+	# test call
+	untransparent_texture(color=(1.0, 1.0, 1.0))
@@ -1,13 +1,16 @@
 import bpy
+import bmesh
+import hashlib
+import numpy as np
 from mathutils import Matrix
 import bpy_extras
+from keyframe_shifter import object_action, write_action_keys
 
 ## Align Object in Camera Viewport
 ##
 ## Blender Python script by Josh R (GitHub user Botmasher)
 
-# /!\ Caution - current implementation slows with vertex count
-# /!\ (may loop over vertices multiple times)
+# NOTE vertices are projected into camera view in one batch - see get_vertices_frustum_locs
 
 # Base implementation
 # - determine point at center of camera x,y
@@ -18,7 +21,9 @@ import bpy_extras
 
 # TODO align non-mesh objects like text (or separate?)
 
-def get_current_cam_and_obj(scene=bpy.context.scene):
+def get_current_cam_and_obj(scene=None):
+    if scene is None:
+        scene = bpy.context.scene
     cam = scene.camera
     obj = scene.objects.active
     return (cam, obj)
@@ -36,7 +41,11 @@ def is_translatable(*objs):
 ##      - allow adjusting scale within view (like calculate view size * 0.5)
 
 ## newer iteration on center align
-def center_in_cam_view(obj=bpy.context.object, cam=bpy.context.scene.camera, distance=0.0, snap=False):
+def center_in_cam_view(obj=None, cam=None, distance=0.0, snap=False):
+    if obj is None:
+        obj = bpy.context.object
+    if cam is None:
+        cam = bpy.context.scene.camera
     if not is_translatable(obj, cam):
         return
 
@@ -61,8 +70,12 @@ def center_in_cam_view(obj=bpy.context.object, cam=bpy.context.scene.camera, dis
 
 # Find object edges vs camera view edges
 
-def get_frustum_loc(point, cam=bpy.context.scene.camera, scene=bpy.context.scene):
+def get_frustum_loc(point, cam=None, scene=None):
     """Determine location of a point within camera's rendered frame"""
+    if scene is None:
+        scene = bpy.context.scene
+    if cam is None:
+        cam = scene.camera
     if not point or not cam or not scene:
         return
     # scene to use for frame size
@@ -74,6 +87,64 @@ def get_frustum_loc(point, cam=bpy.context.scene.camera, scene=bpy.context.scene
     #   - values at index 2 less than 0 are behind camera
     return uv_loc
 
+def transform_points(matrix, points):
+    """Apply a 4x4 matrix to an n x 3 array of points in one batch"""
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return np.dot(points, matrix[:3, :3].T) + matrix[:3, 3]
+
+def vertex_coords(obj):
+    """Read all of a mesh object's local vertex coordinates into an n x 3 array"""
+    coords = np.empty(len(obj.data.vertices) * 3, dtype=np.float64)
+    obj.data.vertices.foreach_get('co', coords)
+    return coords.reshape(-1, 3)
+
+def camera_view_locs(cam_points, cam, scene):
+    """Map points already in camera space to rendered frame locations like world_to_camera_view"""
+    depths = -cam_points[:, 2]
+    frame = cam.data.view_frame(scene=scene)
+    # frame corners: 0 top right, 1 bottom right, 2 bottom left, 3 top left
+    min_x, max_x, min_y, max_y = frame[2].x, frame[1].x, frame[1].y, frame[0].y
+    if cam.data.type != 'ORTHO':
+        # perspective frame grows with each point's depth
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frame_scale = depths / -frame[0].z
+            u = (cam_points[:, 0] - min_x * frame_scale) / ((max_x - min_x) * frame_scale)
+            v = (cam_points[:, 1] - min_y * frame_scale) / ((max_y - min_y) * frame_scale)
+        # points level with the camera sit at the frame center
+        level = depths == 0
+        u[level] = 0.5
+        v[level] = 0.5
+    else:
+        u = (cam_points[:, 0] - min_x) / (max_x - min_x)
+        v = (cam_points[:, 1] - min_y) / (max_y - min_y)
+    return np.stack([u, v, depths], axis=1)
+
+def get_frustum_locs(points, cam=None, scene=None):
+    """Determine locations of an n x 3 array of world space points within camera's rendered frame"""
+    if scene is None:
+        scene = bpy.context.scene
+    if cam is None:
+        cam = scene.camera
+    cam_points = transform_points(cam.matrix_world.normalized().inverted(), points)
+    return camera_view_locs(cam_points, cam, scene)
+
+def get_vertices_frustum_locs(obj, cam=None, scene=None, coords=None):
+    """Project every vertex of a mesh object into camera's rendered frame in one batch
+
+    Returns n x 3 arrays of frame locations (u, v, depth) and world space coordinates.
+    """
+    if scene is None:
+        scene = bpy.context.scene
+    if cam is None:
+        cam = scene.camera
+    if coords is None:
+        coords = vertex_coords(obj)
+    world_matrix = np.array(obj.matrix_world, dtype=np.float64)
+    world_points = transform_points(world_matrix, coords)
+    # world and camera matrices combined so vertices are multiplied only once
+    to_cam = np.dot(np.array(cam.matrix_world.normalized().inverted(), dtype=np.float64), world_matrix)
+    return (camera_view_locs(transform_points(to_cam, coords), cam, scene), world_points)
+
 def is_scene(obj):
     """Check if the object is a scene"""
     return obj.name in bpy.data.scenes and bpy.data.scenes[obj.name] == obj
@@ -90,22 +161,32 @@ def is_vertex(obj):
     """Check if the object is a vertex point"""
     return hasattr(obj, 'co')
 
-def is_frustum_loc(point, cam=bpy.context.scene.camera, scene=bpy.context.scene):
+def is_frustum_loc(point, cam=None, scene=None):
     """Check if a point falls within camera's rendered frame"""
+    if scene is None:
+        scene = bpy.context.scene
+    if cam is None:
+        cam = scene.camera
     if not is_vertex(point) or not is_camera(cam) or not is_scene(scene):
         return
-        uv_loc = bpy_extras.object_utils.world_to_camera_view(scene, cam, point)
-        return (0.0 <= uv_loc[0] <= 1.0 and 0.0 <= uv_loc[1] <= 1.0 and uv_loc[2] >= 0.0)
+    uv_loc = bpy_extras.object_utils.world_to_camera_view(scene, cam, point.co)
+    return (0.0 <= uv_loc[0] <= 1.0 and 0.0 <= uv_loc[1] <= 1.0 and uv_loc[2] >= 0.0)
+
+def frustum_mask(uv_locs):
+    """Check which projected points fall within camera's rendered frame"""
+    return (uv_locs[:, 0] >= 0.0) & (uv_locs[:, 0] <= 1.0) & (uv_locs[:, 1] >= 0.0) & (uv_locs[:, 1] <= 1.0) & (uv_locs[:, 2] >= 0.0)
 
-def get_active_alignables(scene=bpy.context.scene):
+def get_active_alignables(scene=None):
     """Get the active camera and object in the scene"""
+    if scene is None:
+        scene = bpy.context.scene
     obj = scene.objects.active
     cam = scene.camera
     return (obj, cam)
 
-def is_alignable(scene=bpy.context.scene):
+def is_alignable(scene=None):
     """Check that scene has active mesh object to align to active camera"""
-    obj, cam = get_active_alignables()
+    obj, cam = get_active_alignables(scene)
     if not has_mesh(obj) or not is_camera(cam):
         return False
     return True
@@ -114,29 +195,21 @@ def get_edge_vertices_uv_xy(obj=None, cam=None):
     """Find the rightmost, leftmost, topmost and bottommost vertex in camera view
     Return render UV and the world XY coordinates for these extremes
     """
-    if not is_alignable():
+    if obj is None or cam is None:
+        active_obj, active_cam = get_active_alignables()
+        obj = active_obj if obj is None else obj
+        cam = active_cam if cam is None else cam
+    if not has_mesh(obj) or not is_camera(cam) or len(obj.data.vertices) < 1:
         return
-    obj, cam = get_active_alignables()
+    uv_locs, world_points = get_vertices_frustum_locs(obj, cam=cam)
     edges = {'u': [None, None], 'v': [None, None], 'x': [None, None], 'y': [None, None]}
-    for v in obj.data.vertices:
-        v_uv = get_frustum_loc(obj.matrix_world * v.co, cam=cam)
-        # TODO add vertex to edges if it is more positive or negative than stored extreme edges
-        # zeroth value for L/bottom of render screen, first value for R/top render screen
-        edge_units = [['u', 'x'], ['v', 'y']]
-        for i in range(2):
-            uv, xy = edge_units[i]
-            print("Vertex %s coords:" % uv.upper())
-            v_uv and print(v_uv[i])
-            print("Vertex %s coords:" % xy.upper())
-            v.co and print((obj.matrix_world * v.co)[i])
-            if edges[uv][0] is None or v_uv[i] < edges[uv][0]:
-                edges[uv][0] = v_uv[i]
-                edges[xy][0] = (obj.matrix_world * v.co)[i]
-            if edges[uv][1] is None or v_uv[i] > edges[uv][1]:
-                edges[uv][1] = v_uv[i]
-                edges[xy][1] = (obj.matrix_world * v.co)[i]
-    print("\n\nUV Extreme Edges:")
-    print(edges)
+    # zeroth value for L/bottom of render screen, first value for R/top render screen
+    edge_units = [['u', 'x'], ['v', 'y']]
+    for i in range(2):
+        uv, xy = edge_units[i]
+        for side, extreme in enumerate((np.argmin(uv_locs[:, i]), np.argmax(uv_locs[:, i]))):
+            edges[uv][side] = float(uv_locs[extreme, i])
+            edges[xy][side] = float(world_points[extreme, i])
     return edges
 
 def is_clamped(r=[], r_min=0.0, r_max=1.0):
@@ -164,8 +237,6 @@ def move_vertices_to_uv(obj, width_u, height_v, edges):
     edges_uv_flat = edges['u'] + edges['v']
     dimensions_uv = {'w': width_u, 'h': height_v}
     #dimensions_xy = {'w': edges['x'][1] - edges['x'][0], 'h': edges['y'][1] - edges['y'][1]}
-    print(dimensions_uv)
-    print(edges_uv_flat)
 
     # object fully in view - does not need moved
     if is_clamped(r=edges_uv_flat, r_min=0.0, r_max=1.0):
@@ -185,19 +256,15 @@ def move_vertices_to_uv(obj, width_u, height_v, edges):
     target_uv = {'u': {}, 'v': {}}      # render (shape) space
     target_xy = {'x': {}, 'y': {}}      # world (form) space
     for d in dimensions_uv.keys():
-        print(d)
         uv = 'u' if d == 'w' else 'v'
         margin_uv = (1 - dimensions_uv[d]) / 2   # centering between both sides
-        print("margin on %s side: %s" % (uv, margin_uv))
         target_uv[uv]['low'] = margin_uv
         target_uv[uv]['high'] = margin_uv + dimensions_uv[d]
-        print("2 margins plus body: %s" % (margin_uv + dimensions_uv[d] + margin_uv))
 
         # new x,y point at bottom left = (obj_xy / obj_uv) * new_target_uv
         xy = 'x' if d == 'w' else 'y'
         target_xy[xy]['high'] = (edges[xy][1] / edges[uv][1]) * target_uv[uv]['high']
         target_xy[xy]['low'] = (edges[xy][0] / edges[uv][0]) * target_uv[uv]['low']
-    print(target_xy)
 
     # calculate object XY translation
     new_xy = {}
@@ -206,8 +273,6 @@ def move_vertices_to_uv(obj, width_u, height_v, edges):
         new_delta = target_xy[axis]['high'] - target_xy[axis]['low']
         new_xy[axis] = getattr(obj.location, axis) + new_delta
 
-    print(new_xy)
-
     ratio_scale = new_xy['x'], new_xy['y'], obj.location.z
     return ratio_scale
 
@@ -312,7 +377,6 @@ def fit_vertices_to_frustum(obj, cam, move=True, scale_factor=1.0):
 
     if move:
         move_pos = move_vertices_to_uv(obj, width, height, edges)
-        print(move_pos)
         #obj.location = move_pos if move_pos else obj.location
 
     return obj
@@ -328,24 +392,219 @@ def move_obj(obj, x=0, y=0, z=0):
     return obj
 
 def move_vertex_to_cam(vert_data, obj, cam):
-    dist_u = 0.5 - vert_data['u']
-    dist_v = 0.5 - vert_data['v']
-    dist_x = cam.location.x - vert_data['x']
-    dist_y = cam.location.y - vert_data['y']
+    """Move object so a vertex (or the center between low and high edge vertices) lines up with cam center"""
+    # edges from get_edge_vertices_uv_xy store [low, high] pairs
+    center = lambda value: sum(value) / 2.0 if isinstance(value, (list, tuple)) else value
+    dist_u = 0.5 - center(vert_data['u'])
+    dist_v = 0.5 - center(vert_data['v'])
+    dist_x = cam.location.x - center(vert_data['x'])
+    dist_y = cam.location.y - center(vert_data['y'])
     if dist_u == 0 or dist_v == 0:
         return  # already at loc
     obj.location.x += dist_x
     obj.location.y += dist_y
-    move_obj(obj, x=dist_x, y=dist_y)
     return vert_data
 
-# test runs
-#fit_vertices_to_frustum(bpy.context.object, bpy.context.scene.camera)
-cam, obj = get_current_cam_and_obj()
-obj_edges = get_edge_vertices_uv_xy(obj, cam)
-# reduce to only most extreme val
-#if obj_edges:
-#    obj_edges = {k: compare_abs_values_return_rel_values(v) for (k, v) in obj_edges.items()}
-#    calc_move_vertex_to_pivot_xy_cam_center(obj, cam, obj_edges)
-if obj_edges:   # selected obj
-    move_vertex_to_cam(obj_edges, obj, cam)
+## Frame-fit solver for many objects over a frame range
+# - each mesh is reduced to its convex hull once - frame extremes of a convex shape are always at hull corners
+# - per frame, hull corners for every object go into camera space together
+# - solve the largest uniform scale (about the group's center) and sideways camera-plane move keeping all corners inside the margins
+
+hull_cache = {}     # mesh name: (vertex fingerprint, n x 3 local hull coordinates)
+
+def mesh_hull(obj):
+    """Local coordinates of the convex hull of an object's mesh, computed once per mesh shape
+
+    Objects without mesh data (like text) use their bounding box corners.
+    """
+    if not has_mesh(obj):
+        return np.array([tuple(corner) for corner in obj.bound_box], dtype=np.float64)
+    coords = vertex_coords(obj)
+    fingerprint = (len(coords), hashlib.sha1(coords.tobytes()).hexdigest())
+    cached = hull_cache.get(obj.data.name)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+    hull = coords
+    if len(coords) > 4:
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+        try:
+            result = bmesh.ops.convex_hull(bm, input=bm.verts)
+            hull_verts = [geom.co[:] for geom in result['geom'] if isinstance(geom, bmesh.types.BMVert)]
+            # flat or degenerate meshes keep every vertex
+            hull = np.array(hull_verts, dtype=np.float64) if len(hull_verts) >= 4 else coords
+        except (RuntimeError, ValueError):
+            pass
+        bm.free()
+    hull_cache[obj.data.name] = (fingerprint, hull)
+    return hull
+
+def clear_hull_cache(obj=None):
+    """Forget cached hulls for one object's mesh or all meshes"""
+    if obj is None:
+        hull_cache.clear()
+    elif has_mesh(obj):
+        hull_cache.pop(obj.data.name, None)
+
+def frame_margins(margin):
+    """Expand a single margin into (left, right, bottom, top) fractions of the rendered frame"""
+    if isinstance(margin, (int, float)):
+        return (margin, margin, margin, margin)
+    return tuple(margin)
+
+def frame_fit_bounds(cam, scene, margin=0.0):
+    """Camera space x and y limits of the margined frame at unit depth (or at any depth for ortho)"""
+    frame = cam.data.view_frame(scene=scene)
+    min_x, max_x, min_y, max_y = frame[2].x, frame[1].x, frame[1].y, frame[0].y
+    left, right, bottom, top = frame_margins(margin)
+    width = max_x - min_x
+    height = max_y - min_y
+    bounds = np.array([min_x + left * width, max_x - right * width, min_y + bottom * height, max_y - top * height])
+    if cam.data.type == 'ORTHO':
+        return (bounds, True)
+    return (bounds / -frame[0].z, False)
+
+def fit_moves(cam_points, pivot, scale, bounds, ortho):
+    """Range of sideways camera plane moves keeping points scaled about pivot inside bounds, or None"""
+    scaled = pivot + scale * (cam_points - pivot)
+    depths = -scaled[:, 2]
+    if not ortho and (depths <= 0).any():
+        return None
+    frame_scale = 1.0 if ortho else depths
+    moves = []
+    for i in range(2):
+        low = np.max(bounds[i * 2] * frame_scale - scaled[:, i])
+        high = np.min(bounds[i * 2 + 1] * frame_scale - scaled[:, i])
+        if low > high:
+            return None
+        moves.append((low, high))
+    return moves
+
+def solve_fit_scale(cam_points, pivot, bounds, ortho, max_scale=1.0, steps=32):
+    """Find the largest scale up to max_scale that lets the points fit within bounds"""
+    if fit_moves(cam_points, pivot, max_scale, bounds, ortho):
+        return max_scale
+    low, high = 0.0, max_scale
+    for i in range(steps):
+        scale = (low + high) / 2.0
+        if fit_moves(cam_points, pivot, scale, bounds, ortho):
+            low = scale
+        else:
+            high = scale
+    return low if low > 0 and fit_moves(cam_points, pivot, low, bounds, ortho) else None
+
+def solve_frame_fit(objs, cam=None, frame_start=None, frame_end=None, frame_step=1, margin=0.05, max_scale=1.0, steady_scale=True, scene=None):
+    """Solve per frame how to scale and move objects together so all stay within camera view
+
+    Returns one fit per frame: {'frame', 'scale', 'matrix'} where matrix is the 4x4 world space
+    transform to apply on top of every object at that frame, or None for frames that cannot fit.
+    With steady_scale every frame shares the smallest scale needed in the range so size does not pulse.
+    """
+    if scene is None:
+        scene = bpy.context.scene
+    if cam is None:
+        cam = scene.camera
+    frame_start = scene.frame_current if frame_start is None else frame_start
+    frame_end = frame_start if frame_end is None else frame_end
+    objs = [obj for obj in objs if obj and obj != cam]
+    if not objs or not is_camera(cam):
+        return []
+    hulls = [mesh_hull(obj) for obj in objs]
+    frame_current = scene.frame_current
+
+    # every object's hull corners in camera space, frame by frame
+    samples = []
+    for frame in range(frame_start, frame_end + 1, max(1, frame_step)):
+        scene.frame_set(frame)
+        cam_matrix = np.array(cam.matrix_world.normalized(), dtype=np.float64)
+        to_cam = np.linalg.inv(cam_matrix)
+        cam_points = np.concatenate([transform_points(np.dot(to_cam, np.array(obj.matrix_world, dtype=np.float64)), hull) for obj, hull in zip(objs, hulls)])
+        pivot = (cam_points.min(axis=0) + cam_points.max(axis=0)) / 2.0
+        bounds, ortho = frame_fit_bounds(cam, scene, margin=margin)
+        samples.append((frame, cam_matrix, cam_points, pivot, bounds, ortho))
+    scene.frame_set(frame_current)
+
+    scales = [solve_fit_scale(cam_points, pivot, bounds, ortho, max_scale=max_scale) for frame, cam_matrix, cam_points, pivot, bounds, ortho in samples]
+    solved_scales = [scale for scale in scales if scale is not None]
+    steady = min(solved_scales) if steady_scale and solved_scales else None
+
+    fits = []
+    for (frame, cam_matrix, cam_points, pivot, bounds, ortho), scale in zip(samples, scales):
+        moves = None
+        if steady is not None:
+            moves = fit_moves(cam_points, pivot, steady, bounds, ortho)
+            scale = steady if moves else scale
+        if not moves and scale is not None:
+            moves = fit_moves(cam_points, pivot, scale, bounds, ortho)
+        if not moves:
+            fits.append({'frame': frame, 'scale': None, 'matrix': None})
+            continue
+        # smallest move within the allowed range
+        move = [min(max(0.0, low), high) for low, high in moves]
+        # scale about pivot then move, all in camera space
+        fit_cam = np.identity(4)
+        fit_cam[:3, :3] *= scale
+        fit_cam[:3, 3] = pivot * (1 - scale) + np.array([move[0], move[1], 0.0])
+        fits.append({'frame': frame, 'scale': scale, 'matrix': np.dot(cam_matrix, np.dot(fit_cam, np.linalg.inv(cam_matrix)))})
+    return fits
+
+def fitted_basis(obj, fit_matrix):
+    """Location and scale putting an object where a world space fit moves it"""
+    world = np.dot(fit_matrix, np.array(obj.matrix_world, dtype=np.float64))
+    if obj.parent:
+        parent_space = np.dot(np.array(obj.parent.matrix_world, dtype=np.float64), np.array(obj.matrix_parent_inverse, dtype=np.float64))
+        world = np.dot(np.linalg.inv(parent_space), world)
+    scale = np.linalg.norm(world[:3, :3], axis=0) * np.sign(np.array(tuple(obj.scale)))
+    return (world[:3, 3], scale)
+
+def apply_frame_fit(objs, fits, write_keys=True, scene=None):
+    """Key fitted location and scale on objects at every solved frame, or set them for the current frame only"""
+    if scene is None:
+        scene = bpy.context.scene
+    fits = [fit for fit in fits if fit['matrix'] is not None]
+    if not write_keys:
+        fits = [fit for fit in fits if fit['frame'] == scene.frame_current]
+    frame_current = scene.frame_current
+    bases = {obj.name: ([], []) for obj in objs}
+    # read every fitted transform before changing any object
+    for fit in fits:
+        write_keys and scene.frame_set(fit['frame'])
+        for obj in objs:
+            location, scale = fitted_basis(obj, fit['matrix'])
+            bases[obj.name][0].append(location)
+            bases[obj.name][1].append(scale)
+    write_keys and scene.frame_set(frame_current)
+    if not fits:
+        return objs
+    frames = np.array([fit['frame'] for fit in fits], dtype=np.float64)
+    for obj in objs:
+        locations, scales = np.array(bases[obj.name][0]), np.array(bases[obj.name][1])
+        if write_keys:
+            write_action_keys(object_action(obj), 'location', frames, locations)
+            write_action_keys(object_action(obj), 'scale', frames, scales)
+        else:
+            obj.location = locations[-1].tolist()
+            obj.scale = scales[-1].tolist()
+    return objs
+
+def fit_objects_to_frustum(objs=None, cam=None, frame_start=None, frame_end=None, margin=0.05, max_scale=1.0, steady_scale=True, write_keys=False, scene=None):
+    """Keep selected objects inside camera view across a frame range (default current frame)"""
+    if scene is None:
+        scene = bpy.context.scene
+    if objs is None:
+        objs = [obj for obj in scene.objects if obj.select and obj != scene.camera]
+    fits = solve_frame_fit(objs, cam=cam, frame_start=frame_start, frame_end=frame_end, margin=margin, max_scale=max_scale, steady_scale=steady_scale, scene=scene)
+    apply_frame_fit(objs, fits, write_keys=write_keys, scene=scene)
+    return fits
+
+if __name__ == '__main__':
+    # test runs
+    #fit_vertices_to_frustum(bpy.context.object, bpy.context.scene.camera)
+    cam, obj = get_current_cam_and_obj()
+    obj_edges = get_edge_vertices_uv_xy(obj, cam)
+    # reduce to only most extreme val
+    #if obj_edges:
+    #    obj_edges = {k: compare_abs_values_return_rel_values(v) for (k, v) in obj_edges.items()}
+    #    calc_move_vertex_to_pivot_xy_cam_center(obj, cam, obj_edges)
+    if obj_edges:   # selected obj
+        move_vertex_to_cam(obj_edges, obj, cam)
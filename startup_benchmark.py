@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import subprocess
+
+## Startup Benchmark
+##
+## Blender Python script by Joshua R (GitHub user Botmasher)
+##
+## Time how long each script in anim/ and vse/ takes to import and register.
+## Module-level scene work, like reading bpy.context or running test calls,
+## shows up here as slow or failing imports.
+##
+## Run inside Blender to time every module in one process:
+##     blender -b --factory-startup --python startup_benchmark.py -- --repeat 3
+##
+## Run from a shell to also time whole Blender launches with and without the scripts:
+##     python startup_benchmark.py --blender /path/to/blender --report startup.json
+
+# directories next to this file holding addon scripts
+benchmark_dirs = ['anim', 'vse']
+
+# marks the benchmark's result line among Blender's own console output
+result_marker = "STARTUP_BENCHMARK_RESULT:"
+
+def find_modules(dirs):
+    """List (directory, module name) pairs for every script in the benchmarked directories"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    modules = []
+    for d in dirs:
+        path = os.path.join(root, d)
+        for f in sorted(os.listdir(path)):
+            if f.endswith('.py') and f != '__init__.py':
+                modules.append((path, f[:-3]))
+    return modules
+
+def time_call(f):
+    """Run a function and return (seconds, error message or None)"""
+    time_start = time.perf_counter()
+    try:
+        f()
+        error = None
+    except Exception as e:
+        error = "{0}: {1}".format(type(e).__name__, " ".join(str(e).split()))
+    return (time.perf_counter() - time_start, error)
+
+def benchmark_module(path, name):
+    """Import one script fresh, then register and unregister it if it is an addon"""
+    path not in sys.path and sys.path.insert(0, path)
+    loaded = set(sys.modules)
+    result = {'module': "{0}/{1}".format(os.path.basename(path), name)}
+
+    result['import'], result['error'] = time_call(lambda: importlib.import_module(name))
+    module = sys.modules.get(name)
+    if module and not result['error'] and hasattr(module, 'register'):
+        result['register'], result['error'] = time_call(module.register)
+        if hasattr(module, 'unregister'):
+            result['unregister'], error = time_call(module.unregister)
+            result['error'] = result['error'] or error
+
+    # forget scripts imported along the way so the next pass imports them fresh
+    for loaded_name in set(sys.modules) - loaded:
+        loaded_file = getattr(sys.modules[loaded_name], '__file__', None) or ''
+        os.path.dirname(os.path.abspath(loaded_file)) == path and sys.modules.pop(loaded_name)
+    return result
+
+def run_benchmark(dirs=benchmark_dirs, repeat=1):
+    """Benchmark every module repeat times and keep each module's fastest pass"""
+    best = {}
+    for i in range(max(1, repeat)):
+        for path, name in find_modules(dirs):
+            result = benchmark_module(path, name)
+            total = result['import'] + result.get('register', 0.0)
+            previous = best.get(result['module'])
+            if previous is None or total < previous['import'] + previous.get('register', 0.0):
+                best[result['module']] = result
+    results = sorted(best.values(), key=lambda result: result['import'] + result.get('register', 0.0), reverse=True)
+    return {
+        'modules': results,
+        'import': sum(result['import'] for result in results),
+        'register': sum(result.get('register', 0.0) for result in results),
+        'failed': len([result for result in results if result['error']])
+    }
+
+def format_report(report):
+    """Lay out per-module timings slowest first"""
+    lines = ["{0:<40} {1:>10} {2:>10}  {3}".format("module", "import ms", "reg ms", "error")]
+    for result in report['modules']:
+        register_ms = "{0:.2f}".format(result['register'] * 1000) if 'register' in result else "-"
+        lines.append("{0:<40} {1:>10.2f} {2:>10}  {3}".format(result['module'], result['import'] * 1000, register_ms, result['error'] or ""))
+    lines.append("{0:<40} {1:>10.2f} {2:>10.2f}  {3} failed".format("total", report['import'] * 1000, report['register'] * 1000, report['failed']))
+    launch = report.get('launch')
+    if launch:
+        lines.append("Blender launch {0:.2f}s bare, {1:.2f}s with scripts (+{2:.2f}s)".format(launch['bare'], launch['scripts'], launch['scripts'] - launch['bare']))
+    return "\n".join(lines)
+
+## Parent side - plain Python launching Blender
+
+def time_launch(command):
+    """Run a command to completion and return its wall time and output"""
+    time_start = time.perf_counter()
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    return (time.perf_counter() - time_start, process.stdout)
+
+def run_launch_benchmark(blender, dirs=benchmark_dirs, repeat=1):
+    """Compare bare background launches against launches that import and register every script"""
+    bare_command = [blender, '-b', '--factory-startup', '--python-expr', 'pass']
+    scripts_command = [
+        blender, '-b', '--factory-startup',
+        '--python', os.path.abspath(__file__),
+        '--', '--in-blender', '--repeat', str(repeat), '--dirs', *dirs
+    ]
+    bare = min(time_launch(bare_command)[0] for i in range(max(1, repeat)))
+    scripts, output = time_launch(scripts_command)
+    report = None
+    for line in output.splitlines():
+        if line.startswith(result_marker):
+            report = json.loads(line[len(result_marker):])
+    if report is None:
+        print(output)
+        raise Exception("Failed to read startup benchmark results from Blender")
+    report['launch'] = {'bare': bare, 'scripts': scripts}
+    return report
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Time importing and registering every anim/ and vse/ script")
+    parser.add_argument('--blender', default='blender', help="path to the Blender executable")
+    parser.add_argument('--dirs', nargs='+', default=benchmark_dirs, help="script directories to benchmark")
+    parser.add_argument('--repeat', type=int, default=1, help="passes per module, keeping the fastest")
+    parser.add_argument('--report', default=None, help="also write the JSON report here")
+    parser.add_argument('--in-blender', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv):
+    args = parse_args(argv)
+    try:
+        import bpy
+        in_blender = True
+    except ImportError:
+        in_blender = False
+    if in_blender:
+        report = run_benchmark(dirs=args.dirs, repeat=args.repeat)
+        if args.in_blender:
+            print(result_marker + json.dumps(report))
+            sys.stdout.flush()
+            return 0
+    else:
+        report = run_launch_benchmark(args.blender, dirs=args.dirs, repeat=args.repeat)
+    print(format_report(report))
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            report_file.write(json.dumps(report, indent=2))
+    return 1 if report['failed'] else 0
+
+if __name__ == '__main__':
+    # Blender passes script arguments after "--"
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
@@ -0,0 +1,283 @@
+import os
+import json
+import wave
+import struct
+import hashlib
+import threading
+import numpy as np
+
+## Audio Analysis Cache
+##
+## Blender Python script by Joshua R (GitHub user Botmasher)
+##
+## Shared on-disk store of sound file analysis for the audio-driven VSE and anim tools.
+## Per-frame envelopes and spectrogram frames are saved as .npy blobs and read back
+## memory mapped, so re-baking or re-leveling after an edit costs a lookup instead
+## of a full decode. WAV files are memory mapped and other formats go through a
+## pluggable decoder (see register_decoder), shared with the loudness tools.
+##
+## Entries are keyed by the sound file's path, size and mtime plus the analysis
+## parameters. Any change to the file makes a new entry. The cache is capped in size,
+## and the least recently used blobs go first. A hit touches the blob's mtime, so
+## several Blender processes can share one cache directory without a shared index.
+##
+## Usage:
+##     import audio_cache
+##     levels = audio_cache.envelope(path, fps=24)
+##     mouth = audio_cache.band_energy(path, [(80, 800), (800, 2500)], fps=24)
+##
+## The cache directory defaults to ~/.cache/blender-audio-analysis. Set the
+## BLENDER_AUDIO_CACHE environment variable to move it.
+
+cache_dir = os.environ.get('BLENDER_AUDIO_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'blender-audio-analysis'))
+# evict least recently used blobs past this many bytes
+max_cache_bytes = 2 << 30
+# audio frames decoded at once while streaming a file
+chunk_frames = 1 << 16
+# samples in each short-time FFT window
+fft_size = 1024
+
+cache_lock = threading.Lock()
+
+## Decoding
+
+# file extension: decoder(path) returning (samples array shaped frames x channels, sample rate)
+decoders = {}
+
+def register_decoder(extensions, decoder):
+    """Use a decoder for files with these extensions
+
+    decoder(path) returns (samples, sample_rate) where samples is an array
+    shaped (frames, channels) of floats or integer PCM. 24-bit PCM may be
+    passed as uint8 bytes shaped (frames, channels, 3).
+    """
+    for extension in extensions:
+        decoders[extension.lower()] = decoder
+    return decoder
+
+def find_wav_data(path):
+    """Find the byte offset and size of the sample data chunk in a RIFF WAVE file"""
+    with open(path, 'rb') as f:
+        riff, size, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError("Not a RIFF WAVE file: {0}".format(path))
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("No data chunk found in {0}".format(path))
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'data':
+                return (f.tell(), chunk_size)
+            # chunks are padded to even sizes
+            f.seek(chunk_size + (chunk_size & 1), 1)
+
+def decode_wav(path):
+    """Memory map PCM samples from a WAV file without reading them all in"""
+    with wave.open(path, 'rb') as w:
+        channels, sample_width, sample_rate, frames = w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()
+    offset, size = find_wav_data(path)
+    frames = min(frames, size // (channels * sample_width))
+    if sample_width == 3:
+        samples = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(frames, channels, 3))
+    else:
+        dtype = {1: np.uint8, 2: '<i2', 4: '<i4'}[sample_width]
+        samples = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(frames, channels))
+    return (samples, sample_rate)
+
+def decode_aud(path):
+    """Decode any format Blender's audio library reads (needs aud.Sound.data from 2.8+)"""
+    import aud
+    sound = aud.Sound(path)
+    sample_rate, channels = sound.specs
+    return (np.asarray(sound.data(), dtype=np.float32).reshape(-1, channels), sample_rate)
+
+register_decoder(['.wav', '.wave'], decode_wav)
+
+def get_decoder(path):
+    """Pick the decoder for a file, falling back to Blender's audio library"""
+    return decoders.get(os.path.splitext(path)[1].lower(), decode_aud)
+
+def to_float(chunk):
+    """Convert a chunk of PCM samples to floats between -1 and 1"""
+    if chunk.ndim == 3:
+        # 24-bit little endian bytes - shift into the top of a 32-bit int
+        chunk = np.asarray(chunk, dtype=np.int32)
+        chunk = (chunk[..., 0] << 8 | chunk[..., 1] << 16 | chunk[..., 2] << 24) >> 8
+        return chunk / float(1 << 23)
+    if chunk.dtype == np.uint8:
+        return (chunk.astype(np.float64) - 128.0) / 128.0
+    if np.issubdtype(chunk.dtype, np.integer):
+        return chunk / float(np.iinfo(chunk.dtype).max + 1)
+    return np.asarray(chunk, dtype=np.float64)
+
+## Analysis
+
+def read_audio_chunks(path, chunk_size=chunk_frames):
+    """Open an audio file and return its sample rate and a generator of mono float chunks"""
+    samples, sample_rate = get_decoder(path)(path)
+    # memory mapped WAV samples are only read a chunk at a time
+    return (sample_rate, (to_float(samples[i:i + chunk_size]).mean(axis=1) for i in range(0, len(samples), chunk_size)))
+
+def compute_envelope(path, fps, chunk_size=chunk_frames):
+    """Compute the RMS amplitude of each scene frame's window of audio, streaming the file"""
+    sample_rate, chunks = read_audio_chunks(path, chunk_size=chunk_size)
+    square_sums = np.zeros(1024)
+    counts = np.zeros(1024)
+    position = 0
+    for chunk in chunks:
+        # scene frames overlapping this chunk and the sample each one starts at
+        first = int(position * fps // sample_rate)
+        last = int((position + len(chunk) - 1) * fps // sample_rate)
+        starts = np.ceil(np.arange(first + 1, last + 1) * sample_rate / fps).astype(np.int64) - position
+        starts = np.concatenate([[0], starts])
+        while last >= len(square_sums):
+            square_sums = np.concatenate([square_sums, np.zeros(len(square_sums))])
+            counts = np.concatenate([counts, np.zeros(len(counts))])
+        square_sums[first:last + 1] += np.add.reduceat(np.square(chunk), starts)
+        counts[first:last + 1] += np.diff(np.append(starts, len(chunk)))
+        position += len(chunk)
+    frames = int(np.ceil(position * fps / sample_rate))
+    envelope = np.sqrt(square_sums[:frames] / np.maximum(counts[:frames], 1)).astype(np.float32)
+    return (envelope, {'sample_rate': sample_rate})
+
+def compute_spectrogram(path, fps, size=fft_size, chunk_size=chunk_frames):
+    """Run a short-time FFT with one window per scene frame, streaming the file"""
+    sample_rate, chunks = read_audio_chunks(path, chunk_size=chunk_size)
+    window = np.hanning(size)
+    spectra = []
+    carry = np.zeros(0)
+    offset = 0          # sample index of carry[0]
+    frame = 0           # next scene frame to analyze
+    for chunk in chunks:
+        buffer = np.concatenate([carry, chunk])
+        end = offset + len(buffer)
+        # frames whose whole window has been read, each window starting at its frame's first sample
+        last = int((end - size) * fps // sample_rate) if end >= size else -1
+        starts = np.ceil(np.arange(frame, last + 1) * sample_rate / fps).astype(np.int64) - offset
+        if len(starts):
+            windows = np.lib.stride_tricks.as_strided(buffer, shape=(len(buffer) - size + 1, size), strides=(buffer.strides[0], buffer.strides[0]))
+            spectra.append(np.square(np.abs(np.fft.rfft(windows[starts] * window, axis=1))).astype(np.float32))
+            frame = last + 1
+        # drop samples before the next frame's window, which may start past this buffer
+        keep = min(int(np.ceil(frame * sample_rate / fps)) - offset, len(buffer))
+        carry = buffer[keep:]
+        offset += keep
+    # pad the final windows past the end of the audio
+    frames = int(np.ceil((offset + len(carry)) * fps / sample_rate))
+    if frame < frames:
+        buffer = np.concatenate([carry, np.zeros(size)])
+        starts = np.ceil(np.arange(frame, frames) * sample_rate / fps).astype(np.int64) - offset
+        spectra.append(np.square(np.abs(np.fft.rfft(np.stack([buffer[i:i + size] for i in starts]) * window, axis=1))).astype(np.float32))
+    power = np.concatenate(spectra) if spectra else np.zeros((0, size // 2 + 1), dtype=np.float32)
+    return (power, {'sample_rate': sample_rate})
+
+## On-disk store
+
+def entry_name(path, kind, params):
+    """Blob file name for one analysis of one version of a file"""
+    stat = os.stat(path)
+    key = json.dumps([os.path.abspath(path), stat.st_size, stat.st_mtime_ns, kind, params], sort_keys=True)
+    return "{0}-{1}".format(hashlib.sha1(key.encode('utf-8')).hexdigest()[:24], kind)
+
+def load_entry(name):
+    """Memory map a cached blob and read its metadata, or return None on a miss"""
+    blob_path = os.path.join(cache_dir, name + '.npy')
+    meta_path = os.path.join(cache_dir, name + '.json')
+    try:
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+        array = np.load(blob_path, mmap_mode='r')
+    except (IOError, OSError, ValueError):
+        return None
+    # mark as recently used
+    os.utime(blob_path, None)
+    return (array, meta)
+
+def store_entry(name, array, meta):
+    """Write a blob and its metadata, replacing files atomically"""
+    os.makedirs(cache_dir, exist_ok=True)
+    blob_path = os.path.join(cache_dir, name + '.npy')
+    meta_path = os.path.join(cache_dir, name + '.json')
+    suffix = ".{0}.{1}.tmp".format(os.getpid(), threading.get_ident())
+    with open(meta_path + suffix, 'w') as meta_file:
+        json.dump(meta, meta_file)
+    with open(blob_path + suffix, 'wb') as blob_file:
+        np.save(blob_file, np.ascontiguousarray(array))
+    # metadata first so a readable blob always has its metadata
+    os.replace(meta_path + suffix, meta_path)
+    os.replace(blob_path + suffix, blob_path)
+    evict()
+
+def cache_entries():
+    """List (last used, bytes, name) for every cached blob"""
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for f in os.listdir(cache_dir):
+        if not f.endswith('.npy'):
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_dir, f))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, f[:-len('.npy')]))
+    return entries
+
+def evict(max_bytes=None):
+    """Remove least recently used blobs until the cache fits within max_bytes"""
+    max_bytes = max_cache_bytes if max_bytes is None else max_bytes
+    entries = sorted(cache_entries())
+    total = sum(size for used, size, name in entries)
+    removed = []
+    for used, size, name in entries:
+        if total <= max_bytes:
+            break
+        for extension in ('.npy', '.json'):
+            try:
+                os.remove(os.path.join(cache_dir, name + extension))
+            except OSError:
+                pass
+        total -= size
+        removed.append(name)
+    return removed
+
+def clear():
+    """Empty the cache"""
+    return evict(max_bytes=0)
+
+def cached(path, kind, params, compute):
+    """Return (array, metadata) for an analysis of a file, computing and storing it on a miss
+
+    compute() returns an (array, metadata dict) pair for the current file contents.
+    """
+    path = os.path.abspath(path)
+    name = entry_name(path, kind, params)
+    with cache_lock:
+        entry = load_entry(name)
+    if entry is not None:
+        return entry
+    array, meta = compute()
+    with cache_lock:
+        store_entry(name, array, meta)
+        entry = load_entry(name)
+    return entry if entry is not None else (array, meta)
+
+## Queries
+
+def envelope(path, fps):
+    """Per-frame RMS amplitude of a sound file at a frame rate"""
+    fps = float(fps)
+    return cached(path, 'envelope', {'fps': fps}, lambda: compute_envelope(path, fps))[0]
+
+def spectrogram(path, fps, size=fft_size):
+    """Bin frequencies and per-frame power spectrum of a sound file at a frame rate"""
+    fps = float(fps)
+    power, meta = cached(path, 'spectrogram', {'fps': fps, 'size': size}, lambda: compute_spectrogram(path, fps, size=size))
+    return (np.fft.rfftfreq(size, 1.0 / meta['sample_rate']), power)
+
+def band_energy(path, bands, fps, size=fft_size):
+    """Per-frame amplitude within each (low Hz, high Hz) band, shaped frames x bands"""
+    freqs, power = spectrogram(path, fps, size=size)
+    # bins x bands matrix picking out each band's frequencies
+    masks = np.stack([(freqs >= low) & (freqs < high) for low, high in bands], axis=1).astype(np.float32)
+    return np.sqrt(np.dot(power, masks))
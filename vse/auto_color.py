@@ -32,8 +32,8 @@ def recolor_sequence(strip, lift, gamma, gain, modifier_name='Color Balance', re
 
     # remove any Color Balance modifiers
     if remove_existing:
-        for modifier in strip.modifiers:
-            remove_modifiers and modifier_name in modifier.name and bpy.ops.sequencer.strip_modifier_remove(name=modifier.name)
+        for modifier in [*strip.modifiers]:
+            remove_existing and modifier_name in modifier.name and strip.modifiers.remove(modifier)
 
     # setup new Color Balance modifier
     if balance_desaturated or strip.color_saturation > desaturated_threshold:
@@ -63,9 +63,10 @@ def recolor_named_sequences(name_match='', use_selected=False, lift=[], gamma=[]
         if name_match in s.name and (not use_selected or s.select):
             print("modifying sequence {0}".format(s.name))
             scene.sequence_editor.active_strip = s
-            colored_s = recolor_sequence(s, new_lift, new_gamma, new_gain, balance_desaturated=balance_desaturated)
+            colored_s = recolor_sequence(s, lift, gamma, gain, balance_desaturated=balance_desaturated)
             colored_s and modified_sequences.append(s)
 
     return modified_sequences
 
-recolor_named_sequences(name_match=target_strips_name, use_selected=use_selected, lift=new_lift, gamma=new_gamma, gain=new_gain, balance_desaturated=balance_desaturated)
+if __name__ == '__main__':
+    recolor_named_sequences(name_match=target_strips_name, use_selected=use_selected, lift=new_lift, gamma=new_gamma, gain=new_gain, balance_desaturated=balance_desaturated)
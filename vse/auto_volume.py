@@ -1,5 +1,8 @@
 import bpy
 import re
+from timeline_index import get_index
+import bulk_volume
+from bulk_volume import set_volumes
 
 ####
 # MASS AUDIO VOLUME SET
@@ -28,8 +31,12 @@ def set_volume(strip, new_volume):
         return True
     return False
 
-def filter_strips(strips, match_name='', strip_type='SOUND'):
-    """Filter down sequences of a type that have names matching a regex"""
+def filter_strips(strips=None, match_name='', strip_type='SOUND'):
+    """Filter down sequences of a type that have names matching a regex
+    Searches the whole timeline index when no strips are passed in
+    """
+    if strips is None:
+        return get_index().matching(match_name, strip_type=strip_type, top_level=True)
     match_name = '.*' if not match_name else match_name
     r_name = re.compile(match_name)
     matches = []
@@ -42,13 +49,17 @@ def get_selected(strips):
     """Return only sequences where select is True"""
     return [strip for strip in strips if strip.select]
 
-def set_mass_volume(strips=bpy.context.scene.sequence_editor.sequences, name='', volume=1.0, selected_only=False):
-    """Set the volume for sequences, optionally limiting by name regex or selection"""
-    strips = get_selected(strips) if selected_only else strips
-    volume_strips = filter_strips(strips, match_name=name)
+def set_mass_volume(strips=None, name='', volume=1.0, selected_only=False, mode='SET'):
+    """Set, multiply or normalize the volume for sequences, optionally limiting by name regex or selection"""
+    if strips is None:
+        volume_strips = get_index().matching(name, strip_type='SOUND', selected_only=selected_only, top_level=True)
+    else:
+        strips = get_selected(strips) if selected_only else strips
+        volume_strips = filter_strips(strips, match_name=name)
     print(volume_strips)
-    for strip in volume_strips:
-        set_volume(strip, volume)
+    set_volumes(volume_strips, mode=mode, value=volume)
     return volume_strips
 
-set_mass_volume(volume=updated_volume, name=target_strips_re)
+if __name__ == '__main__':
+    bulk_volume.register()
+    set_mass_volume(volume=updated_volume, name=target_strips_re)
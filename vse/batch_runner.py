@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+## VSE Batch Runner
+##
+## Blender Python VSE script by Joshua R (GitHub user Botmasher)
+##
+## Run one VSE utility over a whole directory of .blend files in background mode.
+## Each file gets its own `blender -b` process. A pool of those processes runs
+## side by side, and per-file results and timings are collected into one report.
+##
+## Run from a shell (outside Blender):
+##     python batch_runner.py ~/season-02 --utility auto_volume \
+##         --args '{"name": "dialogue", "volume": 1.2}' --save --jobs 4 --report report.json
+##
+## Available utilities and their explicit arguments are listed in batch_utilities below.
+## Use {name} in a string argument (like a catalog path) for the .blend file's base name.
+##
+## Blender runs this same file as the worker:
+##     blender -b file.blend --python batch_runner.py -- --worker --utility ... --args ...
+
+# marks the worker's result line among Blender's own console output
+result_marker = "BATCH_RUNNER_RESULT:"
+
+# utility name: (module in this directory, function, default explicit arguments)
+batch_utilities = {
+    'auto_volume': ('auto_volume', 'set_mass_volume', {'name': '', 'volume': 1.0, 'selected_only': False}),
+    'auto_gain': ('loudness', 'auto_gain', {'name': '', 'selected_only': False, 'target': -23.0, 'max_peak': -1.0}),
+    'auto_color': ('auto_color', 'recolor_named_sequences', {
+        'name_match': '',
+        'use_selected': False,
+        'lift': [0.97, 0.97, 1.0],
+        'gamma': [0.88, 0.83, 0.83],
+        'gain': [1.45, 1.4, 1.38],
+        'balance_desaturated': False
+    }),
+    'asset_catalog': ('find_strips_name_type', 'run_asset_catalog', {
+        'catalog_path': '//{name}-assets.csv',
+        'sequence_types': ['IMAGE', 'MOVIE', 'SOUND'],
+        'ignored_names': {},
+        'catalog_format': 'csv'
+    })
+}
+
+def summarize_result(result):
+    """Reduce a utility's return value to something JSON can store"""
+    if result is None or isinstance(result, (bool, int, float, str)):
+        return result
+    if isinstance(result, dict):
+        return {str(k): summarize_result(v) for k, v in result.items()}
+    if hasattr(result, '__len__'):
+        return {'count': len(result)}
+    return repr(result)
+
+def format_utility_args(utility_args, blend_name):
+    """Fill {name} placeholders in string arguments with the .blend base name"""
+    return {k: v.format(name=blend_name) if isinstance(v, str) else v for k, v in utility_args.items()}
+
+## Worker side - runs inside `blender -b`
+
+def run_worker(utility, utility_args, save=False):
+    """Run a utility against the open .blend file and print its result for the parent process"""
+    import bpy
+    import importlib
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    time_start = time.perf_counter()
+    blend_name = os.path.splitext(os.path.basename(bpy.data.filepath))[0]
+    module_name, function_name, default_args = batch_utilities[utility]
+    kwargs = format_utility_args(dict(default_args, **utility_args), blend_name)
+    if not bpy.context.scene.sequence_editor:
+        # leave the file untouched rather than saving an empty sequencer into it
+        report = {'status': 'skipped', 'reason': "no sequencer", 'seconds': time.perf_counter() - time_start}
+        print(result_marker + json.dumps(report))
+        sys.stdout.flush()
+        return report
+    try:
+        module = importlib.import_module(module_name)
+        result = getattr(module, function_name)(**kwargs)
+        save and bpy.ops.wm.save_mainfile()
+        report = {'status': 'ok', 'result': summarize_result(result)}
+    except Exception as e:
+        report = {'status': 'error', 'error': "{0}: {1}".format(type(e).__name__, e)}
+    report['seconds'] = time.perf_counter() - time_start
+    print(result_marker + json.dumps(report))
+    sys.stdout.flush()
+    return report
+
+## Parent side - plain Python launching Blender workers
+
+def find_blend_files(directory, recursive=False):
+    """List .blend files in a directory, optionally including subdirectories"""
+    if not recursive:
+        return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.blend'))
+    blend_files = []
+    for root, dirs, files in os.walk(directory):
+        blend_files += [os.path.join(root, f) for f in files if f.endswith('.blend')]
+    return sorted(blend_files)
+
+def run_blend_file(blender, blend_file, utility, utility_args, save=False, timeout=None):
+    """Launch one background Blender on a .blend file and parse the worker's result"""
+    command = [
+        blender, '-b', blend_file,
+        '--python', os.path.abspath(__file__),
+        '--', '--worker',
+        '--utility', utility,
+        '--args', json.dumps(utility_args)
+    ]
+    save and command.append('--save')
+    time_start = time.perf_counter()
+    try:
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, timeout=timeout)
+        output = process.stdout
+    except subprocess.TimeoutExpired:
+        output = ''
+    report = {'status': 'error', 'error': "no result from Blender worker"}
+    for line in output.splitlines():
+        if line.startswith(result_marker):
+            report = json.loads(line[len(result_marker):])
+    report['file'] = blend_file
+    report['wall_seconds'] = time.perf_counter() - time_start
+    return report
+
+def run_batch(blender, blend_files, utility, utility_args={}, save=False, jobs=2, timeout=None):
+    """Run a utility over many .blend files with jobs Blender processes at a time"""
+    time_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        reports = list(pool.map(lambda blend_file: run_blend_file(blender, blend_file, utility, utility_args, save=save, timeout=timeout), blend_files))
+    return {
+        'utility': utility,
+        'args': utility_args,
+        'files': reports,
+        'failed': len([report for report in reports if report['status'] == 'error']),
+        'skipped': len([report for report in reports if report['status'] == 'skipped']),
+        'seconds': time.perf_counter() - time_start
+    }
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run a VSE utility over a directory of .blend files in background Blender")
+    parser.add_argument('directory', nargs='?', help="directory containing .blend files")
+    parser.add_argument('--utility', required=True, choices=sorted(batch_utilities.keys()))
+    parser.add_argument('--args', default='{}', help="JSON object of explicit utility arguments")
+    parser.add_argument('--blender', default='blender', help="path to the Blender executable")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 2, help="Blender processes to run at once")
+    parser.add_argument('--recursive', action='store_true', help="include .blend files in subdirectories")
+    parser.add_argument('--save', action='store_true', help="save each .blend file after running the utility")
+    parser.add_argument('--timeout', type=float, default=None, help="seconds before giving up on one file")
+    parser.add_argument('--report', default=None, help="write the JSON report here instead of printing it")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv):
+    args = parse_args(argv)
+    utility_args = json.loads(args.args)
+    if args.worker:
+        run_worker(args.utility, utility_args, save=args.save)
+        return 0
+    if not args.directory:
+        print("batch_runner - expected a directory of .blend files")
+        return 1
+    blend_files = find_blend_files(args.directory, recursive=args.recursive)
+    report = run_batch(args.blender, blend_files, args.utility, utility_args, save=args.save, jobs=args.jobs, timeout=args.timeout)
+    report_json = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            report_file.write(report_json)
+    else:
+        print(report_json)
+    print("Ran {0} on {1} files ({2} failed, {3} without a sequencer) in {4:.1f}s".format(args.utility, len(blend_files), report['failed'], report['skipped'], report['seconds']))
+    return 1 if report['failed'] else 0
+
+if __name__ == '__main__':
+    # Blender passes script arguments after "--"
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else sys.argv[1:]
+    sys.exit(main(argv))
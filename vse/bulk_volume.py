@@ -0,0 +1,156 @@
+import bpy
+import numpy as np
+import timeline_index
+from timeline_index import get_index
+
+## Bulk Volume
+##
+## Blender Python VSE script by Joshua R (GitHub user Botmasher)
+##
+## Shared volume engine for sound strips. Gathers eligible SOUND strips once through
+## the timeline index, computes every new volume together as one array and writes the
+## results back in a single pass.
+##
+## The first time a strip's volume changes its original ("default") volume is kept,
+## and every batch records the volumes it replaced so the last change can be undone.
+##
+## Usage from another VSE script:
+##     from bulk_volume import gather_sound_strips, set_volumes
+##     set_volumes(gather_sound_strips(name='dialogue'), mode='MULTIPLY', value=0.8)
+
+# Blender clamps sound strip volume to this range
+min_volume = 0.0
+max_volume = 100.0
+
+volume_modes = ('MULTIPLY', 'SET', 'NORMALIZE')
+
+# scene name: {strip name: volume before any bulk change}
+original_volumes = {}
+# scene name: [{strip name: volume before one batch}, ...]
+volume_history = {}
+# batches kept per scene for undo
+max_history = 32
+
+def gather_sound_strips(scene=None, name='', selected_only=False, regex=False, top_level=True):
+    """List SOUND strips whose names contain a substring or match a regex
+
+    Strips inside meta strips are left out unless top_level is False.
+    """
+    index = get_index(scene)
+    if regex:
+        return index.matching(name, strip_type='SOUND', selected_only=selected_only, top_level=top_level)
+    return index.named(name, strip_type='SOUND', selected_only=selected_only, top_level=top_level)
+
+def read_volumes(strips):
+    """Read current strip volumes into an array"""
+    return np.fromiter((strip.volume for strip in strips), dtype=np.float64, count=len(strips))
+
+def plan_volumes(volumes, mode='SET', value=1.0):
+    """Compute new volumes from current ones without touching any strips
+
+    MULTIPLY    scale every volume by value
+    SET         give every strip the same volume value
+    NORMALIZE   scale volumes together so the loudest strip sits at value
+    """
+    volumes = np.asarray(volumes, dtype=np.float64)
+    if mode == 'MULTIPLY':
+        planned = volumes * value
+    elif mode == 'SET':
+        planned = np.full(volumes.shape, value, dtype=np.float64)
+    elif mode == 'NORMALIZE':
+        loudest = volumes.max() if volumes.size else 0.0
+        planned = volumes * (value / loudest) if loudest > 0 else np.full(volumes.shape, value, dtype=np.float64)
+    else:
+        raise ValueError("Unknown volume mode {0} - expected one of {1}".format(mode, volume_modes))
+    return np.clip(planned, min_volume, max_volume)
+
+def write_volumes(strips, volumes):
+    """Assign an array of volumes to strips in one pass"""
+    for strip, volume in zip(strips, volumes.tolist()):
+        strip.volume = volume
+    return strips
+
+def snapshot_volumes(strips, volumes, scene=None):
+    """Record original volumes for strips seen for the first time and push an undo batch"""
+    scene = scene or bpy.context.scene
+    originals = original_volumes.setdefault(scene.name, {})
+    batch = {}
+    for strip, volume in zip(strips, volumes.tolist()):
+        originals.setdefault(strip.name, volume)
+        batch[strip.name] = volume
+    history = volume_history.setdefault(scene.name, [])
+    history.append(batch)
+    del history[:-max_history]
+    return batch
+
+def apply_volumes(strips, volumes, scene=None):
+    """Snapshot strips' current volumes then write the new ones"""
+    strips = [*strips]
+    if not strips:
+        return strips
+    snapshot_volumes(strips, read_volumes(strips), scene=scene)
+    return write_volumes(strips, np.asarray(volumes, dtype=np.float64))
+
+def set_volumes(strips, mode='SET', value=1.0, scene=None):
+    """Multiply, set or normalize the volumes of many sound strips at once"""
+    strips = [strip for strip in strips if strip.type == 'SOUND']
+    if not strips:
+        return strips
+    return apply_volumes(strips, plan_volumes(read_volumes(strips), mode=mode, value=value), scene=scene)
+
+def restore_batch(batch, scene):
+    """Write remembered volumes back to strips that still exist"""
+    sequencer = scene.sequence_editor
+    if not sequencer:
+        return []
+    strips = []
+    volumes = []
+    for name, volume in batch.items():
+        strip = sequencer.sequences_all.get(name)
+        if strip:
+            strips.append(strip)
+            volumes.append(volume)
+    return write_volumes(strips, np.array(volumes, dtype=np.float64))
+
+def undo_volumes(scene=None):
+    """Revert the most recent bulk volume change"""
+    scene = scene or bpy.context.scene
+    history = volume_history.get(scene.name)
+    if not history:
+        return []
+    return restore_batch(history.pop(), scene)
+
+def restore_original_volumes(strips=None, scene=None):
+    """Return strips to the volumes they had before any bulk change"""
+    scene = scene or bpy.context.scene
+    originals = original_volumes.get(scene.name, {})
+    if strips is not None:
+        names = set(strip.name for strip in strips)
+        originals = {name: volume for name, volume in originals.items() if name in names}
+    restored = restore_batch(originals, scene)
+    # snapshots for restored strips start over
+    for strip in restored:
+        original_volumes[scene.name].pop(strip.name, None)
+    if strips is None:
+        volume_history.pop(scene.name, None)
+    return restored
+
+@bpy.app.handlers.persistent
+def clear_volume_snapshots(*args):
+    """Handler dropping snapshots when a new file loads"""
+    original_volumes.clear()
+    volume_history.clear()
+
+def register():
+    timeline_index.register()
+    if clear_volume_snapshots not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(clear_volume_snapshots)
+
+def unregister():
+    if clear_volume_snapshots in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_volume_snapshots)
+    original_volumes.clear()
+    volume_history.clear()
+
+if __name__ == '__main__':
+    register()
@@ -1,31 +1,34 @@
 import bpy
 from bpy.props import *
+import timeline_index
+from timeline_index import get_index, invalidate
 
-bpy.types.Scene.cut_smash_direction = EnumProperty(
-    items = [('left', 'Left', 'Cut and close gap before playhead'),
-             ('right', 'Right', 'Cut and close gap after playhead'),
-             #('simple', 'Starting cut', 'Cut to start strip for later cut smash')
-             ],
-    name = 'Type of cut/smash',
-    description = 'Where to soft cut frames and close gap for this strip'
-    )
-    
-bpy.types.Scene.lift_marker = EnumProperty(
-    items = [('in', 'in', ''),
-             ('out', 'out', '')],
-    name = 'Chunk marker',
-    description = 'Where to start and end extraction for this strip'
-    )
-        
-bpy.types.Scene.lift_in_marker = StringProperty(
-    name = 'In point',
-    description = 'Marker for the starting point of this cut'
-    )
+def setup_cut_smash_props():
+    bpy.types.Scene.cut_smash_direction = EnumProperty(
+        items = [('left', 'Left', 'Cut and close gap before playhead'),
+                 ('right', 'Right', 'Cut and close gap after playhead'),
+                 #('simple', 'Starting cut', 'Cut to start strip for later cut smash')
+                 ],
+        name = 'Type of cut/smash',
+        description = 'Where to soft cut frames and close gap for this strip'
+        )
+
+    bpy.types.Scene.lift_marker = EnumProperty(
+        items = [('in', 'in', ''),
+                 ('out', 'out', '')],
+        name = 'Chunk marker',
+        description = 'Where to start and end extraction for this strip'
+        )
 
-bpy.types.Scene.lift_out_marker = StringProperty(
-    name = 'Out point',
-    description = 'Marker for the ending point of this cut'
-    )
+    bpy.types.Scene.lift_in_marker = StringProperty(
+        name = 'In point',
+        description = 'Marker for the starting point of this cut'
+        )
+
+    bpy.types.Scene.lift_out_marker = StringProperty(
+        name = 'Out point',
+        description = 'Marker for the ending point of this cut'
+        )
 
 class CutSmashPanel (bpy.types.Panel):
     # Blender UI label, name, placement
@@ -49,48 +52,131 @@ class CutSmashPanel (bpy.types.Panel):
         else:
             self.layout.operator('strip.mark_lift', text="Set")
 
+## Cut/smash engine
+##
+## Plan new frame_start, frame_offset_start, frame_offset_end and channel values
+## for every affected strip from plain data, then write them back in one batch.
+## Avoids snap/cut/delete/gap_remove operators and their redraw and undo pushes.
+
+def strip_state (strip):
+    """Snapshot the placement values of one strip into a plain dict"""
+    return {
+        'name': strip.name,
+        'frame_start': strip.frame_start,
+        'frame_offset_start': strip.frame_offset_start,
+        'frame_offset_end': strip.frame_offset_end,
+        'frame_final_start': strip.frame_final_start,
+        'frame_final_end': strip.frame_final_end,
+        'channel': strip.channel
+        }
+
+def timeline_states (vse):
+    """Snapshot every top-level strip in the sequencer"""
+    return {strip.name: strip_state(strip) for strip in vse.sequences}
+
+def plan_trim (state, start=None, end=None):
+    """Soft cut a strip state so its visible frames begin at start and/or finish at end"""
+    if start is not None and state['frame_final_start'] < start < state['frame_final_end']:
+        state['frame_offset_start'] += start - state['frame_final_start']
+        state['frame_final_start'] = start
+    if end is not None and state['frame_final_start'] < end < state['frame_final_end']:
+        state['frame_offset_end'] += state['frame_final_end'] - end
+        state['frame_final_end'] = end
+    return state
+
+def find_gap (states, frame, floor=0):
+    """Find the empty (first_frame, last_frame + 1) span around a frame across all channels"""
+    gap_start = floor
+    gap_end = None
+    for state in states.values():
+        # frame is covered by a strip - no gap to close here
+        if state['frame_final_start'] <= frame < state['frame_final_end']:
+            return None
+        if state['frame_final_end'] <= frame:
+            gap_start = max(gap_start, state['frame_final_end'])
+        elif gap_end is None or state['frame_final_start'] < gap_end:
+            gap_end = state['frame_final_start']
+    if gap_end is None or gap_end <= gap_start:
+        return None
+    return (gap_start, gap_end)
+
+def plan_gap_close (states, frame, floor=0):
+    """Shift every strip after the gap around a frame left to close the gap"""
+    gap = find_gap(states, frame, floor=floor)
+    if not gap:
+        return states
+    shift = gap[1] - gap[0]
+    for state in states.values():
+        if state['frame_final_start'] >= gap[1]:
+            state['frame_start'] -= shift
+            state['frame_final_start'] -= shift
+            state['frame_final_end'] -= shift
+    return states
+
+def apply_plan (vse, original, planned):
+    """Write back only changed strip values in one pass
+
+    Trims are written before moves so strips only ever shrink or move into
+    emptied frames, and moves run earliest first to avoid overlap shuffling.
+    """
+    changed = [name for name in planned if planned[name] != original[name]]
+    strips = vse.sequences_all
+    for name in changed:
+        strip = strips[name]
+        if planned[name]['frame_offset_start'] != original[name]['frame_offset_start']:
+            strip.frame_offset_start = planned[name]['frame_offset_start']
+        if planned[name]['frame_offset_end'] != original[name]['frame_offset_end']:
+            strip.frame_offset_end = planned[name]['frame_offset_end']
+    for name in sorted(changed, key=lambda name: planned[name]['frame_final_start']):
+        strip = strips[name]
+        if planned[name]['frame_start'] != original[name]['frame_start']:
+            strip.frame_start = planned[name]['frame_start']
+        # restore channel in case the sequencer shuffled an overlapping strip
+        if strip.channel != planned[name]['channel']:
+            strip.channel = planned[name]['channel']
+    changed and invalidate(bpy.context.scene)
+    return changed
+
+def copy_states (states):
+    """Copy strip states so a plan can be compared against the original"""
+    return {name: dict(state) for name, state in states.items()}
+
 def cut_smash_left(memos):
     """Offset beginning of selected strips to current frame and close gap with previous strips"""
-    vse = bpy.context.scene.sequence_editor
-    # store location of the gap created by this soft cut
-    gap = bpy.context.scene.frame_current - 1
-    # iterate through all strips in sequencer
+    scene = bpy.context.scene
+    vse = scene.sequence_editor
+    playhead = scene.frame_current
+    original = timeline_states(vse)
+    planned = copy_states(original)
+    # "soft cut" (offset) each strip and store solution in memos
+    strip_name = None
     for strip_name in memos:
-        # check only selected strips that haven't been analyzed
-        if memos[strip_name] == 0:
-            # "soft cut" (offset) the strip and store solution in memos
-            try:
-                vse.sequences_all[strip_name].frame_offset_start = bpy.context.scene.frame_current - vse.sequences_all[strip_name].frame_start
-                memos[strip_name] = 1
-                # run function again to catch any uncut selected strips
-                #cut_smash(memos)
-            except:
-                pass
-    # skip to the frame before this strip and close gap
-    bpy.context.scene.frame_current = gap
-    bpy.ops.sequencer.gap_remove()
+        if memos[strip_name] == 0 and strip_name in planned:
+            plan_trim(planned[strip_name], start=playhead)
+            memos[strip_name] = 1
+    # close gap in the frame before the cut
+    plan_gap_close(planned, playhead - 1, floor=scene.frame_start)
+    apply_plan(vse, original, planned)
     # set the playhead to new beginning of strip to resume editing at same video location
-    if strip_name != None:
-        bpy.context.scene.frame_current = vse.sequences_all[strip_name].frame_offset_start + vse.sequences_all[strip_name].frame_start
+    if strip_name in planned:
+        scene.frame_current = planned[strip_name]['frame_final_start']
     return None
 
 def cut_smash_right (memo):
     """Offset end of selected strips to current frame and close gap with next strips"""
-    # store shortened reference to sequencer
-    vse = bpy.context.scene.sequence_editor
-    # store location of the gap created by this soft cut
-    playhead = bpy.context.scene.frame_current
+    scene = bpy.context.scene
+    vse = scene.sequence_editor
+    playhead = scene.frame_current
+    original = timeline_states(vse)
+    planned = copy_states(original)
     # "soft cut" (offset) the strips and set as solved in memo ('name':1)
     for strip_name in memo:
-        # select the sequence and its ending handle
-        vse.sequences_all[strip_name].select = True
-        vse.sequences_all[strip_name].select_right_handle = True
-        bpy.ops.sequencer.snap (frame=playhead)
-        vse.sequences_all[strip_name].select = False
-        vse.sequences_all[strip_name].select_right_handle = False
-        memo[strip_name] = 1
+        if strip_name in planned:
+            plan_trim(planned[strip_name], end=playhead)
+            memo[strip_name] = 1
     # close gap to the right of the playhead (note playhead frame is now empty)
-    bpy.ops.sequencer.gap_remove()
+    plan_gap_close(planned, playhead, floor=scene.frame_start)
+    apply_plan(vse, original, planned)
     return None
 
 def cut_simple (memo):
@@ -170,56 +256,43 @@ def lift_clip ():
     in_frame = int(in_marker.name.split('_')[1])
     out_frame = int(out_marker.name.split('_')[1])
     
-    # cut selected strips at marked in and out points
-    for strip in bpy.context.scene.sequence_editor.sequences_all:
-        if strip.select:
-            bpy.ops.sequencer.cut (frame=in_frame, type='SOFT')
-            bpy.ops.sequencer.cut (frame=out_frame, type='SOFT')
-        else:
-            pass
+    scene = bpy.context.scene
+    vse = scene.sequence_editor
+    original = timeline_states(vse)
+    planned = copy_states(original)
+    direction = scene.cut_smash_direction
 
-    # prepare trash list of edge strips beyond the marked in and out points
-    marked_for_deletion = []
-    # one cut strip to find out where it lands after deleting and closing gaps 
+    # trim selected strips to the lifted chunk and the side that stays
+    # - the cut at the opposite marker only splits two contiguous kept pieces, so skip it
     cut_strip = None
-    for strip in bpy.context.scene.sequence_editor.sequences_all:
-        # prepare to delete cut strips to the left of lifted
-        if strip.select and bpy.context.scene.cut_smash_direction == 'left':
-            if strip.frame_start + strip.frame_offset_start < in_frame:
-                marked_for_deletion.append(strip)
-        # prepare to delete cut strips to the right of lifted
-        elif strip.select and bpy.context.scene.cut_smash_direction == 'right':
-            if strip.frame_start + strip.frame_offset_start >= out_frame:
-                marked_for_deletion.append(strip)
-        else:
-            pass
-
-        # track one cut strip to find out where it lands after delete and close gaps
-        if strip.select and strip.frame_start+strip.frame_offset_start == in_frame:
-            cut_strip = strip
-
-    # toggle to deselect all strips
-    bpy.ops.sequencer.select_all()
-    
-    # select and delete the strips that surround the lifted strip
-    for trash in marked_for_deletion:
-        trash.select = True
-        bpy.ops.sequencer.delete()
+    for strip in get_index(scene).selected(top_level=True):
+        if strip.name not in planned:
+            continue
+        state = planned[strip.name]
+        if direction == 'left':
+            plan_trim(state, start=in_frame)
+        elif direction == 'right':
+            plan_trim(state, end=out_frame)
+        # track one cut strip to find out where it lands after closing gaps
+        if state['frame_final_start'] <= in_frame < state['frame_final_end']:
+            cut_strip = strip.name
 
     # close gaps either to the left or the right of lifted strip
-    if bpy.context.scene.cut_smash_direction == 'left':
-        bpy.context.scene.frame_set(in_frame-1)
-        bpy.ops.sequencer.gap_remove()
-    elif bpy.context.scene.cut_smash_direction == 'right':
-        bpy.context.scene.frame_set(out_frame)
-        bpy.ops.sequencer.gap_remove()
+    if direction == 'left':
+        plan_gap_close(planned, in_frame - 1, floor=scene.frame_start)
+    elif direction == 'right':
+        plan_gap_close(planned, out_frame, floor=scene.frame_start)
     else:
         pass
 
+    apply_plan(vse, original, planned)
+
     # move playhead to the new location of your strips
-    if cut_strip != None:
-        bpy.context.scene.frame_set (cut_strip.frame_start + strip.frame_offset_start)
-        print (cut_strip)
+    # - only gaps left of the lifted chunk move it
+    if cut_strip != None and direction == 'left':
+        scene.frame_set(planned[cut_strip]['frame_final_start'])
+    elif cut_strip != None:
+        scene.frame_set(in_frame)
 
     # delete the in and out markers
     bpy.context.scene.timeline_markers.remove(in_marker)
@@ -240,10 +313,10 @@ class CutSmashOperator (bpy.types.Operator):
     def execute (self, context):
         # memoization for cut_smash
         memos = {}
-        for strip in bpy.context.scene.sequence_editor.sequences_all:
-            if strip.select:
-                memos[strip.name] = 0
-                strip.select = False
+        for strip in get_index(context.scene).selected():
+            memos[strip.name] = 0
+            strip.select = False
+        invalidate(context.scene)
         if bpy.context.scene.cut_smash_direction == 'left':
             cut_smash_left(memos)
         elif bpy.context.scene.cut_smash_direction == 'right':
@@ -268,6 +341,8 @@ class MarkLiftOperator (bpy.types.Operator):
         return{'FINISHED'}
     
 def register():
+    timeline_index.register()
+    setup_cut_smash_props()
     bpy.utils.register_class(CutSmashPanel)
     bpy.utils.register_class(CutSmashOperator)
     bpy.utils.register_class(MarkLiftOperator)
@@ -1,6 +1,9 @@
 #!/usr/bin/python
 import bpy
 import re
+import os
+import csv
+import json
 
 ## Find and display relevant media sequence strips from the Blender VSE
 ##
@@ -33,17 +36,15 @@ import re
 # TODO split filename from end of path if ignoring paths (but give some indication of duplicate names from different paths)
 
 def build_ignored_names_re(namestrings, ignored_res_list):
-	"""Build regular expression to successively filter out object names"""
-	if namestrings is None or len(namestrings) < 1:
-		if ignored_res_list == []: return ""
-		ignored_re = "|".join(regex.pattern for regex in ignored_res_list)
-		return ignored_re
-	ignored_namestring = namestrings.pop()
-	ignored_res_list.append(re.compile(".*%s.*" % re.escape(ignored_namestring)))
-	return build_ignored_names_re(namestrings, ignored_res_list)
+	"""Build regular expression to filter out object names"""
+	ignored_patterns = [regex.pattern for regex in ignored_res_list]
+	ignored_patterns += [".*%s.*" % re.escape(namestring) for namestring in reversed(namestrings or [])]
+	return "|".join(ignored_patterns)
 
-def find_sequence_names(sequencer=bpy.context.scene.sequence_editor, sequence_types=["SOUND", "MOVIE", "IMAGE"], ignored_res_dict={}):
+def find_sequence_names(sequencer=None, sequence_types=["SOUND", "MOVIE", "IMAGE"], ignored_res_dict={}):
 	"""Build a dictionary of sequence lists by type from all sequencer strips that filter through ignored regexes"""
+	if sequencer is None:
+		sequencer = bpy.context.scene.sequence_editor
 	if sequencer is None:
 		print("Error finding sequence names: SEQUENCE_EDITOR not found")
 		return None
@@ -94,6 +95,91 @@ def print_sequence_names(sequences_by_type, ignore_duplication=True, full_paths=
 				print("%s sequence: %s" % (sequence.type, sequence.name))
 	return {'FINISHED'}
 
+## Streaming asset catalog
+##
+## Stream one record per media file instead of collecting strip sets, so memory stays
+## flat no matter how many strips are searched. Records are written as they are found.
+## 	1) call compile_ignored_names_res once to get one alternation regex per type
+## 	2) iter_strip_records yields (type, path, first_frame, last_frame, channel) per strip
+## 	3) unique_records drops records whose resolved filepath was already seen
+## 	4) write_catalog writes each record to a CSV or JSON-lines file as it arrives
+##	run_asset_catalog chains all of these
+
+catalog_fields = ('type', 'path', 'first_frame', 'last_frame', 'channel')
+
+def compile_ignored_names_res(ignored_names):
+	"""Compile one alternation regex per sequence type from lists of name substrings to ignore"""
+	ignored_res = {}
+	for sequence_type, namestrings in ignored_names.items():
+		ignored_res[sequence_type] = re.compile("|".join(re.escape(namestring) for namestring in namestrings)) if namestrings else None
+	return ignored_res
+
+def sequence_filepath(sequence, full_paths=True):
+	"""Find the media filepath (or filename) behind a sound, image or movie sequence"""
+	if sequence.type == 'SOUND':
+		return sequence.sound.filepath if full_paths else sequence.sound.name
+	elif sequence.type == 'IMAGE':
+		image_filename = sequence.elements[0].filename
+		return "{0}{1}".format(sequence.directory, image_filename) if full_paths else image_filename
+	elif sequence.type == 'MOVIE':
+		return sequence.filepath if full_paths else sequence.elements[0].filename
+	return None
+
+def iter_strip_records(sequencer=None, sequence_types=["SOUND", "MOVIE", "IMAGE"], ignored_res={}, full_paths=True):
+	"""Yield (type, path, first_frame, last_frame, channel) for each strip not filtered out by name"""
+	sequencer = sequencer or bpy.context.scene.sequence_editor
+	if sequencer is None:
+		print("Error finding sequence records: SEQUENCE_EDITOR not found")
+		return
+	for sequence in sequencer.sequences_all:
+		if sequence.type not in sequence_types:
+			continue
+		ignored_re = ignored_res.get(sequence.type)
+		if ignored_re and ignored_re.search(sequence.name):
+			continue
+		path = sequence_filepath(sequence, full_paths=full_paths)
+		if not path:
+			continue
+		yield (sequence.type, path, sequence.frame_final_start, sequence.frame_final_end - 1, sequence.channel)
+
+def unique_records(records):
+	"""Yield only the first record found for each resolved filepath"""
+	seen_paths = set()
+	for record in records:
+		resolved_path = os.path.normpath(bpy.path.abspath(record[1]))
+		if resolved_path in seen_paths:
+			continue
+		seen_paths.add(resolved_path)
+		yield record
+
+def write_catalog(records, catalog_file, catalog_format='csv'):
+	"""Write records to an open text file one at a time, returning the count written"""
+	count = 0
+	if catalog_format == 'csv':
+		writer = csv.writer(catalog_file)
+		writer.writerow(catalog_fields)
+		for record in records:
+			writer.writerow(record)
+			count += 1
+	elif catalog_format == 'jsonl':
+		for record in records:
+			catalog_file.write(json.dumps(dict(zip(catalog_fields, record))) + "\n")
+			count += 1
+	else:
+		raise Exception("Unrecognized asset catalog format {0} - expected 'csv' or 'jsonl'".format(catalog_format))
+	return count
+
+def run_asset_catalog(catalog_path, sequence_types=['IMAGE', 'MOVIE', 'SOUND'], ignored_names={}, ignore_duplication=True, catalog_format='csv', sequencer=None):
+	"""Stream filtered strip records from the sequencer into a CSV or JSON-lines catalog file"""
+	ignored_res = compile_ignored_names_res(ignored_names)
+	records = iter_strip_records(sequencer=sequencer, sequence_types=sequence_types, ignored_res=ignored_res)
+	if ignore_duplication:
+		records = unique_records(records)
+	with open(bpy.path.abspath(catalog_path), 'w', newline='') as catalog_file:
+		count = write_catalog(records, catalog_file, catalog_format=catalog_format)
+	print("Wrote {0} asset records to {1}".format(count, catalog_path))
+	return count
+
 def run_strip_finder(sequence_types=['IMAGE', 'MOVIE', 'SOUND'], ignored_names={}, ignore_duplication=True):
 	"""Print strip names per requested sequence type where names are filtered through ignored strings per type"""
 	# build regexes of names to ignore
@@ -111,4 +197,5 @@ def run_strip_finder(sequence_types=['IMAGE', 'MOVIE', 'SOUND'], ignored_names={
 	# NOTE if full_paths is set to False filenames may contain data duplication suffix
 	print_sequence_names(sequences, full_paths=True, ignore_duplication=ignore_duplication)
 
-run_strip_finder(sequence_types=['SOUND', 'IMAGE'], ignored_names={'SOUND': ["audio-"], 'MOVIE': [], 'IMAGE': []})
+if __name__ == '__main__':
+	run_strip_finder(sequence_types=['SOUND', 'IMAGE'], ignored_names={'SOUND': ["audio-"], 'MOVIE': [], 'IMAGE': []})
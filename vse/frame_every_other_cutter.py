@@ -1,4 +1,6 @@
 import bpy
+import numpy as np
+import substrips
 
 ## Every Other Cutter
 ##
@@ -8,7 +10,7 @@ import bpy
 
 def arrange_strips_by_time(strips, descending=False):
     """Sort a list of strips by start frame"""
-    return sorted(strips, lambda x: x.frame_start, reversed=descending)
+    return sorted(strips, key=lambda x: x.frame_start, reverse=descending)
 
 def select_strip(strip, deselect=False):
     """Set one strip's select attribute to True"""
@@ -32,9 +34,9 @@ def activate_lone_strip(strip):
 
 def run_sequencer_op(op):
     """Switch area to sequence editor and run sequencer op"""
-    original_area = bpy.context.area
+    original_area = bpy.context.area.type
     sequence_area = 'SEQUENCE_EDITOR'
-    bpy.context.area.type = squence_area
+    bpy.context.area.type = sequence_area
     try:
         op()
     except:
@@ -44,8 +46,7 @@ def run_sequencer_op(op):
 
 def remove_strip(strip):
     """Delete the strip from the sequencer"""
-    activate_lone_strip(strip)
-    run_sequencer_op(bpy.ops.sequencer.delete)
+    bpy.context.scene.sequence_editor.sequences.remove(strip)
     return
 
 def duplicate_strip(strip):
@@ -80,68 +81,92 @@ def every_other_group_cut(strips):
         toggle = not odds
     return strips_remaining
 
-def every_other_cut(strip=bpy.context.scene.sequence_editor.active_strip, interval=1, is_odd=False):
-    """Cut a single strip into substrips of interval length then delete every other substrip"""
-    if not strip or not hasattr(strip, 'frame_start') or interval < 1:
-        return
-    strips_remaining = []
-    toggle = False
-    deselect_strips()
-    bpy.context.scene.frame_current = strip.frame_start
-
-    # subcut strip and checker cut
-    # TODO verify range includes cut within final incomplete interval
-    # TODO allow reverse (neg) strip traversal and checker cutting
-    substrip_count = int(strip.frame_final_duration / interval)   # how many frame groups
-
-    strips = [strip]
-    checker_cut = is_odd    # T to cut even substrips, F for odd
-    print("There are {0} substrips to checker cut".format(substrip_count))
-
-    channel = strip.channel
-
-    for i in range(substrip_count):
-        activate_lone_strip(strip)
+def plan_checker_cut(duration, interval=1, is_odd=False):
+    """Compute the kept (source offset, length) substrips for checker cutting one strip
+
+    Substrips are interval frames long. A negative interval traverses the strip in
+    reverse, aligning groups to the strip's end and counting odd/even from the end.
+    A final incomplete interval is kept or cut like a full one.
+    Returns two int arrays sorted by source offset.
+    """
+    if not interval or duration < 1:
+        return (np.array([], dtype=int), np.array([], dtype=int))
+    step = abs(interval)
+    if interval > 0:
+        starts = np.arange(0, duration, step)
+        ends = np.minimum(starts + step, duration)
+    else:
+        ends = np.arange(duration, 0, -step)
+        starts = np.maximum(ends - step, 0)
+    # T to cut even substrips (keeping odd), F for odd (keeping even)
+    groups = np.arange(len(starts))
+    kept = groups % 2 == (1 if is_odd else 0)
+    order = np.argsort(starts[kept])
+    return (starts[kept][order], (ends - starts)[kept][order])
+
+def trim_strip(strip, offset, length):
+    """Soft trim a strip down to length frames starting offset frames into its visible frames"""
+    strip.frame_offset_end += strip.frame_final_duration - (offset + length)
+    strip.frame_offset_start += offset
+    return strip
 
-        # move ahead interval frames
-        bpy.context.scene.frame_current += interval
+def every_other_cut(strip=None, interval=1, is_odd=False):
+    """Cut a single strip into substrips of interval length keeping only every other substrip
 
-        # copy strip as first strip
-        substrip = duplicate_strip(strip)
-        strips.append(substrip)
+    Only the kept substrips are created. The original strip is trimmed down to the first
+    kept substrip, or removed if nothing is kept. Strip types substrips cannot be created
+    for are copied with the duplicate operator instead.
+    """
+    strip = strip or bpy.context.scene.sequence_editor.active_strip
+    if not strip or not hasattr(strip, 'frame_start') or not interval:
+        return
+    offsets, lengths = plan_checker_cut(strip.frame_final_duration, interval=interval, is_odd=is_odd)
+    print("There are {0} substrips to keep from checker cut".format(len(offsets)))
 
-        # cut first strip along interval
-        strip.frame_start = bpy.context.scene.frame_current - interval
-        substrip.frame_final_duration = bpy.context.scene.frame_current - substrip.frame_start
+    if len(offsets) < 1:
+        remove_strip(strip)
+        return []
 
-        # offset internal animation for frames
-        strip.animation_offset_start += interval
-        strip.frame_start += interval
+    offsets, lengths = offsets.tolist(), lengths.tolist()
+    strips = [strip]
 
-        # place in channel now that strips are cut
-        strip.channel = channel
-        substrip.channel = channel
+    if strip.type not in substrips.substrip_types:
+        # duplicate the untrimmed strip for each kept substrip, then place all in the strip's channel once none overlap
+        channel = strip.channel
+        for offset, length in zip(offsets[1:], lengths[1:]):
+            strips.append(trim_strip(duplicate_strip(strip), offset, length))
+        trim_strip(strip, offsets[0], lengths[0])
+        for substrip in strips:
+            substrip.channel = channel
+        deselect_strips()
+        return strips
 
-        # remove second strip
-        checker_cut and run_sequencer_op(bpy.ops.sequencer.delete)
-        checker_cut = not checker_cut
+    # trim the original down to the first kept substrip before adding substrips beside it
+    trim_strip(strip, offsets[0], lengths[0])
 
-        deselect_strips()
-        continue
+    # the trimmed strip now starts offsets[0] frames further into its source
+    for offset, length in zip(offsets[1:], lengths[1:]):
+        frame_start = strip.frame_final_start + offset - offsets[0]
+        name = "{0}.checker".format(strip.name)
+        strips.append(substrips.create_substrip(strip, substrips.source_start(strip, offset - offsets[0]), frame_start, length, name=name))
 
     return strips
 
-def handle_strip_cuts(strips=[], use_selected=True):
+def every_other_cut_strips(strips, interval=1, is_odd=False):
+    """Checker cut each strip in a list, returning all kept substrips"""
+    kept_strips = []
+    for strip in arrange_strips_by_time(strips):
+        kept_strips += every_other_cut(strip, interval=interval, is_odd=is_odd) or []
+    return kept_strips
+
+def handle_strip_cuts(strips=[], use_selected=True, interval=1, is_odd=False):
     """Handler method for checker cutting either one or multiple strips"""
     if not strips and not use_selected:
         return
     if use_selected:
         strips = [strip for strip in bpy.context.scene.sequence_editor.sequences if strip.select]
-    if len(strips) == 1:
-        every_other_frame_cut(bpy.context.scene.sequence_editor.active_strip, interval=3)
-    elif len(strips) > 1:
-        every_other_group_cut(bpy.context.scene.sequence_editor.sequences)
-    return strips
+    return every_other_cut_strips(strips, interval=interval, is_odd=is_odd)
 
-# run checker cut handler
-handle_strip_cuts()
+if __name__ == '__main__':
+    # run checker cut handler
+    handle_strip_cuts()
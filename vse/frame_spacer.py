@@ -57,7 +57,8 @@ def space_strips(strips, extension=0, gap=0):
 		strip.select = False
 	return strips
 
-strips = [strip for strip in bpy.context.scene.sequence_editor.sequences if strip.select]
-for strip in strips:
-	print(strip.name)
-space_strips(strips, extension=20, gap=10)
+if __name__ == '__main__':
+	strips = [strip for strip in bpy.context.scene.sequence_editor.sequences if strip.select]
+	for strip in strips:
+		print(strip.name)
+	space_strips(strips, extension=20, gap=10)
@@ -1,6 +1,8 @@
 #!/usr/bin/python
 import bpy
-from bpy.props import IntProperty
+import time
+import substrips
+from bpy.props import IntProperty, BoolProperty
 
 # Blender Python extension by Joshua (GitHub user Botmasher)
 # Input: a single selected sequence strip
@@ -50,6 +52,11 @@ def config_frame_splitter_props():
 			description = int_prop['description']
 		)) for prop_name, int_prop in frame_splitter_props_data.items()
 	]
+	bpy.types.ImageSequence.frame_splitter_batch = BoolProperty(
+		name = "Batch",
+		default = True,
+		description = "Plan all cuts up front and create substrips directly instead of duplicating"
+	)
 	return frame_splitter_props_data
 
 class FrameSplitter:
@@ -152,6 +159,59 @@ class FrameSplitter:
 		# list of cut strips
 		return resulting_strips
 
+	def plan_subcuts(self, s, step=0, trail=0, gap=0):
+		"""Plan every substrip cut as (source offset, frame start, length) without touching the strip"""
+		duration = s.frame_final_duration
+		if not step or duration <= 1:
+			return []
+		# match subcut_strip cut count (proportional to number of cuts)
+		cuts_count = int((duration - 1) / step) + 1
+		plan = []
+		for cut in range(cuts_count):
+			source_offset = cut * step
+			length = min(step, duration - source_offset)
+			if length <= 0:
+				break
+			# soft trimmed strips start showing frame_offset_start frames into their source
+			plan.append((source_offset, s.frame_final_start + cut * (step + trail + gap), length))
+		return plan
+
+	def create_substrip(self, s, source_offset, frame_start, length):
+		"""Create one substrip of the same source directly in the sequencer"""
+		return substrips.create_substrip(s, substrips.source_start(s, source_offset), frame_start, length)
+
+	def subcut_strip_batch(self, s, step=0, trail=0, gap=0):
+		"""Cut a sequencer strip into uniformly stepped and spaced substrips without duplicate operators.
+
+		Plans all cuts first, trims the original strip to the first cut, then creates the
+		remaining substrips directly through sequences.new_image/new_movie/new_sound.
+		Falls back to subcut_strip for strip types that cannot be created from a source file.
+
+		Returns a tuple of the resulting strips and a report dict with created count and seconds.
+		"""
+		time_start = time.perf_counter()
+		if s.type not in substrips.substrip_types:
+			resulting_strips = self.subcut_strip(s, step, trail, gap)
+			return (resulting_strips, {'created': len(resulting_strips) - 1, 'seconds': time.perf_counter() - time_start})
+
+		plan = self.plan_subcuts(s, step, trail, gap)
+		if len(plan) <= 1:
+			print("Too few strips to cut")
+			return ([s], {'created': 0, 'seconds': time.perf_counter() - time_start})
+
+		# shrink original strip down to the first cut before adding substrips beside it
+		s.animation_offset_end += s.frame_final_duration - plan[0][2]
+
+		resulting_strips = [s]
+		for source_offset, frame_start, length in plan[1:]:
+			substrip = self.create_substrip(s, source_offset, frame_start, length)
+			substrip and resulting_strips.append(substrip)
+
+		for substrip in resulting_strips:
+			self.extend_strip(substrip, trail)
+
+		return (resulting_strips, {'created': len(resulting_strips) - 1, 'seconds': time.perf_counter() - time_start})
+
 class FrameSplitterPanel(bpy.types.Panel):
 	bl_label = "Frame Splitter"
 	bl_idname = "strip.frame_splitter_panel"
@@ -165,6 +225,7 @@ class FrameSplitterPanel(bpy.types.Panel):
 		self.layout.row().prop(strip, "frame_splitter_step")
 		self.layout.row().prop(strip, "frame_splitter_trail")
 		self.layout.row().prop(strip, "frame_splitter_gap")
+		self.layout.row().prop(strip, "frame_splitter_batch")
 		self.layout.row().operator("strip.frame_splitter", text="Subcut Strip")
 
 class FrameSplitterOperator(bpy.types.Operator):
@@ -183,7 +244,11 @@ class FrameSplitterOperator(bpy.types.Operator):
 		step = strip.frame_splitter_step
 		trail = strip.frame_splitter_trail
 		gap = strip.frame_splitter_gap
-		scene.sequence_editor.frame_splitter.subcut_strip(strip, step, trail, gap)
+		if strip.frame_splitter_batch:
+			strips, report = scene.sequence_editor.frame_splitter.subcut_strip_batch(strip, step, trail, gap)
+			self.report({'INFO'}, "Frame Splitter created {0} substrips in {1:.3f}s".format(report['created'], report['seconds']))
+		else:
+			scene.sequence_editor.frame_splitter.subcut_strip(strip, step, trail, gap)
 		return {'FINISHED'}
 
 def register():
@@ -0,0 +1,239 @@
+import bpy
+import os
+import hashlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from bpy.props import *
+from timeline_index import get_index
+import bulk_volume
+from bulk_volume import read_volumes, apply_volumes
+import audio_cache
+from audio_cache import register_decoder, get_decoder, to_float
+
+## Loudness
+##
+## Blender Python VSE script by Joshua R (GitHub user Botmasher)
+##
+## Measure how loud each sound strip's source file is and set strip volumes so every
+## clip plays back at one target loudness instead of leveling clips by ear.
+##
+## Each unique sound file is decoded once, however many strips share it. WAV files are
+## read with the stdlib wave module and memory mapped, other formats go through a
+## pluggable decoder (see audio_cache.register_decoder). Samples are measured chunk by chunk:
+##   - peak and RMS over the whole file
+##   - LUFS-style integrated loudness: gated 400ms blocks as in BS.1770, without
+##     the K-weighting pre-filter
+##
+## Results are kept in the shared on-disk audio_cache, so later sessions only look
+## them up. Within a session they are also cached by file content hash, so renamed or
+## copied files are not measured again either.
+##
+## Usage from another VSE script:
+##     from loudness import auto_gain
+##     auto_gain(name='dialogue', target=-23.0)
+
+# seconds of audio converted to floats at once
+chunk_seconds = 10
+# BS.1770 gating block and step
+block_seconds = 0.4
+step_seconds = 0.1
+absolute_gate = -70.0
+relative_gate = -10.0
+# floor reported for digital silence
+silence_db = -150.0
+
+# (path, size, mtime): content hash
+file_hashes = {}
+# content hash: loudness stats
+loudness_cache = {}
+
+def to_db(value):
+    """Convert a linear amplitude to decibels"""
+    return 20 * np.log10(value) if value > 0 else silence_db
+
+def gated_loudness(step_powers, steps_per_block):
+    """LUFS-style integrated loudness from per-channel mean square powers of 100ms steps"""
+    if len(step_powers) < steps_per_block:
+        # shorter than one gating block - measure what there is
+        blocks = step_powers.mean(axis=0, keepdims=True) if len(step_powers) else np.zeros((1, 1))
+    else:
+        # overlapping 400ms blocks as running means over 100ms steps
+        cumulative = np.cumsum(np.vstack([np.zeros((1, step_powers.shape[1])), step_powers]), axis=0)
+        blocks = (cumulative[steps_per_block:] - cumulative[:-steps_per_block]) / steps_per_block
+    power = blocks.sum(axis=1)
+    with np.errstate(divide='ignore'):
+        block_loudness = -0.691 + 10 * np.log10(power)
+    gated = power[block_loudness > absolute_gate]
+    if not gated.size:
+        return silence_db
+    threshold = -0.691 + 10 * np.log10(gated.mean()) + relative_gate
+    gated = power[block_loudness > max(absolute_gate, threshold)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+def measure_samples(samples, sample_rate):
+    """Measure peak, RMS and gated loudness of a samples array one chunk at a time"""
+    samples = samples[:, np.newaxis] if samples.ndim == 1 else samples
+    frames, channels = samples.shape[0], samples.shape[1]
+    step = max(1, int(sample_rate * step_seconds))
+    # whole steps per chunk so step powers never straddle chunks
+    chunk = step * max(1, int(chunk_seconds / step_seconds))
+    peak = 0.0
+    square_sum = 0.0
+    step_powers = []
+    for start in range(0, frames, chunk):
+        block = to_float(samples[start:start + chunk])
+        peak = max(peak, float(np.abs(block).max())) if block.size else peak
+        square_sum += float(np.square(block).sum())
+        whole = len(block) // step * step
+        if whole:
+            step_powers.append(np.square(block[:whole]).reshape(-1, step, channels).mean(axis=1))
+    rms = np.sqrt(square_sum / (frames * channels)) if frames else 0.0
+    step_powers = np.vstack(step_powers) if step_powers else np.zeros((0, channels))
+    return {
+        'peak': peak,
+        'peak_db': to_db(peak),
+        'rms': rms,
+        'rms_db': to_db(rms),
+        'loudness': gated_loudness(step_powers, int(round(block_seconds / step_seconds))),
+        'duration': frames / float(sample_rate),
+        'sample_rate': sample_rate,
+        'channels': channels
+    }
+
+def hash_file(path, block_size=1 << 20):
+    """Content hash of a file, reused until its size or mtime changes"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime)
+    if key not in file_hashes:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for data in iter(lambda: f.read(block_size), b''):
+                sha.update(data)
+        file_hashes[key] = sha.hexdigest()
+    return file_hashes[key]
+
+def measure_file(path):
+    """Measure one sound file, decoding it only if its content was not measured before"""
+    content_hash = hash_file(path)
+    if content_hash not in loudness_cache:
+        samples, sample_rate = get_decoder(path)(path)
+        loudness_cache[content_hash] = dict(measure_samples(samples, sample_rate), hash=content_hash)
+    stats = loudness_cache[content_hash]
+    return (np.array([stats['peak'], stats['rms'], stats['loudness']]), stats)
+
+def analyze_file(path):
+    """Look up a sound file's loudness stats in the analysis cache, measuring it on a miss"""
+    return audio_cache.cached(path, 'loudness', {}, lambda: measure_file(path))[1]
+
+def sound_path(strip):
+    """Absolute path to a sound strip's source file or None for packed or missing sounds"""
+    sound = getattr(strip, 'sound', None)
+    if not sound or sound.packed_file or not sound.filepath:
+        return None
+    path = os.path.normpath(bpy.path.abspath(sound.filepath))
+    return path if os.path.isfile(path) else None
+
+def group_strips_by_file(strips):
+    """Map each unique source file to the strips playing it"""
+    groups = {}
+    for strip in strips:
+        path = sound_path(strip)
+        path and groups.setdefault(path, []).append(strip)
+    return groups
+
+def analyze_strips(strips, max_workers=4):
+    """Measure every unique source file behind the strips once
+
+    Returns a dict of path: loudness stats and a dict of path: error for files
+    that could not be decoded.
+    """
+    paths = [*group_strips_by_file(strips)]
+    def analyze(path):
+        try:
+            return (path, analyze_file(path), None)
+        except Exception as e:
+            return (path, None, "{0}: {1}".format(type(e).__name__, e))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths) or 1))) as pool:
+        results = list(pool.map(analyze, paths))
+    stats = {path: result for path, result, error in results if result}
+    errors = {path: error for path, result, error in results if error}
+    return (stats, errors)
+
+def plan_gains(loudness, peak, target=-23.0, max_peak=-1.0):
+    """Linear gains bringing each measured loudness to the target without pushing peaks past max_peak"""
+    loudness = np.asarray(loudness, dtype=np.float64)
+    peak = np.asarray(peak, dtype=np.float64)
+    gains = np.power(10.0, (target - loudness) / 20.0)
+    if max_peak is not None:
+        with np.errstate(divide='ignore'):
+            peak_limits = np.where(peak > 0, np.power(10.0, max_peak / 20.0) / peak, np.inf)
+        gains = np.minimum(gains, peak_limits)
+    # leave silent files alone
+    return np.where(loudness > absolute_gate, gains, np.nan)
+
+def auto_gain(strips=None, name='', selected_only=False, target=-23.0, max_peak=-1.0, scene=None, max_workers=4):
+    """Set sound strip volumes so each clip plays at the target loudness"""
+    scene = scene or bpy.context.scene
+    if strips is None:
+        strips = get_index(scene).named(name, strip_type='SOUND', selected_only=selected_only, top_level=True)
+    groups = group_strips_by_file(strips)
+    stats, errors = analyze_strips([group[0] for group in groups.values()], max_workers=max_workers)
+
+    measured = [strip for path in stats for strip in groups[path]]
+    loudness = [stats[sound_path(strip)]['loudness'] for strip in measured]
+    peaks = [stats[sound_path(strip)]['peak'] for strip in measured]
+    gains = plan_gains(loudness, peaks, target=target, max_peak=max_peak)
+
+    # keep current volumes where no gain was found
+    volumes = np.where(np.isnan(gains), read_volumes(measured), gains)
+    apply_volumes(measured, volumes, scene=scene)
+    return {
+        'files': len(groups),
+        'strips': len(measured),
+        'skipped': len(strips) - len(measured),
+        'errors': errors
+    }
+
+def setup_auto_gain_props():
+    bpy.types.Scene.auto_gain_target = FloatProperty(name="Target loudness", description="Loudness each sound strip should play at (LUFS-style)", default=-23.0, min=-70.0, max=0.0)
+    bpy.types.Scene.auto_gain_max_peak = FloatProperty(name="Max peak (dB)", description="Never raise volume so far that peaks pass this level", default=-1.0, min=-60.0, max=6.0)
+    bpy.types.Scene.auto_gain_selected = BoolProperty(name="Only Selected", description="Only level selected sound strips", default=False)
+
+class AutoGainPanel(bpy.types.Panel):
+    bl_label = 'Auto Gain'
+    bl_idname = 'soundsequence.auto_gain_panel'
+    bl_space_type = 'SEQUENCE_EDITOR'
+    bl_region_type = 'UI'
+
+    def draw(self, ctx):
+        layout = self.layout
+        layout.row().prop(ctx.scene, 'auto_gain_target')
+        layout.row().prop(ctx.scene, 'auto_gain_max_peak')
+        layout.row().prop(ctx.scene, 'auto_gain_selected')
+        layout.operator('soundsequence.auto_gain')
+
+class AutoGainOperator(bpy.types.Operator):
+    bl_label = 'Level Sound Strips'
+    bl_idname = 'soundsequence.auto_gain'
+    bl_description = 'Set sound strip volumes to reach the target loudness'
+
+    def execute(self, ctx):
+        scene = ctx.scene
+        result = auto_gain(selected_only=scene.auto_gain_selected, target=scene.auto_gain_target, max_peak=scene.auto_gain_max_peak, scene=scene)
+        for path, error in result['errors'].items():
+            self.report({'WARNING'}, "Could not measure {0} - {1}".format(path, error))
+        self.report({'INFO'}, "Leveled {0} strips from {1} files".format(result['strips'], result['files']))
+        return {'FINISHED'}
+
+def register():
+    bulk_volume.register()
+    setup_auto_gain_props()
+    bpy.utils.register_class(AutoGainOperator)
+    bpy.utils.register_class(AutoGainPanel)
+
+def unregister():
+    bpy.utils.unregister_class(AutoGainPanel)
+    bpy.utils.unregister_class(AutoGainOperator)
+
+if __name__ == '__main__':
+    register()
@@ -61,38 +61,40 @@ def add_mask(strip, name, start_frame=0, end_frame=0, shape=None, invert=False):
 
 	return mask
 
-bpy.types.ImageSequence.maskomatic_name = bpy.props.StringProperty (
-	name = "Name",
-	default = "mask",
-	description = "Name to apply to the mask and the mask modifier"
-)
-
-bpy.types.ImageSequence.maskomatic_frame_start = bpy.props.IntProperty (
-	name = "Start frame", 
-	default = bpy.context.scene.frame_start,
-	description = "First timeline frame the underlying mask is available"
-)
-
-bpy.types.ImageSequence.maskomatic_frame_end = bpy.props.IntProperty (
-	name = "End frame", 
-	default = bpy.context.scene.frame_end,
-	description = "Last timeline frame the underlying mask is available"
-)
-
-bpy.types.ImageSequence.maskomatic_invert = bpy.props.BoolProperty (
-	name = "Invert Black/White", 
-	default = False,
-	description = "Reverse the black/white of the underlying mask"
-)
-
-bpy.types.ImageSequence.maskomatic_primitive = bpy.props.EnumProperty(
-	items = [("square", "Square", "Add square geometry to mask"),
-		("circle", "Circle", "Add circle geometry to mask"),
-		("blank", "Blank", "Initialize a blank mask (add points manually)")],
-	name = "Shape",
-	default = "square",
-	description = "Initialize mask with some geometry (mask shape)"
-)
+def setup_maskomatic_props():
+	bpy.types.ImageSequence.maskomatic_name = bpy.props.StringProperty (
+		name = "Name",
+		default = "mask",
+		description = "Name to apply to the mask and the mask modifier"
+	)
+
+	# fixed frame defaults so registering never reads the current scene
+	bpy.types.ImageSequence.maskomatic_frame_start = bpy.props.IntProperty (
+		name = "Start frame",
+		default = 1,
+		description = "First timeline frame the underlying mask is available"
+	)
+
+	bpy.types.ImageSequence.maskomatic_frame_end = bpy.props.IntProperty (
+		name = "End frame",
+		default = 250,
+		description = "Last timeline frame the underlying mask is available"
+	)
+
+	bpy.types.ImageSequence.maskomatic_invert = bpy.props.BoolProperty (
+		name = "Invert Black/White",
+		default = False,
+		description = "Reverse the black/white of the underlying mask"
+	)
+
+	bpy.types.ImageSequence.maskomatic_primitive = bpy.props.EnumProperty(
+		items = [("square", "Square", "Add square geometry to mask"),
+			("circle", "Circle", "Add circle geometry to mask"),
+			("blank", "Blank", "Initialize a blank mask (add points manually)")],
+		name = "Shape",
+		default = "square",
+		description = "Initialize mask with some geometry (mask shape)"
+	)
 
 class MaskomaticPanel(bpy.types.Panel):
 	bl_label = "Maskomatic"
@@ -132,6 +134,7 @@ class MaskomaticOperator(bpy.types.Operator):
 		return {'FINISHED'}
 
 def register():
+	setup_maskomatic_props()
 	bpy.utils.register_module(__name__)
 
 def unregister():
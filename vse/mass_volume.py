@@ -1,9 +1,9 @@
 import bpy
 from bpy.props import *
+import bulk_volume
+from bulk_volume import gather_sound_strips, set_volumes, undo_volumes, restore_original_volumes
 
-# TODO store prop of "default" vols before tool changes them
-original_vols = {}
-original_s = bpy.context.scene.sequence_editor.active_strip
+# original "default" vols before tool changes them are kept in bulk_volume.original_volumes
 
 # add property volume slider
 class MassVolProperties (bpy.types.PropertyGroup):
@@ -12,6 +12,7 @@ class MassVolProperties (bpy.types.PropertyGroup):
     name = StringProperty(name="Contains", description = "Only set strips whose name contains this string.")
     selecting = BoolProperty(name="Only Set Selected")
     set_base = BoolProperty(name="Set Base Volumes")
+    normalize = BoolProperty(name="Normalize to Base", description="Scale volumes together so the loudest matches the base volume")
     def define_defaults(self):
         self.base = self.volume
         self.name = ''
@@ -20,25 +21,8 @@ class MassVolProperties (bpy.types.PropertyGroup):
         self.selected = False
         return None
 
-bpy.utils.register_class(MassVolProperties)
-bpy.types.SoundSequence.massvol_props = PointerProperty(type=MassVolProperties)
-
 # volume fade in/out (probably a separate transitions thing)
 
-def set_strip_vol (s, substr, mult_x, new_x):
-    if s.type == 'SOUND' and substr in s.name:
-        # set the volume proportionally
-        s.volume = s.volume * mult_x
-        # set the volume
-        if new_x == None:
-            s.volume = s.massvol_props.base
-        else:
-            s.volume = new_x
-            s.massvol_props.base = new_x
-        return True
-    else:
-        return False
-
 class SetMassVolPanel (bpy.types.Panel):
     bl_label = 'Set master volume'
     bl_idname = 'soundsequence.massvol_panel'
@@ -56,11 +40,15 @@ class SetMassVolPanel (bpy.types.Panel):
             self.layout.row().prop(active_s.massvol_props, 'mult')
             if active_s.massvol_props.set_base:
                 self.layout.row().prop(active_s.massvol_props, 'base')
+                self.layout.row().prop(active_s.massvol_props, 'normalize')
             self.layout.row().prop(active_s.massvol_props, 'set_base')
             self.layout.row().prop(active_s.massvol_props, 'selecting')
             # input box for name_contains
             self.layout.row().prop(active_s.massvol_props, 'name')
             self.layout.operator('soundsequence.mass_vol')
+            row = self.layout.row()
+            row.operator('soundsequence.mass_vol_undo')
+            row.operator('soundsequence.mass_vol_restore')
 
 
 # add panel and operator classes
@@ -78,26 +66,60 @@ class SetMassVolOp (bpy.types.Operator):
         if active_s.massvol_props.mult < 0:
             active_s.massvol_props.mult = 0
         
-        # store new vol multiplicand
-        new_vol = None
+        # set base volume or multiply existing volumes
         if active_s.massvol_props.set_base:
-            new_vol = active_s.massvol_props.base
-        
-        # set sound strip volumes
-        for s in bpy.context.scene.sequence_editor.sequences:
-            # compare bools to filter all or just selected
-            if active_s.massvol_props.selecting - s.select <= 0:
-                set_strip_vol (s, active_s.massvol_props.name, s.massvol_props.mult, new_vol)
-        
+            mode = 'NORMALIZE' if active_s.massvol_props.normalize else 'SET'
+            value = active_s.massvol_props.base
+        else:
+            mode = 'MULTIPLY'
+            value = active_s.massvol_props.mult
+
+        # set sound strip volumes in one batch
+        # - index filters by type, name and optionally selection
+        strips = gather_sound_strips(ctx.scene, name=active_s.massvol_props.name, selected_only=active_s.massvol_props.selecting)
+        set_volumes(strips, mode=mode, value=value, scene=ctx.scene)
+
         # reset multiplier to 1.0
         active_s.massvol_props.mult = 1.0
         active_s.massvol_props.base = active_s.volume
 
         return {'FINISHED'}
 
+class UndoMassVolOp (bpy.types.Operator):
+    bl_label = 'Undo Volumes'
+    bl_idname = 'soundsequence.mass_vol_undo'
+    bl_description = 'Revert the last mass volume change'
+
+    def execute (self, ctx):
+        undo_volumes(ctx.scene)
+        return {'FINISHED'}
+
+class RestoreMassVolOp (bpy.types.Operator):
+    bl_label = 'Restore Originals'
+    bl_idname = 'soundsequence.mass_vol_restore'
+    bl_description = 'Return strips to their volumes from before any mass volume change'
+
+    def execute (self, ctx):
+        restore_original_volumes(scene=ctx.scene)
+        return {'FINISHED'}
+
 
 def register ():
+    bulk_volume.register()
+    bpy.utils.register_class(MassVolProperties)
+    bpy.types.SoundSequence.massvol_props = PointerProperty(type=MassVolProperties)
     bpy.utils.register_class(SetMassVolOp)
+    bpy.utils.register_class(UndoMassVolOp)
+    bpy.utils.register_class(RestoreMassVolOp)
     bpy.utils.register_class(SetMassVolPanel)
 
-register()
\ No newline at end of file
+def unregister ():
+    bpy.utils.unregister_class(SetMassVolPanel)
+    bpy.utils.unregister_class(RestoreMassVolOp)
+    bpy.utils.unregister_class(UndoMassVolOp)
+    bpy.utils.unregister_class(SetMassVolOp)
+    del bpy.types.SoundSequence.massvol_props
+    bpy.utils.unregister_class(MassVolProperties)
+
+if __name__ == '__main__':
+    register()
@@ -50,8 +50,9 @@ def unpack_repack_meta(meta, op=None, add_selected=True):
     return bpy.context.scene.sequence_editor.active_strip
 
 # example adding selected strips
-m = bpy.context.scene.sequence_editor.active_strip
-unpack_repack_meta(m)
+if __name__ == '__main__':
+    m = bpy.context.scene.sequence_editor.active_strip
+    unpack_repack_meta(m)
 
 # example running operation while unpacked
 #def op_handler():
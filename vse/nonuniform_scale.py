@@ -5,13 +5,14 @@ from bpy.props import FloatProperty
 ##
 ## Blender Python script by Joshua R (GitHub user Botmasher)
 
-bpy.types.TransformSequence.scale_factor = FloatProperty(
-    name="Ratio Scale",
-    description="Same ratio nonuniform rescale factor for transform strip",
-    default=1.0,
-    min=0.0,
-    max=10
-)
+def setup_scale_factor_prop():
+    bpy.types.TransformSequence.scale_factor = FloatProperty(
+        name="Ratio Scale",
+        description="Same ratio nonuniform rescale factor for transform strip",
+        default=1.0,
+        min=0.0,
+        max=10
+    )
 
 def is_transform_strip(strip):
     if strip.type == 'TRANSFORM' and type(strip.bl_rna) == bpy.types.TransformSequence:
@@ -67,6 +68,7 @@ def panel_scale_slider(self, ctx):
     layout.prop(strip, 'scale_factor', slider=True)
 
 def register():
+    setup_scale_factor_prop()
     if hasattr(bpy.types.SEQUENCER_PT_effect, 'panel_scale_slider'):
         delattr(bpy.types.SEQUENCER_PT_effect, 'panel_scale_slider')
     bpy.types.SEQUENCER_PT_effect.append(panel_scale_slider)
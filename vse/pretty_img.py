@@ -1,5 +1,8 @@
 #!/usr/bin/env python
 import bpy
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from bpy.props import *
 from bpy_extras.io_utils import ImportHelper
 
@@ -25,6 +28,227 @@ bl_info = {
     "category": "VSE"
 }
 
+# Image header probe
+# read width and height from the first bytes of common image formats
+# so dimensions are known without rendering (also works under blender -b)
+
+# path: (mtime, (width, height)) for already probed images
+img_dimensions_cache = {}
+
+def probe_png (f, head):
+    if head[:8] != b'\x89PNG\r\n\x1a\n' or head[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', head[16:24])
+
+def probe_gif (f, head):
+    if head[:6] not in (b'GIF87a', b'GIF89a'):
+        return None
+    return struct.unpack('<HH', head[6:10])
+
+def probe_bmp (f, head):
+    if head[:2] != b'BM':
+        return None
+    dib_size = struct.unpack('<I', head[14:18])[0]
+    if dib_size == 12:
+        return struct.unpack('<HH', head[18:22])
+    width, height = struct.unpack('<ii', head[18:26])
+    # negative height marks a top-down bitmap
+    return (width, abs(height))
+
+def probe_jpeg (f, head):
+    if head[:2] != b'\xff\xd8':
+        return None
+    # walk segment headers, seeking past segment bodies, until a start of frame marker
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xff:
+            return None
+        # skip fill bytes
+        while marker[1] == 0xff:
+            marker = marker[1:] + f.read(1)
+        if marker[1] in (0xd8, 0x01) or 0xd0 <= marker[1] <= 0xd7:
+            continue
+        segment_length = f.read(2)
+        if len(segment_length) < 2:
+            return None
+        segment_length = struct.unpack('>H', segment_length)[0]
+        # SOF0-SOF15 except DHT (c4), JPG (c8) and DAC (cc)
+        if 0xc0 <= marker[1] <= 0xcf and marker[1] not in (0xc4, 0xc8, 0xcc):
+            height, width = struct.unpack('>xHH', f.read(5))
+            return (width, height)
+        f.seek(segment_length - 2, 1)
+
+def probe_tiff (f, head):
+    if head[:4] == b'II*\x00':
+        endian = '<'
+    elif head[:4] == b'MM\x00*':
+        endian = '>'
+    else:
+        return None
+    ifd_offset = struct.unpack(endian + 'I', head[4:8])[0]
+    f.seek(ifd_offset)
+    entry_count = struct.unpack(endian + 'H', f.read(2))[0]
+    dimensions = {}
+    for i in range(entry_count):
+        tag, field_type, count, value = struct.unpack(endian + 'HHI4s', f.read(12))
+        if tag not in (256, 257):
+            continue
+        # SHORT values sit left-aligned in the value field, LONG values fill it
+        if field_type == 3:
+            dimensions[tag] = struct.unpack(endian + 'H', value[:2])[0]
+        else:
+            dimensions[tag] = struct.unpack(endian + 'I', value)[0]
+        if len(dimensions) == 2:
+            return (dimensions[256], dimensions[257])
+    return None
+
+img_probes = (probe_png, probe_jpeg, probe_gif, probe_bmp, probe_tiff)
+
+def probe_img_dimensions (path):
+    """Read (width, height) from an image file header, cached by path and modification time"""
+    return probe_img_file(bpy.path.abspath(path))
+
+def probe_img_file (path):
+    """Read (width, height) from an image header at an absolute path - safe to call off the main thread"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = img_dimensions_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    dimensions = None
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            for probe in img_probes:
+                dimensions = probe(f, head)
+                if dimensions:
+                    break
+    except (OSError, struct.error):
+        dimensions = None
+    img_dimensions_cache[path] = (mtime, dimensions)
+    return dimensions
+
+def render_img_dimensions (strip):
+    """Fall back to rendering the strip to fill in orig_width and orig_height"""
+    scene = bpy.context.scene
+    # hack: update in viewport to read source img orig_width and orig_height
+    # switch view and area
+    area = bpy.context.area
+    original_area = area.type
+    area.type = 'SEQUENCE_EDITOR'
+    original_view = area.spaces[0].view_type
+    area.spaces[0].view_type = 'PREVIEW'
+    # NOTE playhead steps alone are sufficient when user has visible VSE Preview
+    frame_initial = scene.frame_current
+    scene.frame_current = strip.frame_start
+    bpy.ops.render.opengl(sequencer=True)
+    # reset view and area
+    area.spaces[0].view_type = original_view
+    area.type = original_area
+    scene.frame_current = frame_initial
+    # /hack
+    img = strip.elements[0]
+    return (img.orig_width, img.orig_height)
+
+def fit_img_scale (dimensions, scale=1.0, render=None):
+    """Calculate the transform (scale_x, scale_y) restoring an image's aspect after stretching to render size"""
+    render = render or bpy.context.scene.render
+    scaled_img_h = render.resolution_y    # 1.0 scale y == 100% render_res.h
+    scaled_img_w = render.resolution_x    # stretched value
+    scaled_img_w_target = dimensions[0] / dimensions[1] * scaled_img_h  # final value we're after
+    img_rescale_y = scaled_img_w_target / scaled_img_w  # what is that as a percentage of stretch?
+    return (img_rescale_y * scale, scale)
+
+# most channels the 2.7x sequencer allows
+max_channel = 32
+
+def find_free_channel (sequences, frame_start, frame_end, channel_count=1, channel_min=1):
+    """Find the lowest channel with channel_count empty channels from it upwards across a frame span"""
+    busy_channels = {
+        strip.channel for strip in sequences
+        if strip.frame_final_start < frame_end and strip.frame_final_end > frame_start
+    }
+    channel = channel_min
+    while any(c in busy_channels for c in range(channel, channel + channel_count)):
+        channel += 1
+    return channel
+
+def plan_img_batch (paths, scale=1.0, length=10, sequential=True, max_workers=8):
+    """Probe image headers concurrently and plan each image and transform strip
+
+    Images go in one channel with their transforms in the channel directly above.
+    Sequential images follow each other by length frames, otherwise each image and
+    transform pair is stacked two channels above the previous pair.
+    """
+    scene = bpy.context.scene
+    abspaths = [bpy.path.abspath(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(abspaths)))) as pool:
+        dimensions = list(pool.map(probe_img_file, abspaths))
+
+    frame_start = scene.frame_current
+    sequences = scene.sequence_editor.sequences_all
+    if not sequential:
+        channel = find_free_channel(sequences, frame_start, frame_start + length, channel_count=2 * len(paths))
+        if channel + 2 * len(paths) - 1 > max_channel:
+            print("pretty_img - Too many images to stack in {0} channels, placing them sequentially".format(max_channel))
+            sequential = True
+    if sequential:
+        channel = find_free_channel(sequences, frame_start, frame_start + length * len(paths), channel_count=2)
+
+    plan = []
+    for i in range(len(paths)):
+        plan.append({
+            'name': os.path.basename(paths[i]),
+            'path': abspaths[i],
+            'dimensions': dimensions[i],
+            'frame_start': frame_start + i * length if sequential else frame_start,
+            'channel': channel if sequential else channel + 2 * i,
+            'base_scale': scale,
+            'scale': fit_img_scale(dimensions[i], scale, scene.render) if dimensions[i] and all(dimensions[i]) else None
+        })
+    return plan
+
+def create_img_batch (plan, length=10, alpha=True):
+    """Create every planned image and transform strip in one pass with a single refresh"""
+    scene = bpy.context.scene
+    sequences = scene.sequence_editor.sequences
+    strips = []
+    for entry in plan:
+        strip = sequences.new_image(name=entry['name'], filepath=entry['path'], channel=entry['channel'], frame_start=entry['frame_start'])
+        strip.frame_final_duration = length
+        transform_strip = sequences.new_effect(name="{0}.transform".format(entry['name']), type='TRANSFORM', channel=entry['channel'] + 1, frame_start=entry['frame_start'], frame_end=entry['frame_start'] + length, seq1=strip)
+        transform_strip.use_uniform_scale = False
+
+        # only render unrecognized formats and only with a UI to render in
+        img_scale = entry['scale']
+        if not img_scale and not bpy.app.background:
+            dimensions = render_img_dimensions(strip)
+            img_scale = all(dimensions) and fit_img_scale(dimensions, entry['base_scale'], scene.render)
+        if img_scale:
+            transform_strip.scale_start_x, transform_strip.scale_start_y = img_scale
+        else:
+            print("pretty_img - Failed to rescale img with width or height of 0: {0}".format(entry['path']))
+
+        # set strip opacity
+        if alpha:
+            transform_strip.blend_type = 'ALPHA_OVER'
+            transform_strip.blend_alpha = 1.0
+            strip.blend_type = 'ALPHA_OVER'
+            strip.blend_alpha = 0.0
+        strips.append(strip)
+
+    bpy.ops.sequencer.refresh_all()
+    return strips
+
+def load_scale_imgs (paths, scale=1.0, length=10, alpha=True, sequential=True):
+    """Batch import images with fitted transforms, probing all headers before creating any strips"""
+    bpy.context.scene.sequence_editor_create()
+    plan = plan_img_batch(paths, scale=scale, length=length, sequential=sequential)
+    return create_img_batch(plan, length=length, alpha=alpha)
+
 def load_scale_img (name, path, scale=1.0, channel=1, length=10, alpha=True):
 
     scene = bpy.context.scene
@@ -38,7 +262,7 @@ def load_scale_img (name, path, scale=1.0, channel=1, length=10, alpha=True):
         bpy.ops.sequencer.select_all(action='DESELECT')
         return
 
-    # TODO set channel strip wisely - currently importing many causes interlaced stacking of transform and image strips
+    # NOTE importing many through here interlaces transform and image strips - batch with load_scale_imgs
 
     deselect_strips()
     strip.select = True
@@ -48,33 +272,21 @@ def load_scale_img (name, path, scale=1.0, channel=1, length=10, alpha=True):
     transform_strip = scene.sequence_editor.active_strip
     transform_strip.use_uniform_scale = False
 
-    # hack: update in viewport to read source img orig_width and orig_height
-    # switch view and area
-    area = bpy.context.area
-    original_area = area.type
-    area.type = 'SEQUENCE_EDITOR'
-    original_view = area.spaces[0].view_type
-    area.spaces[0].view_type = 'PREVIEW'
-    # NOTE playhead steps alone are sufficient when user has visible VSE Preview
+    # read source img dimensions from the file header
+    # - only render for unrecognized formats and only with a UI to render in
     frame_initial = scene.frame_current
-    scene.frame_current = strip.frame_start
-    bpy.ops.render.opengl(sequencer=True)
-    # reset view and area
-    area.spaces[0].view_type = original_view
-    area.type = original_area
-    # /hack
-
-    # gather image data
     img = strip.elements[0]
-    # store dimensions
+    dimensions = probe_img_dimensions(path)
+    if not dimensions and not bpy.app.background:
+        dimensions = render_img_dimensions(strip)
 
-    if not (img.orig_width and img.orig_height):
+    if not dimensions or not (dimensions[0] and dimensions[1]):
         print("pretty_img - Failed to rescale img with width or height of 0: {0}".format(img.filename))
         return
 
     img_res = {
-        'w': img.orig_width,
-        'h': img.orig_height
+        'w': dimensions[0],
+        'h': dimensions[1]
     }
     print("%s: %s" % (img.filename, "{0} x {1}".format(img_res['w'], img_res['h'])))
 
@@ -86,14 +298,8 @@ def load_scale_img (name, path, scale=1.0, channel=1, length=10, alpha=True):
 
     bpy.ops.sequencer.refresh_all()
 
-    scaled_img_h = scene.render.resolution_y    # 1.0 scale y == 100% render_res.h
-    scaled_img_w = scene.render.resolution_x    # stretched value
-    scaled_img_w_target = img_res['w'] / img_res['h'] * scaled_img_h  # final value we're after
-    img_rescale_y = scaled_img_w_target / scaled_img_w  # what is that as a percentage of stretch?
-
     transform_strip.use_uniform_scale = False
-    transform_strip.scale_start_y = scale                   # w
-    transform_strip.scale_start_x = img_rescale_y * scale   # h
+    transform_strip.scale_start_x, transform_strip.scale_start_y = fit_img_scale(dimensions, scale, scene.render)
 
     # set strip opacity
     if alpha:
@@ -115,7 +321,8 @@ def load_scale_img (name, path, scale=1.0, channel=1, length=10, alpha=True):
 PrettyImageProperties = {
     'alpha': BoolProperty(name="Transparency", description="Use alpha blend on image transform", default=True),
     'scale': FloatProperty(name="Scale", description="Transform scale to apply to fitted image", default=1.0),
-    'length': IntProperty(name="Strip length", description="Frame duration of imported images", default=10)
+    'length': IntProperty(name="Strip length", description="Frame duration of imported images", default=10),
+    'sequential': BoolProperty(name="Sequential", description="Place imported images one after another instead of stacking them", default=True)
 }
 
 class PrettyImagePanel (bpy.types.Panel):
@@ -148,6 +355,7 @@ class PrettyImageOperator (bpy.types.Operator):
     set_alpha = PrettyImageProperties['alpha']
     img_scale = PrettyImageProperties['scale']
     length = PrettyImageProperties['length']
+    sequential = PrettyImageProperties['sequential']
 
     def store_files (self, files):
         img_filenames = []
@@ -160,8 +368,8 @@ class PrettyImageOperator (bpy.types.Operator):
         bpy.context.scene.sequence_editor_create()  # verify vse is valid in scene
         img_filenames = self.store_files(self.files)
         img_path = self.directory
-        for filename in img_filenames:
-            load_scale_img(filename, "{0}{1}".format(img_path, filename), scale=self.img_scale, length=self.length, alpha=self.set_alpha)
+        img_paths = ["{0}{1}".format(img_path, filename) for filename in img_filenames]
+        load_scale_imgs(img_paths, scale=self.img_scale, length=self.length, alpha=self.set_alpha, sequential=self.sequential)
         return {'FINISHED'}
 
     def invoke (self, context, event):
@@ -1,5 +1,6 @@
 import bpy
 from random import shuffle
+from timeline_index import get_index
 
 ## Shuffle Selected Strips
 ##
@@ -60,12 +61,7 @@ def shuffle_strips_by_channel(strips):
 
 def selected_strips(same_type=False, strip_type=''):
     """List all currently selected sequences"""
-    strips = []
-    for s in bpy.context.scene.sequence_editor.sequences:
-        if s.select:
-            if same_type and s.type != strip_type:
-                continue
-            strips.append(s)
-    return strips
+    return get_index().selected(strip_type=strip_type if same_type else None, top_level=True)
 
-shuffle_strips_by_channel(selected_strips())
+if __name__ == '__main__':
+    shuffle_strips_by_channel(selected_strips())
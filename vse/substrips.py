@@ -0,0 +1,54 @@
+import bpy
+
+## Substrips
+##
+## Blender Python VSE script by Joshua R (GitHub user Botmasher)
+##
+## Create a strip showing part of another strip's source straight through
+## sequences.new_image/new_movie/new_sound, so cutters can add many substrips
+## without selecting strips and running duplicate operators for each one.
+##
+## Trim the original strip before adding substrips beside it, otherwise substrips
+## overlapping the untrimmed original get bumped to other channels. Substrips are
+## read from the original's start offset and source file, which trimming its end
+## leaves alone.
+
+# strip types a substrip can be created for from their source file
+substrip_types = ('IMAGE', 'MOVIE', 'SOUND')
+
+def source_start(strip, offset=0):
+    """Source frame shown offset frames into a strip's visible (soft trimmed) frames"""
+    return strip.animation_offset_start + strip.frame_offset_start + offset
+
+def create_substrip(strip, source_start, frame_start, length, name=None):
+    """Create a strip at frame_start showing length frames of a strip's source from source_start
+
+    Returns None for strip types not listed in substrip_types.
+    """
+    if strip.type not in substrip_types:
+        return None
+    sequences = bpy.context.scene.sequence_editor.sequences
+    name = name or "{0}.sub".format(strip.name)
+    if strip.type == 'IMAGE' and len(strip.elements) == 1:
+        # a single still stretched over the strip - every substrip shows the same image
+        substrip = sequences.new_image(name=name, filepath="{0}{1}".format(bpy.path.abspath(strip.directory), strip.elements[0].filename), channel=strip.channel, frame_start=frame_start)
+    elif strip.type == 'IMAGE':
+        elements = strip.elements[source_start:source_start + length]
+        substrip = sequences.new_image(name=name, filepath="{0}{1}".format(bpy.path.abspath(strip.directory), elements[0].filename), channel=strip.channel, frame_start=frame_start)
+        for element in elements[1:]:
+            substrip.elements.append(element.filename)
+    else:
+        if strip.type == 'MOVIE':
+            substrip = sequences.new_movie(name=name, filepath=strip.filepath, channel=strip.channel, frame_start=frame_start)
+        else:
+            substrip = sequences.new_sound(name=name, filepath=strip.sound.filepath, channel=strip.channel, frame_start=frame_start)
+        # read full source length before offsets shorten it
+        source_length = substrip.frame_duration
+        substrip.animation_offset_start = source_start
+        substrip.animation_offset_end = max(0, source_length - source_start - length)
+        substrip.frame_start = frame_start
+    substrip.frame_final_duration = length
+    substrip.channel = strip.channel
+    substrip.blend_type = strip.blend_type
+    substrip.blend_alpha = strip.blend_alpha
+    return substrip
@@ -0,0 +1,160 @@
+import bpy
+import re
+
+## Timeline Index
+##
+## Blender Python VSE script by Joshua R (GitHub user Botmasher)
+##
+## Shared per-scene grouping of sequencer strips by type, nesting and effect inputs,
+## so the VSE tools narrow their searches to the few strips that can match instead of
+## reading names, types and selection off every strip in sequences_all.
+##
+## Each query first checks a cheap signature: which strips exist (by pointer and type)
+## and which sit at the top level. Any strip added, deleted or moved in or out of a
+## meta strip rebuilds the groups, so the index never hands back a freed strip.
+## Names, selection, frames and effect inputs change too often to cache and are read
+## live from the narrowed strips. Undo/redo and file load handlers (installed by
+## register) and invalidate() force a rebuild as well.
+##
+## Queries cover strips inside meta strips too. Pass top_level=True to only search
+## the strips at the top of the sequencer, like looping over sequences would.
+##
+## Usage from another VSE script:
+##     from timeline_index import get_index
+##     for strip in get_index().selected(strip_type='SOUND'): ...
+
+def strip_signature(sequencer):
+    """Fingerprint which strips exist and which are at the top level without reading more than pointers and types"""
+    if not sequencer:
+        return ((), ())
+    return (
+        tuple((strip.as_pointer(), strip.type) for strip in sequencer.sequences_all),
+        tuple(strip.as_pointer() for strip in sequencer.sequences)
+    )
+
+class TimelineIndex:
+    def __init__(self, scene):
+        self.scene_name = scene.name
+        self.dirty = True
+        self.signature = None
+        self.strips = []
+        self.types = {}         # type: [strips]
+        self.effects = []       # strips with input strips
+        self.top_level = set()  # pointers of strips not inside a meta strip
+
+    def invalidate(self):
+        """Mark the index stale so the next query rebuilds it"""
+        self.dirty = True
+
+    def sequencer(self):
+        scene = bpy.data.scenes.get(self.scene_name)
+        return scene.sequence_editor if scene else None
+
+    def rebuild(self, signature=None):
+        """Walk sequences_all once and regroup the strips"""
+        sequencer = self.sequencer()
+        self.strips = [*sequencer.sequences_all] if sequencer else []
+        self.types = {}
+        self.effects = []
+        for strip in self.strips:
+            self.types.setdefault(strip.type, []).append(strip)
+            getattr(strip, 'input_1', None) and self.effects.append(strip)
+        self.top_level = set(strip.as_pointer() for strip in sequencer.sequences) if sequencer else set()
+        self.signature = strip_signature(sequencer) if signature is None else signature
+        self.dirty = False
+        return self
+
+    def _fresh(self):
+        signature = strip_signature(self.sequencer())
+        # strips added, deleted or regrouped since the last rebuild make the index stale
+        (self.dirty or signature != self.signature) and self.rebuild(signature)
+        return self
+
+    def of_type(self, strip_type):
+        """List all strips of one type (SOUND, IMAGE, MOVIE, ...)"""
+        return [*self._fresh().types.get(strip_type, [])]
+
+    def _candidates(self, strip_type=None, selected_only=False, top_level=False):
+        """Narrow the strips to search through using the type groups, nesting and live selection"""
+        self._fresh()
+        strips = self.types.get(strip_type, []) if strip_type else self.strips
+        if top_level:
+            strips = [s for s in strips if s.as_pointer() in self.top_level]
+        if selected_only:
+            return [s for s in strips if s.select]
+        return [*strips]
+
+    def selected(self, strip_type=None, top_level=False):
+        """List selected strips, optionally of one type"""
+        return self._candidates(strip_type=strip_type, selected_only=True, top_level=top_level)
+
+    def named(self, substring='', strip_type=None, selected_only=False, top_level=False):
+        """List strips whose names contain a substring"""
+        strips = self._candidates(strip_type=strip_type, selected_only=selected_only, top_level=top_level)
+        return [strip for strip in strips if substring in strip.name]
+
+    def matching(self, pattern='', strip_type=None, selected_only=False, top_level=False):
+        """List strips whose names match a regex"""
+        r_name = re.compile(pattern or '.*')
+        strips = self._candidates(strip_type=strip_type, selected_only=selected_only, top_level=top_level)
+        return [strip for strip in strips if r_name.search(strip.name)]
+
+    def effects_on(self, strip):
+        """List effect strips using this strip as an input"""
+        pointer = strip.as_pointer()
+        found = []
+        for effect in self._fresh().effects:
+            inputs = (getattr(effect, 'input_1', None), getattr(effect, 'input_2', None))
+            any(input_strip and input_strip.as_pointer() == pointer for input_strip in inputs) and found.append(effect)
+        return found
+
+# one index per scene name
+timeline_indexes = {}
+
+def get_index(scene=None):
+    """Return the cached timeline index for a scene, creating it on first use"""
+    scene = scene or bpy.context.scene
+    if scene.name not in timeline_indexes:
+        timeline_indexes[scene.name] = TimelineIndex(scene)
+    return timeline_indexes[scene.name]
+
+def invalidate(scene=None):
+    """Mark one scene's index or every index stale"""
+    if scene is not None:
+        scene.name in timeline_indexes and timeline_indexes[scene.name].invalidate()
+        return
+    for index in timeline_indexes.values():
+        index.invalidate()
+
+@bpy.app.handlers.persistent
+def invalidate_timeline_indexes(*args):
+    """Handler marking all indexes stale after undo or redo"""
+    invalidate()
+
+@bpy.app.handlers.persistent
+def clear_timeline_indexes(*args):
+    """Handler dropping all indexes when a new file loads"""
+    timeline_indexes.clear()
+
+# not scene_update_post - it runs on nearly every redraw and would drop the index each time
+update_handler_names = ['undo_post', 'redo_post']
+
+def register():
+    for handler_name in update_handler_names:
+        handlers = getattr(bpy.app.handlers, handler_name, None)
+        if handlers is not None and invalidate_timeline_indexes not in handlers:
+            handlers.append(invalidate_timeline_indexes)
+    if clear_timeline_indexes not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(clear_timeline_indexes)
+
+def unregister():
+    for handler_name in update_handler_names:
+        handlers = getattr(bpy.app.handlers, handler_name, None)
+        if handlers is not None and invalidate_timeline_indexes in handlers:
+            handlers.remove(invalidate_timeline_indexes)
+    if clear_timeline_indexes in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_timeline_indexes)
+    timeline_indexes.clear()
+
+if __name__ == '__main__':
+    register()
@@ -1,6 +1,58 @@
+import os
+import sys
 import math
 import bpy
+import numpy as np
 from bpy.props import *
+import timeline_index
+from timeline_index import get_index, invalidate
+try:
+    from keyframe_shifter import write_fcurve_keys
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'anim'))
+    from keyframe_shifter import write_fcurve_keys
+
+#
+# Keyframe backend writing straight into the scene action's fcurves
+# - strip keys live on the scene action at the strip's data path
+# - avoids frame_set, keyframe_insert and keyframe_delete so cost follows keyframes not frames
+#
+def strip_fcurve (strip, property_name, create=True):
+    """Find (or create) the scene fcurve animating one strip property"""
+    scene = strip.id_data
+    data_path = strip.path_from_id(property_name)
+    if scene.animation_data is None or scene.animation_data.action is None:
+        if not create:
+            return None
+        scene.animation_data_create()
+        scene.animation_data.action = scene.animation_data.action or bpy.data.actions.new("{0}Action".format(scene.name))
+    fcurves = scene.animation_data.action.fcurves
+    fcurve = fcurves.find(data_path)
+    if fcurve is None and create:
+        fcurve = fcurves.new(data_path)
+    return fcurve
+
+def read_keyframes (fcurve):
+    """Read all keyframe (frame, value) pairs from an fcurve into an array"""
+    co = np.empty(len(fcurve.keyframe_points) * 2, dtype=np.float32)
+    fcurve.keyframe_points.foreach_get('co', co)
+    return co.reshape(-1, 2)
+
+def remove_keyframes (fcurve, frame_min, frame_max):
+    """Remove keyframes between two frames (inclusive) found by range lookup"""
+    co = read_keyframes(fcurve)
+    in_range = np.flatnonzero((co[:, 0] >= frame_min) & (co[:, 0] <= frame_max))
+    if len(in_range) == len(co):
+        # whole curve is in range - drop it outright
+        # an fcurve's id_data is the action that owns it
+        fcurve.id_data.fcurves.remove(fcurve)
+        return len(in_range)
+    points = fcurve.keyframe_points
+    # remove from the back so earlier indices stay valid
+    for i in in_range[::-1]:
+        points.remove(points[int(i)], fast=True)
+    fcurve.update()
+    return len(in_range)
 
 class Transition (object):
     def handler ():
@@ -27,9 +79,6 @@ class Transition (object):
             start_frame = strip.frame_start + duration
             # call the effect function, reversing duration for transition "in" effect
             effect[strip.transition_type] (strip, start_frame, -duration)
-            
-            # move playhead to avoid keyframing wrong values back-to-back
-            bpy.context.scene.frame_current = start_frame + 1
         
         elif strip.transition_placement == 'out':
             # count frames from right edge of the strip
@@ -38,16 +87,9 @@ class Transition (object):
             #bpy.context.scene.frame_current = strip.frame_start + strip.frame_final_duration
             # call the effect function
             effect[strip.transition_type] (strip, start_frame, duration)
-            
-            # move playhead to avoid keyframing wrong values back-to-back 
-            bpy.context.scene.frame_current = start_frame - 1        
-            
-            ##  /!\ moving playhead avoids back-to-back errors with in/out transitions
-            ##      (keyframing opposite edge to double edge values)
-            ##      but STILL leaves this problem:
-            ##      - if another transition of the same type sits between
-            ##        the playhead and this created transition, this one will
-            ##        have two edge values (offscreen, transparent, rotated, etc.)
+
+            ##  /!\ keys are written directly to fcurves, so the playhead no longer moves
+            ##      - starting values are read from the curve at the starting frame
         return None
 
     def get_screen_dimensions (strip):
@@ -60,36 +102,20 @@ class Transition (object):
         return (width,height)
 
     def set (strip, property_name, end_value, starting_frame, duration):
-        """Move to starting frame, set a keyframe for a property, move to final frame (starting frame plus duration), change property value, set keyframe for the property."""
-        # move to and keyframe the starting frame (just leaving its current value)
-        bpy.context.scene.frame_set(starting_frame)
-        strip.keyframe_insert (property_name, -1, starting_frame)
-
-        # move to and keyframe the ending frame with the final property value
-        bpy.context.scene.frame_current += duration
-        
-        # insert keyframe on the property at the final frame
-        strip.keyframe_insert (property_name, -1, starting_frame+duration)
+        """Keyframe a property at the starting frame (keeping its value there) and at starting frame plus duration with the final value"""
+        fcurve = strip_fcurve(strip, property_name)
+        # read the animated value at the starting frame without moving the playhead
+        if len(fcurve.keyframe_points):
+            start_value = fcurve.evaluate(starting_frame)
+        else:
+            start_value = getattr(strip, property_name)
+        # for "in" transitions (negative duration) the final value sits at the earlier frame
+        write_fcurve_keys(fcurve, [starting_frame, starting_frame + duration], [start_value, end_value])
 
         # give the relevant property_name a new ending value
-        if property_name == 'translate_start_x':
-            strip.translate_start_x = end_value
-        elif property_name == 'translate_start_y':
-            strip.translate_start_y = end_value
-        elif property_name == 'scale_start_x':
-            strip.scale_start_x = end_value
-        elif property_name == 'scale_start_y':
-            strip.scale_start_y = end_value
-        elif property_name == 'rotation_start':
-            strip.rotation_start = end_value
-        elif property_name == 'blend_alpha':
-            strip.blend_alpha = end_value
-        else:
-            pass
+        if property_name in Transition.strip_properties(strip):
+            setattr(strip, property_name, end_value)
 
-        # insert keyframe on the property at the final frame
-        strip.keyframe_insert (property_name, -1, starting_frame+duration)
-        
         # set transparency type to stack with other images/movies
         strip.blend_type = 'ALPHA_OVER'
         # refresh the sequence editor window
@@ -98,8 +124,7 @@ class Transition (object):
 
     def clear (strip):
         """Remove all keyframes from the transition properties fields and reset their values"""
-        # select frame in the center of the strip and remember values
-        bpy.context.scene.frame_current = ((strip.frame_start+strip.frame_final_duration) - strip.frame_start) * 0.5
+        # remember current values
         remember_values =               \
             [ strip.blend_alpha,        \
             strip.translate_start_x,    \
@@ -108,25 +133,14 @@ class Transition (object):
             strip.scale_start_x,        \
             strip.scale_start_y,        \
             strip.rotation_start ]
-        # move to the first frame in this strip
-        bpy.context.scene.frame_current = strip.frame_start
         # get list of all properties that Transition messes with
         properties = Transition.strip_properties(strip)
-        # count through every frame looking for keyframes
-        for frame in range (strip.frame_start-1, strip.frame_start+strip.frame_final_duration+1):
-            # attempt to remove keyframes on all transition properties this frame
-            for prop in properties:
-                try:
-                    strip.keyframe_delete(prop, -1, frame)
-                except:
-                    pass
-            # try to skip ahead to the next keyframe
-            try:
-                bpy.ops.screen.keyframe_jump()
-            except:
-                pass
-            # set the frame variable to match skip ahead
-            frame = bpy.context.scene.frame_current
+        # remove keyframes within the strip (plus one frame either side) on each property curve
+        frame_min = strip.frame_start - 1
+        frame_max = strip.frame_start + strip.frame_final_duration + 1
+        for prop in properties:
+            fcurve = strip_fcurve(strip, prop, create=False)
+            fcurve and remove_keyframes(fcurve, frame_min, frame_max)
         # reset transform properties to default values
         strip.translate_start_x = remember_values[1]
         strip.translate_start_y = remember_values[2]
@@ -217,42 +231,43 @@ class Transition (object):
 #
 # Custom properties for Transition object to read as transition options
 #
-bpy.types.TransformSequence.transition_type = EnumProperty(
-    items = [('counterclock', 'Counterclock', 'to or from counterclockwise rotation'),
-             ('clockwise', 'Clockwise', 'to or from a clockwise rotation'),
-             ('scale', 'Scale', 'zoom in or out (scale set)'),
-             ('unfade', 'Unfade', 'to or from opaque'),
-             ('fade', 'Fade', 'to or from transparent'),
-             ('bottom', 'Bottom', 'to or from bottom'),
-             ('top', 'Top', 'to or from top'),
-             ('right', 'Right', 'to or from right edge'),
-             ('left', 'Left', 'to or from left edge')],
-    name = 'Type',
-    default = 'fade',
-    description = 'Type of transition to add to this strip'
-    )
-
-bpy.types.TransformSequence.transition_placement = EnumProperty(
-    items = [('in', 'In', 'Add transition to left edge of strip'),
-             ('out', 'Out', 'Add transition to right edge of strip'),
-             ('mid', 'Mid', 'Add transition at the current frame')],
-    name = 'Placement',
-    description = 'Where to add transition within this strip'
-    )
-
-bpy.types.TransformSequence.transition_frames = IntProperty (
-    name = 'Duration (frames)', 
-    default = 10,
-    description = 'Number of frames the transition will last'
-    )
-
-bpy.types.TransformSequence.transition_strength = FloatProperty (
-    name = 'Strength', 
-    default = 1.0, 
-    min = 0.0, 
-    max = 5.0, 
-    description = 'Change the impact of the effect (defaults to 1.0 = 100%)'
-    )
+def setup_transition_props():
+    bpy.types.TransformSequence.transition_type = EnumProperty(
+        items = [('counterclock', 'Counterclock', 'to or from counterclockwise rotation'),
+                 ('clockwise', 'Clockwise', 'to or from a clockwise rotation'),
+                 ('scale', 'Scale', 'zoom in or out (scale set)'),
+                 ('unfade', 'Unfade', 'to or from opaque'),
+                 ('fade', 'Fade', 'to or from transparent'),
+                 ('bottom', 'Bottom', 'to or from bottom'),
+                 ('top', 'Top', 'to or from top'),
+                 ('right', 'Right', 'to or from right edge'),
+                 ('left', 'Left', 'to or from left edge')],
+        name = 'Type',
+        default = 'fade',
+        description = 'Type of transition to add to this strip'
+        )
+
+    bpy.types.TransformSequence.transition_placement = EnumProperty(
+        items = [('in', 'In', 'Add transition to left edge of strip'),
+                 ('out', 'Out', 'Add transition to right edge of strip'),
+                 ('mid', 'Mid', 'Add transition at the current frame')],
+        name = 'Placement',
+        description = 'Where to add transition within this strip'
+        )
+
+    bpy.types.TransformSequence.transition_frames = IntProperty (
+        name = 'Duration (frames)',
+        default = 10,
+        description = 'Number of frames the transition will last'
+        )
+
+    bpy.types.TransformSequence.transition_strength = FloatProperty (
+        name = 'Strength',
+        default = 1.0,
+        min = 0.0,
+        max = 5.0,
+        description = 'Change the impact of the effect (defaults to 1.0 = 100%)'
+        )
 
 # bpy.types.TransformSequence.transition_in = BoolProperty(
 #     name = 'In',
@@ -347,24 +362,25 @@ class DeleteTransition (bpy.types.Operator):
 
 def add_transform_strip (base_strip):
     # deselect all strips to avoid adding multiple effect strips
-    for s in bpy.context.scene.sequence_editor.sequences_all:
+    for s in get_index().selected():
         s.select = False
     # make sure this is a transform-ready image or movie
     if base_strip.type in ('IMAGE', 'MOVIE'):
         # select this strip and create a transform effect strip on it
         base_strip.select = True
         bpy.ops.sequencer.effect_strip_add(type='TRANSFORM')
+        invalidate(bpy.context.scene)
         # find strip we just created and set it to alpha bg
-        for st in bpy.context.scene.sequence_editor.sequences_all:
-            # check that it uses this base strip as its input
-            if hasattr(st,'input_1') and st.input_1.name == base_strip.name:
-                st.blend_type = 'ALPHA_OVER'
+        for st in get_index().effects_on(base_strip):
+            st.blend_type = 'ALPHA_OVER'
         # make this parent strip invisible
         base_strip.blend_type = 'ALPHA_OVER'
         base_strip.blend_alpha = 0.0
     return None
 
 def register():
+    timeline_index.register()
+    setup_transition_props()
     bpy.utils.register_class(CustomTransitionsPanel)
     bpy.utils.register_class(AddTransition)
     bpy.utils.register_class(DeleteTransition)